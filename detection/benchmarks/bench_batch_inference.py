@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: K câmeras em um processo com inferência em lote vs K processos
+
+Modo "lote": um processo, um DirectEngine, um forward com os K frames por
+rodada (o que o BatchInferenceWorker faz com as K câmeras). Modo
+"processos": K processos, cada um com seu modelo e um forward por frame
+(uma instância do main.py por câmera). Os dois medem só o laço de
+inferência, depois do carregamento e do warm-up, e relatam frames/s no
+relógio e frames por segundo de CPU (vazão por núcleo).
+
+Cada processo usa --threads threads do torch (padrão 1), então a CPU total
+é comparável entre os modos.
+
+Uso:
+    python detection/benchmarks/bench_batch_inference.py --cameras 2 3 4
+    python detection/benchmarks/bench_batch_inference.py --imgsz 320 --rounds 50 --source gravacoes/lancamento_01
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from bench_inference_backends import load_frames  # noqa: E402
+
+
+def worker(model_name, frames, batch, rounds, warmup, threads, barrier, results):
+    """Processo de medida: 'rounds' forwards de 'batch' frames"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        from modules.model_loader import load_yolo_model
+        from modules.inference_engine import DirectEngine
+
+        imgsz = frames[0].shape[0]
+        model = load_yolo_model(model_name, imgsz=imgsz)
+        engine = DirectEngine(model, imgsz=imgsz, device="cpu")
+        groups = [[frames[(r * batch + i) % len(frames)] for i in range(batch)] for r in range(len(frames))]
+        for r in range(warmup):
+            engine.infer_batch(groups[r % len(groups)])
+
+        barrier.wait()  # Todos os processos começam juntos
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        for r in range(rounds):
+            engine.infer_batch(groups[r % len(groups)])
+        results.put((time.perf_counter() - wall0, time.process_time() - cpu0, rounds * batch))
+    except BaseException:
+        # Não deixa os outros processos nem o pai esperando para sempre
+        barrier.abort()
+        results.put(None)
+        raise
+
+
+def measure(model_name, frames, processes, batch, rounds, warmup, threads):
+    """Roda 'processes' processos em paralelo; retorna (frames, wall s, CPU s) ou None se algum falhou"""
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(processes)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(model_name, frames, batch, rounds, warmup, threads, barrier, results))
+             for _ in range(processes)]
+    for p in procs:
+        p.start()
+    samples = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    if None in samples:
+        return None
+    wall = max(s[0] for s in samples)
+    cpu = sum(s[1] for s in samples)
+    return sum(s[2] for s in samples), wall, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=config.MODEL_PATH)
+    parser.add_argument('--source', help="Gravação (vídeo ou pasta de frames); padrão: frames sintéticos")
+    parser.add_argument('--imgsz', type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument('--cameras', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--rounds', type=int, default=30, help="Frames por câmera medidos")
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=1, help="Threads do torch por processo")
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.imgsz, 16)
+    if not frames:
+        print("❌ Nenhum frame para o benchmark")
+        return
+    print(f"{os.cpu_count()} núcleos, {args.threads} thread(s) do torch por processo, imgsz {args.imgsz}")
+
+    rows = []
+    for k in args.cameras:
+        rows.append((k, "lote", measure(args.model, frames, 1, k, args.rounds, args.warmup, args.threads)))
+        rows.append((k, "processos", measure(args.model, frames, k, 1, args.rounds, args.warmup, args.threads)))
+
+    # Tabela só no fim: os processos filhos imprimem o carregamento do modelo
+    print(f"\n{'Câmeras':<9}{'Modo':<11}{'Frames':>8}{'Relógio s':>11}{'CPU s':>9}{'Frames/s':>10}{'Frames/CPU s':>14}")
+    for k, mode, sample in rows:
+        if sample is None:
+            print(f"{k:<9}{mode:<11}❌ falhou (ver erro acima)")
+            continue
+        count, wall, cpu = sample
+        print(f"{k:<9}{mode:<11}{count:>8}{wall:>11.2f}{cpu:>9.2f}{count / wall:>10.1f}{count / cpu:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vazão de captura por backend do CameraManager
+
+Compara o caminho atual (backend "default": crop + resize no Python) com o
+pipeline GStreamer (crop/scale/BGR no pipeline) e o V4L2 direto. Mede FPS
+entregue, CPU do processo por frame e idade média do frame.
+
+Uso:
+    python detection/benchmarks/bench_capture_backends.py --device 0
+    python detection/benchmarks/bench_capture_backends.py --test-src   # sem câmera (videotestsrc)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import gst_pipeline  # noqa: E402
+from modules.camera_manager import (  # noqa: E402
+    CameraManager, CAPTURE_LATEST,
+    BACKEND_DEFAULT, BACKEND_GSTREAMER, BACKEND_V4L2,
+)
+
+
+def run(label, seconds, **kwargs):
+    """Captura por 'seconds' consumindo todo frame novo; retorna linha de resultado"""
+    try:
+        camera = CameraManager(capture_mode=CAPTURE_LATEST, **kwargs)
+    except ValueError as e:
+        print(f"⚠️  {label}: {e}")
+        return None
+
+    camera.start()
+    seq = 0
+    frames = 0
+    ages = 0.0
+    cpu0 = time.process_time()
+    t0 = time.monotonic()
+    try:
+        while time.monotonic() - t0 < seconds:
+            ref = camera.wait_for_frame(seq, timeout=1.0)
+            if ref is None:
+                continue
+            with ref:
+                seq = ref.seq
+                ages += ref.age()
+                frames += 1
+    finally:
+        elapsed = time.monotonic() - t0
+        cpu = time.process_time() - cpu0
+        stats = camera.stats()
+        camera.stop()
+
+    if frames == 0:
+        return (label, 0.0, 0.0, 0.0, stats['dropped'], stats['prescaled'])
+    return (label, frames / elapsed, cpu / frames * 1000, ages / frames * 1000,
+            stats['dropped'], stats['prescaled'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--device', type=int, default=0)
+    parser.add_argument('--test-src', action='store_true', help="Usa videotestsrc em vez da câmera")
+    parser.add_argument('--resolution', default='1280x720', help="Resolução nativa (LxA)")
+    parser.add_argument('--fps', type=int, default=60)
+    parser.add_argument('--size', type=int, default=640)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    width, height = map(int, args.resolution.lower().split('x'))
+    common = dict(size=args.size, fps=args.fps, capture_resolution=(width, height))
+
+    if args.test_src:
+        if not gst_pipeline.gstreamer_available():
+            print("❌ OpenCV sem suporte a GStreamer: --test-src indisponível")
+            return
+        cases = [
+            ("Python crop/resize", dict(src=gst_pipeline.build_test_pipeline(width, height, args.fps),
+                                        backend=BACKEND_GSTREAMER)),
+            ("Pipeline crop/scale", dict(src=gst_pipeline.build_test_pipeline(width, height, args.fps, args.size),
+                                         backend=BACKEND_GSTREAMER)),
+        ]
+    else:
+        cases = [
+            ("Atual (default)", dict(src=args.device, backend=BACKEND_DEFAULT)),
+            ("V4L2", dict(src=args.device, backend=BACKEND_V4L2)),
+        ]
+        if gst_pipeline.gstreamer_available():
+            cases.append(("GStreamer", dict(src=args.device, backend=BACKEND_GSTREAMER)))
+        else:
+            print("⚠️  OpenCV sem GStreamer: pulando backend GStreamer")
+
+    results = [r for r in (run(label, args.seconds, **common, **kw) for label, kw in cases) if r]
+
+    print("\n" + "=" * 72)
+    print(f"{'Backend':<22}{'FPS':>8}{'CPU ms/frame':>15}{'Idade ms':>11}{'Drops':>8}{'Pré-esc.':>9}")
+    for label, fps, cpu_ms, age_ms, dropped, prescaled in results:
+        print(f"{label:<22}{fps:>8.1f}{cpu_ms:>15.2f}{age_ms:>11.1f}{dropped:>8}{'sim' if prescaled else 'não':>9}")
+
+
+if __name__ == "__main__":
+    main()
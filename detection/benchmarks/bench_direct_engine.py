@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: predictor do ultralytics vs DirectEngine (forward direto)
+
+Mede, no mesmo frame quadrado, a latência de model.predict() e de
+DirectEngine.infer(), o forward puro da rede (piso comum aos dois) e o pico
+de memória alocada pelo Python dentro de uma chamada (tracemalloc; não
+inclui os tensores do torch). Antes de medir, confere que os dois caminhos
+devolvem as mesmas caixas.
+
+Uso:
+    python detection/benchmarks/bench_direct_engine.py --model detection/models/below-trash-v2.pt
+    python detection/benchmarks/bench_direct_engine.py --imgsz 320 --frames 200 --source gravacoes/lancamento_01
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.model_loader import load_yolo_model  # noqa: E402
+from modules.inference_engine import DirectEngine  # noqa: E402
+from modules.postprocess import results_to_array  # noqa: E402
+from bench_inference_backends import load_frames  # noqa: E402
+
+
+def timed(fn, frames, count, warmup):
+    for i in range(warmup):
+        fn(frames[i % len(frames)])
+    latencies = []
+    for i in range(count):
+        t0 = time.perf_counter()
+        fn(frames[i % len(frames)])
+        latencies.append(time.perf_counter() - t0)
+    return np.array(latencies) * 1000
+
+
+def peak_kb(fn, frame, calls=10):
+    """Pico de memória Python acima do que já estava alocado, por chamada (maior, KiB)"""
+    fn(frame)
+    tracemalloc.start()
+    peaks = []
+    for _ in range(calls):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(frame)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return max(peaks) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=config.MODEL_PATH)
+    parser.add_argument('--source', help="Gravação (vídeo ou pasta de frames); padrão: frames sintéticos")
+    parser.add_argument('--imgsz', type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=10)
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.imgsz, args.frames)
+    if not frames:
+        print("❌ Nenhum frame para o benchmark")
+        return
+
+    model = load_yolo_model(args.model, imgsz=args.imgsz)
+    engine = DirectEngine(model, imgsz=args.imgsz, device=config.DEVICE)
+
+    def predict(frame):
+        return model.predict(frame, imgsz=args.imgsz, verbose=False, device=config.DEVICE)
+
+    # Mesmas caixas pelos dois caminhos (ordem pode diferir em empates)
+    for frame in frames[:5]:
+        expected = results_to_array(predict(frame))[:, :6]
+        got = engine.infer(frame)
+        assert expected.shape == got.shape, (expected.shape, got.shape)
+        if len(got):
+            order = np.lexsort(expected.T), np.lexsort(got.T)
+            assert np.allclose(expected[order[0]], got[order[1]], atol=1e-3)
+
+    host, tensor, fill, _ = engine._input(args.imgsz)
+
+    def forward(frame):
+        with torch.inference_mode():
+            engine.net(tensor)
+
+    rows = [
+        ("predict", timed(predict, frames, args.frames, args.warmup), peak_kb(predict, frames[0])),
+        ("direct", timed(engine.infer, frames, args.frames, args.warmup), peak_kb(engine.infer, frames[0])),
+        ("forward", timed(forward, frames, args.frames, args.warmup), None),
+    ]
+    floor = rows[-1][1].mean()
+
+    print(f"\n{'Caminho':<10}{'Média ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'Extra ms':>10}{'Pico KiB':>13}")
+    for name, ms, kb in rows:
+        extra = f"{ms.mean() - floor:>10.2f}" if name != "forward" else f"{'-':>10}"
+        alloc = f"{kb:>13.1f}" if kb is not None else f"{'-':>13}"
+        print(f"{name:<10}{ms.mean():>10.2f}{np.percentile(ms, 50):>9.2f}{np.percentile(ms, 95):>9.2f}{extra}{alloc}")
+
+
+if __name__ == "__main__":
+    main()
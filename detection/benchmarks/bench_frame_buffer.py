@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes alocados por frame no hand-off câmera -> consumidor
+
+Compara o caminho antigo (read() novo + crop/resize novo + copy() no read)
+com o ring buffer pré-alocado (read() reutilizando array + resize no slot +
+empréstimo sem cópia). Não precisa de câmera: usa uma captura sintética.
+Bytes medidos com tracemalloc; tempo medido à parte, sem ele.
+
+Uso:
+    python detection/benchmarks/bench_frame_buffer.py [--frames 300] [--raw 1280x720] [--repeats 5]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.frame_buffer import FrameRingBuffer  # noqa: E402
+
+
+class SyntheticCapture:
+    """Imita cv2.VideoCapture.read(): aloca um frame novo, ou reutiliza o recebido"""
+
+    def __init__(self, width, height):
+        rng = np.random.default_rng(0)
+        self.source = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+    def read(self, image=None):
+        if image is None:
+            return True, self.source.copy()
+        np.copyto(image, self.source)
+        return True, image
+
+
+def legacy_step(cap, state, size):
+    """Caminho antigo do CameraManager (_capture_loop + read)"""
+    ret, frame = cap.read()
+    h, w = frame.shape[:2]
+    s = min(h, w)
+    x0 = (w - s) // 2
+    y0 = (h - s) // 2
+    frame = frame[y0:y0 + s, x0:x0 + s]
+    frame = cv2.resize(frame, (size, size))
+    with state['lock']:
+        state['frame'] = frame
+    # Consumidor: read() faz copy() sob o lock
+    with state['lock']:
+        out = state['frame'].copy()
+    return out.shape
+
+
+def ring_step(cap, state, size):
+    """Caminho novo (ring buffer pré-alocado + empréstimo sem cópia)"""
+    buffer = state['buffer']
+    ret, raw = cap.read(state['raw'])
+    state['raw'] = raw
+    h, w = raw.shape[:2]
+    s = min(h, w)
+    x0 = (w - s) // 2
+    y0 = (h - s) // 2
+    index, slot = buffer.acquire_write()
+    cv2.resize(raw[y0:y0 + s, x0:x0 + s], (size, size), dst=slot)
+    buffer.publish(index, time.monotonic())
+    # Consumidor: empresta a view e devolve
+    with buffer.borrow() as ref:
+        return ref.frame.shape
+
+
+def measure_alloc(step, cap, state, size, frames):
+    """Retorna bytes alocados por frame (pico do tracemalloc)"""
+    # Aquece (alocações iniciais de buffers não contam)
+    for _ in range(5):
+        step(cap, state, size)
+
+    tracemalloc.start()
+    total_peak = 0
+    for _ in range(frames):
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        step(cap, state, size)
+        _, peak = tracemalloc.get_traced_memory()
+        total_peak += peak - base
+    tracemalloc.stop()
+    return total_peak / frames
+
+
+def measure_time(paths, cap, size, frames, repeats):
+    """
+    Mediana de ms/frame de cada caminho, sem tracemalloc (ele encarece cada
+    alocação Python e distorce o tempo de quem cria mais objetos pequenos)
+
+    Os caminhos se alternam a cada repetição para que aquecimento de cache
+    e variação de clock da CPU não favoreçam quem roda por último.
+    """
+    times = {name: [] for name, _, _ in paths}
+    for _ in range(repeats):
+        for name, step, state in paths:
+            step(cap, state, size)
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                step(cap, state, size)
+            times[name].append((time.perf_counter() - t0) / frames * 1000)
+    return {name: float(np.median(values)) for name, values in times.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--raw', default='1280x720', help="Resolução bruta da câmera (LxA)")
+    parser.add_argument('--size', type=int, default=640, help="Tamanho do frame quadrado")
+    parser.add_argument('--slots', type=int, default=4)
+    parser.add_argument('--repeats', type=int, default=5, help="Repetições intercaladas do tempo (mediana)")
+    args = parser.parse_args()
+
+    width, height = map(int, args.raw.lower().split('x'))
+    cap = SyntheticCapture(width, height)
+
+    legacy_state = {'lock': threading.Lock(), 'frame': None}
+    ring_state = {
+        'buffer': FrameRingBuffer((args.size, args.size, 3), slots=args.slots),
+        'raw': None,
+    }
+
+    print(f"Frames: {args.frames} x {args.repeats} | bruto {width}x{height} -> {args.size}x{args.size}")
+    print("-" * 60)
+    legacy_bytes = measure_alloc(legacy_step, cap, legacy_state, args.size, args.frames)
+    ring_bytes = measure_alloc(ring_step, cap, ring_state, args.size, args.frames)
+    ms = measure_time([("legacy", legacy_step, legacy_state), ("ring", ring_step, ring_state)],
+                      cap, args.size, args.frames, args.repeats)
+
+    print(f"{'Caminho':<22}{'bytes/frame':>16}{'ms/frame':>12}")
+    print(f"{'Antigo (copy)':<22}{legacy_bytes:>16,.0f}{ms['legacy']:>12.3f}")
+    print(f"{'Ring buffer':<22}{ring_bytes:>16,.0f}{ms['ring']:>12.3f}")
+    if ring_bytes > 0:
+        print(f"\nRedução de alocação: {legacy_bytes / ring_bytes:.0f}x")
+    else:
+        print("\nRing buffer: nenhuma alocação de pixels no caminho quente")
+    print("O tempo é dominado pela cópia do frame bruto e pelo resize, iguais nos dois")
+    print("caminhos: o ring economiza a alocação e a cópia do read(), não o resize.")
+
+
+if __name__ == "__main__":
+    main()
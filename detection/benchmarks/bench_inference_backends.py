@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latência de inferência por backend do model_loader
+
+Carrega o mesmo .pt em PyTorch, ONNX Runtime e OpenVINO (exportando uma vez
+para o cache ao lado dos pesos) e mede a latência por frame de predict().
+Os frames vêm de uma gravação (--source) ou são sintéticos.
+
+Uso:
+    python detection/benchmarks/bench_inference_backends.py --model detection/models/below-trash-v2.pt
+    python detection/benchmarks/bench_inference_backends.py --source gravacoes/lancamento_01 --frames 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.model_loader import (  # noqa: E402
+    load_yolo_model, BACKEND_PYTORCH, BACKEND_ONNX, BACKEND_OPENVINO, _runtime_available,
+)
+from modules.recorded_source import RecordedSource, PACING_FAST  # noqa: E402
+
+
+def load_frames(source, size, count):
+    """Frames da gravação (até 'count') ou ruído sintético"""
+    if source is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, (size, size, 3), dtype=np.uint8) for _ in range(min(count, 8))]
+
+    frames = []
+    camera = RecordedSource(source, size=size, pacing=PACING_FAST)
+    camera.start()
+    seq = 0
+    try:
+        while len(frames) < count and camera.is_running:
+            ref = camera.wait_for_frame(seq, timeout=1.0)
+            if ref is None:
+                continue
+            with ref:
+                seq = ref.seq
+                frames.append(ref.frame.copy())
+    finally:
+        camera.stop()
+    return frames
+
+
+def run(backend, model_name, imgsz, frames, count, warmup):
+    """Mede 'count' inferências depois de 'warmup' descartadas"""
+    t0 = time.perf_counter()
+    model = load_yolo_model(model_name, backend=backend, imgsz=imgsz)
+    load_time = time.perf_counter() - t0
+
+    for i in range(warmup):
+        model.predict(frames[i % len(frames)], imgsz=imgsz, verbose=False, device="cpu")
+
+    latencies = []
+    for i in range(count):
+        frame = frames[i % len(frames)]
+        t0 = time.perf_counter()
+        model.predict(frame, imgsz=imgsz, verbose=False, device="cpu")
+        latencies.append(time.perf_counter() - t0)
+
+    ms = np.array(latencies) * 1000
+    return backend, load_time, ms.mean(), np.percentile(ms, 50), np.percentile(ms, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=config.MODEL_PATH)
+    parser.add_argument('--source', help="Gravação (vídeo ou pasta de frames); padrão: frames sintéticos")
+    parser.add_argument('--imgsz', type=int, default=config.MODEL_IMGSZ)
+    parser.add_argument('--frames', type=int, default=100, help="Inferências medidas por backend")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--backends', nargs='+', default=[BACKEND_PYTORCH, BACKEND_ONNX, BACKEND_OPENVINO])
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.imgsz, args.frames)
+    if not frames:
+        print("❌ Nenhum frame para o benchmark")
+        return
+
+    results = []
+    for backend in args.backends:
+        if not _runtime_available(backend):
+            print(f"⚠️  {backend}: runtime não instalado, pulando")
+            continue
+        print(f"\n=== {backend} ===")
+        results.append(run(backend, args.model, args.imgsz, frames, args.frames, args.warmup))
+
+    print("\n" + "=" * 64)
+    print(f"{'Backend':<12}{'Carga s':>10}{'Média ms':>12}{'p50 ms':>10}{'p95 ms':>10}{'FPS':>10}")
+    for backend, load_time, mean, p50, p95 in results:
+        print(f"{backend:<12}{load_time:>10.2f}{mean:>12.1f}{p50:>10.1f}{p95:>10.1f}{1000 / mean:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
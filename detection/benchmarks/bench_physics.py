@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: velocidade do PhysicsPredictor, np.polyfit vs somas incrementais
+
+Mede o custo por frame do que o pós-processamento faz a cada detecção
+(add_point + predict_landing + predict_trajectory) em um lançamento
+sintético, pelos dois caminhos:
+  - polyfit: como o calculate_velocity antigo (deques viram arrays e três
+    np.polyfit por chamada, duas chamadas por frame)
+  - incremental: somas da regressão atualizadas em O(1) no add_point e
+    velocidade em forma fechada
+e a maior diferença entre as velocidades dos dois.
+
+Uso:
+    python detection/benchmarks/bench_physics.py
+    python detection/benchmarks/bench_physics.py --history 5 10 30 100 --frames 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.physics import PhysicsPredictor  # noqa: E402
+
+
+class PolyfitPredictor(PhysicsPredictor):
+    """Velocidade pelo caminho antigo (arrays + np.polyfit a cada chamada)"""
+
+    def fit_state(self):
+        if len(self.positions) < 3:
+            return None
+        t = np.array(self.timestamps)
+        pos = np.array(self.positions)
+        t_rel = t - t[-1]
+        return pos[-1], np.array([np.polyfit(t_rel, pos[:, axis], 1)[0] for axis in range(3)])
+
+
+def make_throw(frames, fps, seed=0):
+    """Posições (frames, 3) de lançamentos repetidos com ruído de medida e timestamps"""
+    rng = np.random.default_rng(seed)
+    timestamps = 1000.0 + np.arange(frames) / fps
+    t = np.arange(frames) % int(fps) / fps  # Um lançamento por segundo
+    positions = np.column_stack([
+        0.5 + 1.0 * t,
+        -0.2 + 0.3 * t,
+        1.5 + 2.0 * t - 0.5 * config.GRAVITY * t ** 2,
+    ]) + rng.normal(0.0, 0.01, (frames, 3))
+    return positions, timestamps
+
+
+def run(predictor, positions, timestamps):
+    """Laço do pós-processamento; retorna (µs/frame, velocidades)"""
+    velocities = []
+    t0 = time.perf_counter()
+    for position, timestamp in zip(positions, timestamps):
+        predictor.add_point(position, timestamp)
+        predictor.predict_landing()
+        predictor.predict_trajectory()
+    elapsed = time.perf_counter() - t0
+    # Velocidades fora do laço medido (só para comparar os caminhos)
+    predictor.clear_history()
+    for position, timestamp in zip(positions, timestamps):
+        predictor.add_point(position, timestamp)
+        velocities.append(predictor.calculate_velocity())
+    return elapsed / len(positions) * 1e6, velocities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', type=int, nargs='+', default=[5, config.HISTORY_SIZE, 30])
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--fps', type=float, default=config.CAMERA_FPS)
+    args = parser.parse_args()
+
+    positions, timestamps = make_throw(args.frames, args.fps)
+    print(f"{args.frames} frames a {args.fps:.0f} FPS (add_point + predict_landing + predict_trajectory)")
+    print(f"\n{'Histórico':<11}{'polyfit µs':>12}{'incremental µs':>16}{'Speedup':>9}{'Dif. máx m/s':>14}")
+    for size in args.history:
+        slow_us, slow_v = run(PolyfitPredictor(size, config.ROBOT_HEIGHT, config.GRAVITY), positions, timestamps)
+        fast_us, fast_v = run(PhysicsPredictor(size, config.ROBOT_HEIGHT, config.GRAVITY), positions, timestamps)
+        diff = max(np.abs(a - b).max() for a, b in zip(slow_v, fast_v) if a is not None)
+        print(f"{size:<11}{slow_us:>12.1f}{fast_us:>16.1f}{slow_us / fast_us:>8.1f}x{diff:>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: precisão do ponto de pouso, ajuste linear vs balístico
+
+Lançamentos sintéticos (posição e velocidade iniciais aleatórias, queda
+livre até ROBOT_HEIGHT) amostrados a --fps com ruído gaussiano de medida.
+A cada frame com histórico suficiente, o PhysicsPredictor de cada modo
+prevê o pouso, comparado com o pouso verdadeiro (forma analítica):
+  - linear: reta em cada eixo; vz é a média da janela, atrasada em
+    g·(janela)/2 em relação ao último frame
+  - ballistic: z(t) = z0 + vz·t - ½g·t² com g fixo, mesmas somas em O(1)
+Relata o erro horizontal do pouso (todo o voo e só a primeira metade,
+quando o robô decide para onde ir), o erro de vz e o custo por frame.
+
+Uso:
+    python detection/benchmarks/bench_physics_fit.py
+    python detection/benchmarks/bench_physics_fit.py --history 5 10 20 --noise 0.03 --throws 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.physics import PhysicsPredictor, FIT_MODES  # noqa: E402
+
+
+def make_throws(count, fps, noise, gravity, floor, seed=0):
+    """
+    Returns:
+        lista de (timestamps (N,), medidas (N, 3), velocidades reais (N, 3),
+        pouso real (3,), duração do voo)
+    """
+    rng = np.random.default_rng(seed)
+    throws = []
+    for _ in range(count):
+        p0 = np.array([rng.uniform(-1.0, 1.0), rng.uniform(1.5, 3.0), rng.uniform(1.0, 1.8)])
+        v0 = np.array([rng.uniform(-1.0, 1.0), rng.uniform(-2.0, -0.5), rng.uniform(0.0, 3.0)])
+        # z0 + vz·T - ½g·T² = floor
+        flight = (v0[2] + np.sqrt(v0[2] ** 2 + 2 * gravity * (p0[2] - floor))) / gravity
+        t = np.arange(0.0, flight, 1.0 / fps)
+        positions = p0 + np.outer(t, v0)
+        positions[:, 2] -= 0.5 * gravity * t ** 2
+        velocities = np.tile(v0, (len(t), 1))
+        velocities[:, 2] -= gravity * t
+        landing = p0 + v0 * flight
+        landing[2] = floor
+        measured = positions + rng.normal(0.0, noise, positions.shape)
+        throws.append((500.0 + t, measured, velocities, landing, flight))
+    return throws
+
+
+def evaluate(mode, history, throws, gravity, floor):
+    """Erros de pouso (m) em todos os frames e na 1ª metade do voo, erros de vz e µs/frame"""
+    predictor = PhysicsPredictor(history, floor, gravity, fit_mode=mode)
+    landing_errors, early_errors, vz_errors = [], [], []
+    frames = 0
+    elapsed = 0.0
+    for timestamps, measured, velocities, landing, flight in throws:
+        predictor.clear_history()
+        for i, (timestamp, position) in enumerate(zip(timestamps, measured)):
+            t0 = time.perf_counter()
+            predictor.add_point(position, timestamp)
+            predicted = predictor.predict_landing()
+            elapsed += time.perf_counter() - t0
+            frames += 1
+            if predicted is None:
+                continue
+            error = np.linalg.norm(predicted[:2] - landing[:2])
+            landing_errors.append(error)
+            if timestamps[i] - timestamps[0] < flight / 2:
+                early_errors.append(error)
+            vz_errors.append(abs(predictor.calculate_velocity()[2] - velocities[i, 2]))
+    return (np.array(landing_errors), np.array(early_errors), np.array(vz_errors),
+            elapsed / frames * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', type=int, nargs='+', default=[5, config.HISTORY_SIZE, 20])
+    parser.add_argument('--throws', type=int, default=300)
+    parser.add_argument('--fps', type=float, default=config.CAMERA_FPS)
+    parser.add_argument('--noise', type=float, default=0.02, help="Desvio do ruído de posição (m)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    throws = make_throws(args.throws, args.fps, args.noise, config.GRAVITY, config.ROBOT_HEIGHT, args.seed)
+    frames = sum(len(throw[0]) for throw in throws)
+    print(f"{args.throws} lançamentos ({frames} frames a {args.fps:.0f} FPS), ruído {args.noise * 100:.1f} cm")
+    print(f"\n{'Histórico':<11}{'Modo':<11}{'Pouso med cm':>14}{'p90 cm':>9}{'1ª metade cm':>14}"
+          f"{'vz med m/s':>12}{'µs/frame':>10}")
+    for history in args.history:
+        for mode in FIT_MODES:
+            landing, early, vz, us = evaluate(mode, history, throws, config.GRAVITY, config.ROBOT_HEIGHT)
+            print(f"{history:<11}{mode:<11}{np.median(landing) * 100:>14.1f}{np.percentile(landing, 90) * 100:>9.1f}"
+                  f"{np.median(early) * 100:>14.1f}{np.median(vz):>12.3f}{us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
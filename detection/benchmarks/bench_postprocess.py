@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pós-processamento das detecções, caixa a caixa vs vetorizado
+
+Monta Results do ultralytics com 1, 10 e 50 caixas e mede a extração de
+caixa/classe/confiança + posição 3D pelos dois caminhos:
+  - loop: como o process_frame antigo (tensor 1x4 por caixa, int() e
+    SpatialProcessor.calculate_3d_position uma caixa por vez)
+  - vetorizado: boxes.data para NumPy uma vez, tamanho por tabela e
+    SpatialProcessor.calculate_3d_positions em lote
+
+Uso:
+    python detection/benchmarks/bench_postprocess.py
+    python detection/benchmarks/bench_postprocess.py --counts 1 10 50 200 --iterations 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.spatial import SpatialProcessor  # noqa: E402
+from modules.postprocess import results_to_array, extract_detections, SizeLookup  # noqa: E402
+
+
+def make_results(count, size, seed=0):
+    """Results com 'count' caixas aleatórias (com id de rastreamento, como track())"""
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, size - 60, (count, 2))
+    wh = rng.uniform(5, 60, (count, 2))
+    data = np.column_stack([
+        xy, xy + wh,
+        np.arange(1, count + 1),                   # id
+        rng.uniform(0.3, 1.0, count),              # confiança
+        rng.integers(0, 2, count),                 # classe
+    ]).astype(np.float32)
+    image = np.zeros((size, size, 3), dtype=np.uint8)
+    return [Results(image, path="", names={0: 'can', 1: 'paper'}, boxes=torch.from_numpy(data))]
+
+
+def loop_postprocess(results, spatial):
+    """Caminho antigo: uma caixa por vez"""
+    out = []
+    for result in results:
+        for box in result.boxes:
+            class_id = int(box.cls)
+            confidence = float(box.conf)
+            xyxy = np.squeeze(np.asarray(box.xyxy.detach().cpu().numpy()))
+            if xyxy.ndim != 1 or xyxy.size < 4:
+                continue
+            bbox = tuple(map(int, xyxy[:4]))
+            obj_size = config.OBJECT_DIMENSIONS.get(class_id, config.DEFAULT_OBJECT_SIZE)
+            pos_3d = spatial.calculate_3d_position(bbox, obj_size)
+            if pos_3d is not None:
+                out.append((bbox, class_id, confidence, pos_3d))
+    return out
+
+
+def vector_postprocess(results, spatial, sizes):
+    """Caminho novo: arrays por frame"""
+    data = results_to_array(results)
+    if not len(data):
+        return []
+    bboxes, class_ids, confidences, _, positions, valid = extract_detections(data, spatial, sizes)
+    return [(tuple(bboxes[i].tolist()), int(class_ids[i]), float(confidences[i]), positions[i])
+            for i in np.flatnonzero(valid)]
+
+
+def timed(fn, iterations):
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counts', type=int, nargs='+', default=[1, 10, 50], help="Detecções por frame")
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    spatial = SpatialProcessor(config.CAMERA_WIDTH, config.CAMERA_HEIGHT, config.FOCAL_LENGTH)
+    sizes = SizeLookup(config.OBJECT_DIMENSIONS, config.DEFAULT_OBJECT_SIZE)
+
+    print(f"{'Detecções':>10}{'Loop µs':>12}{'Vetor µs':>12}{'Ganho':>10}")
+    for count in args.counts:
+        results = make_results(count, config.CAMERA_WIDTH)
+
+        # Os dois caminhos precisam concordar antes de comparar tempo
+        expected = loop_postprocess(results, spatial)
+        got = vector_postprocess(results, spatial, sizes)
+        assert len(expected) == len(got)
+        for (b1, c1, p1, x1), (b2, c2, p2, x2) in zip(expected, got):
+            assert b1 == b2 and c1 == c2 and abs(p1 - p2) < 1e-6 and np.allclose(x1, x2)
+        mask = spatial.valid_positions(np.array([x for *_, x in got]).reshape(-1, 3))
+        assert mask.tolist() == [spatial.is_valid_position(x) for *_, x in expected]
+
+        loop_us = timed(lambda: loop_postprocess(results, spatial), args.iterations)
+        vector_us = timed(lambda: vector_postprocess(results, spatial, sizes), args.iterations)
+        print(f"{count:>10}{loop_us:>12.1f}{vector_us:>12.1f}{loop_us / vector_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
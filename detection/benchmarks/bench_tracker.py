@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rastreador NumPy (modules/tracker.py) vs ByteTrack do ultralytics
+
+Alimenta os dois rastreadores com a mesma sequência de detecções e compara o
+custo por frame de update() e as trocas de id.
+
+  - Sintético (padrão): 1 a 3 objetos em trajetória balística em pixels, com
+    ruído na caixa, detecções perdidas e falsos positivos. Como a verdade é
+    conhecida, troca de id = o id atribuído a um objeto real mudou.
+  - Gravação (--source + --model): detecções do modelo em cada frame. Sem
+    verdade, troca de id = detecção que sobrepõe (IoU >= 0.5) uma detecção
+    rastreada do frame anterior, mas recebeu outro id.
+
+Uso:
+    python detection/benchmarks/bench_tracker.py
+    python detection/benchmarks/bench_tracker.py --objects 3 --frames 2000 --drop 0.2
+    python detection/benchmarks/bench_tracker.py --source gravacoes/lancamento_01 --model detection/models/below-trash-v2.pt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from ultralytics.engine.results import Boxes
+from ultralytics.trackers.byte_tracker import BYTETracker
+from ultralytics.utils import YAML, IterableSimpleNamespace
+from ultralytics.utils.checks import check_yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.tracker import NumpyTracker, iou_matrix  # noqa: E402
+from modules.postprocess import results_to_array  # noqa: E402
+from modules.recorded_source import RecordedSource, PACING_FAST  # noqa: E402
+
+
+def synthetic_sequence(objects, frames, size, drop, false_positive, seed=0):
+    """
+    Lista de (detecções (N, 6), gt (N,)) por frame; gt = -1 em falso positivo
+
+    Cada objeto é relançado de um canto quando sai da imagem (e conta como
+    objeto novo na verdade).
+    """
+    rng = np.random.default_rng(seed)
+
+    def launch():
+        x = rng.uniform(0, size * 0.3)
+        return np.array([x, size * rng.uniform(0.5, 0.9), rng.uniform(4, 10), rng.uniform(-18, -10),
+                         rng.uniform(20, 50)])  # x, y, vx, vy, lado
+
+    state = [launch() for _ in range(objects)]
+    truth = list(range(objects))
+    launches = objects
+    classes = rng.integers(0, 2, objects)
+    sequence = []
+    for _ in range(frames):
+        rows, gt = [], []
+        for k, s in enumerate(state):
+            s[0] += s[2]
+            s[1] += s[3]
+            s[3] += 0.5  # Gravidade em pixels/frame²
+            if s[0] > size or s[1] > size:
+                state[k] = s = launch()
+                truth[k] = launches
+                launches += 1
+            if rng.random() < drop:
+                continue
+            half = s[4] / 2 + rng.normal(0, 1.0, 2)
+            cx, cy = s[0] + rng.normal(0, 1.5), s[1] + rng.normal(0, 1.5)
+            rows.append([cx - half[0], cy - half[1], cx + half[0], cy + half[1],
+                         rng.uniform(0.5, 0.95), classes[k]])
+            gt.append(truth[k])
+        if rng.random() < false_positive:
+            x, y = rng.uniform(0, size - 30, 2)
+            rows.append([x, y, x + 25, y + 25, rng.uniform(0.3, 0.5), 0])
+            gt.append(-1)
+        sequence.append((np.array(rows, dtype=np.float32).reshape(-1, 6), np.array(gt, dtype=np.int64)))
+    return sequence
+
+
+def recorded_sequence(source, model_name, size, frames):
+    """Detecções do modelo em cada frame da gravação (sem verdade: gt = None)"""
+    from modules.model_loader import load_yolo_model
+
+    model = load_yolo_model(model_name, warmup=0)
+    camera = RecordedSource(source, size=size, pacing=PACING_FAST)
+    camera.start()
+    sequence = []
+    seq = 0
+    try:
+        while len(sequence) < frames and camera.is_running:
+            ref = camera.wait_for_frame(seq, timeout=1.0)
+            if ref is None:
+                continue
+            with ref:
+                seq = ref.seq
+                results = model.predict(ref.frame, verbose=False, device=config.DEVICE)
+            sequence.append((results_to_array(results)[:, [0, 1, 2, 3, -2, -1]], None))
+    finally:
+        camera.stop()
+    return sequence
+
+
+def run_numpy(sequence):
+    tracker = NumpyTracker(
+        iou_threshold=config.TRACKER_IOU_THRESHOLD,
+        max_distance=config.TRACKER_MAX_DISTANCE,
+        max_age=config.TRACKER_MAX_AGE,
+        min_hits=config.TRACKER_MIN_HITS
+    )
+    outputs, times = [], []
+    for dets, _ in sequence:
+        t0 = time.perf_counter()
+        out = tracker.update(dets)
+        times.append(time.perf_counter() - t0)
+        # Detecções saem na ordem da entrada: recupera o índice pela caixa
+        idx = match_index(dets, out)
+        outputs.append((out[:, :4], out[:, 4].astype(np.int64), idx))
+    return outputs, times
+
+
+def run_bytetrack(sequence, size):
+    args = IterableSimpleNamespace(**YAML.load(check_yaml(config.TRACKER_CONFIG)))
+    tracker = BYTETracker(args)
+    outputs, times = [], []
+    for dets, _ in sequence:
+        boxes = Boxes(dets, (size, size))
+        t0 = time.perf_counter()
+        out = tracker.update(boxes)
+        times.append(time.perf_counter() - t0)
+        out = np.asarray(out).reshape(-1, 8)
+        outputs.append((out[:, :4], out[:, 4].astype(np.int64), out[:, 7].astype(np.int64)))
+    return outputs, times
+
+
+def match_index(dets, out):
+    """Índice em dets de cada linha de out (caixas copiadas sem alteração)"""
+    if not len(out):
+        return np.empty(0, dtype=np.int64)
+    diff = np.abs(out[:, None, :4] - dets[None, :, :4]).sum(axis=2)
+    return diff.argmin(axis=1)
+
+
+def id_switches_gt(sequence, outputs):
+    """Trocas de id contra a verdade (objeto real recebeu outro id)"""
+    last = {}
+    switches = 0
+    for (_, gt), (_, ids, idx) in zip(sequence, outputs):
+        for track_id, i in zip(ids, idx):
+            obj = gt[i]
+            if obj < 0:
+                continue
+            if obj in last and last[obj] != track_id:
+                switches += 1
+            last[obj] = track_id
+    return switches
+
+
+def id_switches_overlap(outputs):
+    """Sem verdade: detecção que sobrepõe uma do frame anterior mas mudou de id"""
+    switches = 0
+    for (prev_boxes, prev_ids, _), (boxes, ids, _) in zip(outputs, outputs[1:]):
+        if not len(prev_boxes) or not len(boxes):
+            continue
+        iou = iou_matrix(boxes.astype(np.float64), prev_boxes.astype(np.float64))
+        best = iou.argmax(axis=1)
+        overlap = iou[np.arange(len(boxes)), best] >= 0.5
+        switches += int(np.count_nonzero(overlap & (ids != prev_ids[best])))
+    return switches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', help="Gravação (vídeo ou pasta de frames); padrão: sequência sintética")
+    parser.add_argument('--model', default=config.MODEL_PATH)
+    parser.add_argument('--frames', type=int, default=1000)
+    parser.add_argument('--objects', type=int, default=2, help="Objetos simultâneos (sintético)")
+    parser.add_argument('--drop', type=float, default=0.1, help="Chance de perder uma detecção (sintético)")
+    parser.add_argument('--false-positive', type=float, default=0.05, help="Chance de falso positivo por frame")
+    args = parser.parse_args()
+
+    size = config.CAMERA_WIDTH
+    if args.source:
+        sequence = recorded_sequence(args.source, args.model, size, args.frames)
+    else:
+        sequence = synthetic_sequence(args.objects, args.frames, size, args.drop, args.false_positive)
+    if not sequence:
+        print("❌ Nenhum frame para o benchmark")
+        return
+
+    detections = sum(len(d) for d, _ in sequence)
+    print(f"{len(sequence)} frames, {detections} detecções")
+    print(f"{'Rastreador':<14}{'Média µs':>10}{'p95 µs':>10}{'Trocas id':>11}{'Ids':>6}")
+    for name, (outputs, times) in (("numpy", run_numpy(sequence)),
+                                   ("bytetrack", run_bytetrack(sequence, size))):
+        us = np.array(times) * 1e6
+        switches = id_switches_overlap(outputs) if args.source else id_switches_gt(sequence, outputs)
+        ids = len(set(np.concatenate([o[1] for o in outputs]).tolist()))
+        print(f"{name:<14}{us.mean():>10.1f}{np.percentile(us, 95):>10.1f}{switches:>11}{ids:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,28 +3,94 @@ Sistema de detecção e rastreamento 3D - Lixeira Inteligente
 Arquitetura limpa com controles de teclado
 """
 
+import argparse
 import cv2
 import numpy as np
 import sys
-from time import time
+import threading
+from time import time, perf_counter
 
 # Imports locais
 from modules.camera_manager import CameraManager
+from modules.recorded_source import RecordedSource, PACINGS, PACING_REALTIME
 from modules.model_loader import load_yolo_model
 from modules.spatial import SpatialProcessor
-from modules.physics import PhysicsPredictor
+from modules.calibration import load_calibration, load_extrinsics
+from modules.physics import PhysicsPredictor, FIT_BALLISTIC, FIT_LINEAR
 from modules.robot_ws import RobotWebSocket
 from modules.run_prediction import Visualizer3D
+from modules.motion import MotionGate
+from modules.frame_bus import FrameBusSubscriber
+from modules.pipeline import Pipeline, CameraSource, FramePacket, MIN_BUFFER_SLOTS
+from modules.roi import RoiController, offset_results
+from modules.adaptive import ResolutionController
+from modules.postprocess import results_to_array, extract_detections, SizeLookup
+from modules.tracker import NumpyTracker
+from modules.flow import FlowPropagator, FLOW_PASS
+from modules.inference_engine import DirectEngine
+from modules.batch_inference import BatchInferenceWorker
+from modules.stereo import StereoPair, StereoTriangulator, load_stereo_calibration
 import modules.config as config
 
+BUS_PREFIX = "bus:"  # --source bus:NOME assina o barramento de outro processo
+
 
 class DetectionApp:
     """Aplicação principal com gerenciamento de estados"""
     
-    def __init__(self):
+    def __init__(self, source=None, pacing=PACING_REALTIME, headless=False,
+                 offline=False, max_frames=None, bus=config.CAMERA_BUS_NAME,
+                 pipelined=config.PIPELINE_ENABLED, frame_skip=config.FRAME_SKIP,
+                 worker=None, name=None, stereo_source=None):
+        """
+        Args:
+            source: Vídeo ou pasta de frames gravados, ou 'bus:NOME' para
+                assinar o barramento de outro processo (None = câmera do config)
+            pacing: Ritmo da gravação (ver recorded_source.PACINGS)
+            headless: Sem janela, teclado nem visualização 3D
+            offline: Não conecta ao robô
+            max_frames: Encerra após N frames processados (None = sem limite)
+            bus: Publica os frames da câmera neste barramento compartilhado
+            pipelined: Inferência, pós-processamento e exibição em threads
+                separadas (False = tudo em série no loop principal)
+            frame_skip: Maior N do detector a cada N frames (1 = todo frame);
+                entre passes, as caixas seguem por fluxo óptico
+            worker: BatchInferenceWorker compartilhado entre câmeras; a
+                inferência sai do lote dele (exige pipeline) e o modelo
+                não é carregado de novo
+            name: Nome da câmera no worker em lote (padrão: a fonte)
+            stereo_source: Câmera direita (índice ou gravação) para o modo
+                estéreo; a fonte principal é a esquerda (None = monocular)
+        """
+        self.source = source
+        self.bus = bus
+        self.pacing = pacing
+        self.headless = headless
+        self.offline = offline
+        self.max_frames = max_frames
+        self.pipelined = pipelined
+        self.frame_skip = frame_skip
+        self.worker = worker
+        self.stereo_source = stereo_source
+        self.camera_name = name or (source if source is not None else str(config.CAMERA_ID))
+        if worker is not None:
+            self.pipelined = True  # O pós-processamento consome a fila do worker
+        self.pipeline = None
+        self.display_queue = None
+        
         self.paused = False
-        self.dev_mode = config.DEFAULT_DEV_MODE
+        self.dev_mode = config.DEFAULT_DEV_MODE and not headless
         self.running = True
+        self.last_seq = 0  # Último frame processado (evita inferência duplicada)
+        
+        # Tempo de partida: do início até o sistema pronto e até a 1ª detecção
+        self.startup_time = perf_counter()
+        self.first_detection_logged = False
+        
+        # Vazão fim-a-fim (relatório no encerramento)
+        self.frames_processed = 0
+        self.processing_time = 0.0
+        self.run_start_time = None
         
         # FPS tracking
         self.fps_counter = 0
@@ -35,8 +101,19 @@ class DetectionApp:
         self.camera = None
         self.detector = None
         self.spatial = None
+        self.sizes = SizeLookup(config.OBJECT_DIMENSIONS, config.DEFAULT_OBJECT_SIZE)
         self.physics = None
         self.robot = None
+        self.motion_gate = None
+        self.last_motion = None
+        self.roi = None
+        self.adaptive = None
+        self.tracker = None
+        self.flow = None
+        self.engine = None
+        self.triangulator = None
+        # Física é escrita no pós-processamento e lida pelo planejamento do ROI
+        self.track_lock = threading.Lock()
         
         # Visualização 3D (reutilizando classe existente!)
         self.visualizer = Visualizer3D(
@@ -48,39 +125,152 @@ class DetectionApp:
         """Inicializa todos os componentes do sistema"""
         print("=== Inicializando Lixeira Inteligente ===")
         
-        # 1. Usar câmera do config (sem GUI selector por enquanto)
-        print(f"\n[1/4] Inicializando câmera {config.CAMERA_ID}...")
-        self.camera = CameraManager(
-            src=config.CAMERA_ID,
-            size=config.CAMERA_WIDTH,
-            fps=config.CAMERA_FPS
-        )
-        self.camera.start()
-        
-        # 2. Carregar detector YOLO
-        print(f"\n[2/4] Carregando modelo {config.MODEL_PATH}...")
-        self.detector = load_yolo_model(config.MODEL_PATH)
+        # 1. Usar câmera do config (sem GUI selector por enquanto) ou gravação
+        buffer_slots = config.CAMERA_BUFFER_SLOTS
+        if self.pipelined:
+            # Cada estágio segura um frame emprestado
+            buffer_slots = max(buffer_slots, MIN_BUFFER_SLOTS)
+        
+        self.camera = self._open_camera(self.source, buffer_slots, self.bus)
+        if self.stereo_source is not None:
+            right = self._open_camera(self.stereo_source, buffer_slots, None)
+            self.camera = StereoPair(self.camera, right, max_skew=config.STEREO_MAX_SKEW)
+        
+        if self.stereo_source is not None:
+            stereo_calibration = load_stereo_calibration(config.STEREO_CALIBRATION_PATH)
+            if stereo_calibration is None:
+                print(f"❌ Modo estéreo sem calibração ({config.STEREO_CALIBRATION_PATH}); "
+                      f"rode tools/calibrate_camera.py --right-camera/--right-source")
+                return False
+            self.triangulator = StereoTriangulator(
+                stereo_calibration,
+                config.CAMERA_WIDTH,
+                config.CAMERA_HEIGHT,
+                max_row_error=config.STEREO_MAX_ROW_ERROR
+            )
+            print(f"  👀 Estéreo: baseline {stereo_calibration.baseline * 100:.1f} cm, "
+                  f"pares com até {config.STEREO_MAX_SKEW * 1000:.1f} ms de diferença")
+        
+        # 2. Carregar detector YOLO (ou usar o do worker em lote)
+        if self.worker is not None:
+            print("\n[2/4] Usando modelo compartilhado da inferência em lote")
+            self.detector = self.worker.engine
+        else:
+            print(f"\n[2/4] Carregando modelo {config.MODEL_PATH}...")
+            self.detector = load_yolo_model(config.MODEL_PATH)
+        
+        if config.TRACKER == "numpy" or self.worker is not None or self.triangulator is not None:
+            # Detector em predict() puro (lote ou par estéreo); ids vêm do rastreador em NumPy
+            self.tracker = NumpyTracker(
+                iou_threshold=config.TRACKER_IOU_THRESHOLD,
+                max_distance=config.TRACKER_MAX_DISTANCE,
+                max_age=config.TRACKER_MAX_AGE,
+                min_hits=config.TRACKER_MIN_HITS
+            )
+        
+        if self.worker is not None:
+            pass  # Inferência sai do lote; ROI, fluxo e imgsz adaptativo são por câmera e ficam de fora
+        elif config.INFERENCE_ENGINE == "direct":
+            # Forward direto só com rede PyTorch e ids do rastreador próprio
+            # (track() do ultralytics depende do predictor)
+            if self.tracker is None:
+                print("⚠️  Inferência direta precisa de TRACKER = \"numpy\"; usando o predictor do ultralytics")
+            elif getattr(self.detector, "backend", "pytorch") != "pytorch":
+                print("⚠️  Inferência direta só com backend PyTorch; usando o predictor do ultralytics")
+            else:
+                self.engine = DirectEngine(self.detector, imgsz=config.CAMERA_WIDTH, device=config.DEVICE)
+                print("  ⚡ Inferência direta (tensor de entrada e saída reutilizados)")
+        
+        if self.frame_skip > 1 and self.worker is None and self.triangulator is None:
+            self.flow = FlowPropagator(
+                max_skip=self.frame_skip,
+                max_shift=config.FLOW_MAX_SHIFT,
+                points_per_box=config.FLOW_POINTS_PER_BOX
+            )
+            print(f"  🌊 Detector a cada até {self.frame_skip} frames, fluxo óptico entre eles")
+        
+        if config.ADAPTIVE_IMGSZ and self.worker is None and self.triangulator is None:
+            if getattr(self.detector, "backend", "pytorch") == "pytorch":
+                # Acima do tamanho do frame só ampliaria a imagem
+                sizes = [s for s in config.ADAPTIVE_SIZES if s <= config.CAMERA_WIDTH] or [config.CAMERA_WIDTH]
+                self.adaptive = ResolutionController(
+                    sizes=sizes,
+                    budget=config.INFERENCE_BUDGET,
+                    min_dwell=config.ADAPTIVE_MIN_DWELL
+                )
+            else:
+                print("⚠️  imgsz adaptativo desligado: modelo exportado tem entrada fixa")
         
         # 3. Processadores 3D e física
         print("\n[3/4] Inicializando processadores 3D...")
+        calibration = load_calibration(config.CALIBRATION_PATH)
+        if self.triangulator is not None:
+            # Estimativa monocular (fallback sem par) na câmera esquerda do estéreo
+            calibration = self.triangulator.calibration.left
+        elif calibration is not None:
+            print(f"  📐 Calibração {config.CALIBRATION_PATH} (reprojeção {calibration.rms or 0:.2f} px): "
+                  f"raios sem distorção por pixel")
+        else:
+            print(f"  📐 Sem calibração: FOCAL_LENGTH={config.FOCAL_LENGTH} e centro da imagem")
+        extrinsics = load_extrinsics(config.EXTRINSICS_PATH)
+        if extrinsics is not None:
+            print(f"  📐 Extrínseca {config.EXTRINSICS_PATH}: câmera a {extrinsics[2, 3]:.2f} m do chão")
+        else:
+            print("  📐 Sem extrínseca: posições no referencial da câmera (Z = profundidade)")
         self.spatial = SpatialProcessor(
             config.CAMERA_WIDTH,
             config.CAMERA_HEIGHT,
-            config.FOCAL_LENGTH
+            config.FOCAL_LENGTH,
+            calibration=calibration,
+            extrinsics=extrinsics
         )
+        fit_mode = config.PHYSICS_FIT_MODE
+        if fit_mode == FIT_BALLISTIC and extrinsics is None:
+            # Sem extrínseca o Z é a profundidade: a gravidade não age nesse eixo
+            print("  ⚠️  Ajuste balístico precisa da extrínseca (Z para cima); usando ajuste linear")
+            fit_mode = FIT_LINEAR
         self.physics = PhysicsPredictor(
             config.HISTORY_SIZE,
             config.ROBOT_HEIGHT,
-            config.GRAVITY
+            config.GRAVITY,
+            fit_mode=fit_mode
         )
+        if config.MOTION_GATING and self.worker is None and self.triangulator is None:
+            self.motion_gate = MotionGate(
+                size=config.MOTION_SIZE,
+                threshold=config.MOTION_THRESHOLD,
+                pixel_threshold=config.MOTION_PIXEL_THRESHOLD,
+                heartbeat=config.MOTION_HEARTBEAT,
+                hold=config.MOTION_HOLD,
+                method=config.MOTION_METHOD
+            )
+        if config.ROI_INFERENCE and self.worker is None and self.triangulator is None:
+            self.roi = RoiController(
+                config.CAMERA_WIDTH,
+                margin=config.ROI_MARGIN,
+                min_size=config.ROI_MIN_SIZE,
+                full_interval=config.ROI_FULL_INTERVAL,
+                max_prediction=config.ROI_MAX_PREDICTION
+            )
         
         # 4. Conectar ao robô
-        print(f"\n[4/4] Conectando ao robô em {config.API_URL}...")
-        self.robot = RobotWebSocket(config.API_URL)
-        self.robot.connect()
+        if self.offline:
+            print("\n[4/4] Modo offline: sem conexão com o robô")
+        else:
+            print(f"\n[4/4] Conectando ao robô em {config.API_URL}...")
+            self.robot = RobotWebSocket(config.API_URL)
+            self.robot.connect()
         
-        print("\n✅ Sistema inicializado com sucesso!")
-        self._print_controls()
+        # Gravação só começa a tocar com o detector pronto
+        if not self.camera.is_running:
+            self.camera.start()
+        
+        if self.pipelined:
+            self._build_pipeline()
+        
+        print(f"\n✅ Sistema inicializado com sucesso! ({perf_counter() - self.startup_time:.2f}s)")
+        if not self.headless:
+            self._print_controls()
         
         # Inicializar visualização 3D se dev mode estiver ativo
         if self.dev_mode:
@@ -88,6 +278,103 @@ class DetectionApp:
         
         return True
     
+    def _open_camera(self, source, buffer_slots, bus):
+        """Câmera ao vivo (já capturando), gravação ou barramento conforme a fonte"""
+        if source is not None and source.startswith(BUS_PREFIX):
+            name = source[len(BUS_PREFIX):]
+            print(f"\n[1/4] Assinando barramento de frames '{name}'...")
+            # Cópia validada: a inferência segura o frame por mais que os slots do ring
+            return FrameBusSubscriber(name, timeout=5.0, copy=True)
+        
+        if source is not None and not source.isdigit():
+            print(f"\n[1/4] Abrindo gravação {source}...")
+            return RecordedSource(
+                source,
+                size=config.CAMERA_WIDTH,
+                pacing=self.pacing,
+                buffer_slots=buffer_slots
+            )
+        
+        camera_id = int(source) if source is not None else config.CAMERA_ID
+        print(f"\n[1/4] Inicializando câmera {camera_id}...")
+        camera = CameraManager(
+            src=camera_id,
+            size=config.CAMERA_WIDTH,
+            fps=config.CAMERA_FPS,
+            buffer_slots=buffer_slots,
+            capture_mode=config.CAMERA_CAPTURE_MODE,
+            backend=config.CAMERA_BACKEND,
+            capture_resolution=config.CAMERA_CAPTURE_RESOLUTION,
+            warmup_frames=config.CAMERA_WARMUP_FRAMES,
+            publish_name=bus
+        )
+        camera.start()
+        return camera
+    
+    def _build_pipeline(self):
+        """
+        Captura → inferência → pós-processamento (física + robô) → exibição
+        
+        Inferência e pós-processamento rodam em threads próprias; a exibição
+        fica na thread principal (exigência do imshow/waitKey). O comando do
+        robô sai do pós-processamento e nunca espera pela exibição.
+        """
+        self.pipeline = Pipeline()
+        if not self.headless:
+            self.display_queue = self.pipeline.queue("exibição", on_drop=FramePacket.release)
+        
+        if self.worker is not None:
+            # Inferência no worker em lote; a fila dele alimenta o pós-processamento
+            results_queue = self.worker.register(self.camera_name, self.camera, keep_frames=not self.headless)
+            self.pipeline.queues.append(results_queue)
+            self.pipeline.stage("pós", self._batched_stage, results_queue, self.display_queue,
+                                release=FramePacket.release)
+            self.pipeline.start()
+            print(f"  🔀 Pipeline ativo com inferência em lote (câmera '{self.camera_name}')")
+            return
+        
+        source = CameraSource(self.camera, config.FRAME_WAIT_TIMEOUT)
+        results_queue = self.pipeline.queue("resultados", on_drop=FramePacket.release)
+        
+        self.pipeline.stage("inferência", self._inference_stage, source, results_queue,
+                            release=lambda ref: ref.release())
+        self.pipeline.stage("pós", self._postprocess_stage, results_queue, self.display_queue,
+                            release=FramePacket.release)
+        self.pipeline.start()
+        print("  🔀 Pipeline em estágios ativo (inferência | pós-processamento | exibição)")
+    
+    def _inference_stage(self, ref):
+        """Estágio 1: YOLO no frame emprestado"""
+        packet = FramePacket(ref)
+        self.last_seq = ref.seq
+        if self.triangulator is not None:
+            packet.results, packet.right = self._infer_stereo(packet.frame, ref.right)
+        else:
+            packet.results, packet.roi = self._infer(packet.frame, packet.timestamp)
+        if self.headless:
+            packet.release()  # Ninguém mais precisa dos pixels
+        return packet
+    
+    def _batched_stage(self, packet):
+        """Estágio 2 com inferência em lote: ids do rastreador + pós-processamento"""
+        if self.tracker is not None:
+            self.tracker.track_results(packet.results)
+        return self._postprocess_stage(packet)
+    
+    def _postprocess_stage(self, packet):
+        """Estágio 2: 3D, física e comando do robô"""
+        packet.detections, packet.landing, packet.trajectory = \
+            self._postprocess(packet.results, packet.timestamp, packet.roi, packet.right)
+        packet.results = None
+        packet.right = None
+        self.processing_time += perf_counter() - packet.t_start
+        self.frames_processed += 1
+        
+        if self.headless:
+            self.update_fps()
+            return None
+        return packet
+    
     def _print_controls(self):
         """Mostra os controles disponíveis"""
         print("\n=== CONTROLES ===")
@@ -96,77 +383,212 @@ class DetectionApp:
         print("  D     - Dev Mode (visualização 3D)")
         print("=" * 40)
     
-    def process_frame(self, frame):
-        """Processa um frame completo"""
+    def process_frame(self, frame, timestamp=None, right=None):
+        """
+        Processa um frame completo em série (modo sem pipeline)
+        
+        Args:
+            frame: Imagem (pode ser a view somente leitura da câmera)
+            timestamp: Instante da captura do frame (usado pela física)
+            right: Frame da câmera direita (modo estéreo)
+        """
         if frame is None:
             return None
         
-        # Detectar objetos usando YOLO
-        results = self.detector.track(
-            frame, 
-            persist=True, 
-            tracker="bytetrack.yaml", 
-            verbose=False, 
-            device=config.DEVICE
-        )        
-        # Processar cada detecção
-        for result in results:
-            boxes = result.boxes
+        right_data = None
+        roi = None
+        if self.triangulator is not None:
+            results, right_data = self._infer_stereo(frame, right)
+        else:
+            results, roi = self._infer(frame, timestamp)
+        
+        # Cópia gravável apenas para desenhar a visualização
+        frame = frame.copy() if not self.headless else None
+        
+        detections, landing, trajectory = self._postprocess(results, timestamp, roi, right_data)
+        
+        if not self.headless:
+            self._render(frame, detections, landing, trajectory, roi)
+        
+        return frame
+    
+    def _infer_stereo(self, left, right):
+        """
+        YOLO nas duas vistas do par estéreo (um forward em lote com o engine)
+        
+        Returns:
+            (results da esquerda com ids do rastreador, detecções da direita (M, 6))
+        """
+        if self.engine is not None:
+            left_data, right_data = (out.copy() for out in self.engine.infer_batch((left, right)))
+            results = [left_data]
+        else:
+            results, right_results = (
+                self.detector.predict(frame, verbose=False, device=config.DEVICE) for frame in (left, right)
+            )
+            right_data = results_to_array(right_results)
+        if self.tracker is not None:
+            self.tracker.track_results(results)
+        return results, right_data
+    
+    def _infer(self, frame, timestamp):
+        """
+        Gate de movimento + YOLO (direto na view do buffer, sem cópia)
+        
+        Returns:
+            (results, roi) - roi é o recorte usado, None (frame inteiro) ou
+            FLOW_PASS (caixas propagadas pelo fluxo óptico, sem detector)
+        """
+        # Gate de movimento: frame estático não passa pelo YOLO
+        run_inference = True
+        if self.motion_gate is not None:
+            self.last_motion = self.motion_gate.update(frame, timestamp)
+            run_inference = self.last_motion.run_inference
+            # Frames pulados não atualizam o fluxo: recomeça com o detector
+            if not run_inference and self.flow is not None:
+                self.flow.clear()
+        
+        results = []
+        roi = None
+        if run_inference:
+            # Entre dois passes do detector: caixas levadas pelo fluxo óptico
+            if self.flow is not None and not self.flow.should_detect():
+                data = self.flow.propagate(frame)
+                if data is not None:
+                    results = self.flow.to_results(data, frame, self.detector.names)
+                    if self.tracker is not None:
+                        self.tracker.track_results(results)
+                    return results, FLOW_PASS
             
-            for box in boxes:
-                # Extrair informações da detecção
-                track_id = box.id if box.id is not None else None
-                class_id = int(box.cls)
-                confidence = float(box.conf)
-                
-                # Converter bbox para numpy
-                import torch
-                if isinstance(box.xyxy, torch.Tensor):
-                    xyxy = box.xyxy.detach().cpu().numpy()
-                else:
-                    xyxy = box.xyxy
-                xyxy = np.squeeze(np.asarray(xyxy))
-                
-                if xyxy.ndim != 1 or xyxy.size < 4:
-                    continue
-                
-                x1, y1, x2, y2 = map(int, xyxy[:4])
-                bbox = (x1, y1, x2, y2)
-                
-                # Calcular posição 3D
-                obj_size = config.OBJECT_DIMENSIONS.get(class_id, config.DEFAULT_OBJECT_SIZE)
-                pos_3d = self.spatial.calculate_3d_position(bbox, obj_size)
+            # Objeto em voo: só o recorte em volta da posição prevista
+            if self.roi is not None and timestamp is not None:
+                with self.track_lock:
+                    roi = self.roi.plan(self.physics, self.spatial, timestamp)
+            
+            t0 = perf_counter()
+            if roi is None and self.engine is not None:
+                imgsz = self.adaptive.size if self.adaptive is not None else None
+                results = [self.engine.infer(frame, imgsz)]
+            elif roi is None and self.tracker is not None:
+                extra = {'imgsz': self.adaptive.size} if self.adaptive is not None else {}
+                results = self.detector.predict(
+                    frame, 
+                    verbose=False, 
+                    device=config.DEVICE,
+                    **extra
+                )
+            elif roi is None:
+                extra = {'imgsz': self.adaptive.size} if self.adaptive is not None else {}
+                results = self.detector.track(
+                    frame, 
+                    persist=True, 
+                    tracker=config.TRACKER_CONFIG, 
+                    verbose=False, 
+                    device=config.DEVICE,
+                    **extra
+                )
+            elif self.engine is not None:
+                x1, y1, x2, y2 = roi
+                results = [self.engine.infer(frame[y1:y2, x1:x2], x2 - x1)]
+                offset_results(results, x1, y1, frame.shape)
+            else:
+                x1, y1, x2, y2 = roi
+                results = self.detector.predict(
+                    frame[y1:y2, x1:x2],
+                    imgsz=x2 - x1,
+                    verbose=False,
+                    device=config.DEVICE
+                )
+                offset_results(results, x1, y1, frame.shape)
+            elapsed = perf_counter() - t0
+            
+            # Rastreador em NumPy trabalha em coordenadas do frame inteiro:
+            # passes no recorte também mantêm os ids
+            if self.tracker is not None:
+                self.tracker.track_results(results)
+            if self.flow is not None:
+                self.flow.reset(frame, results_to_array(results))
+            
+            if self.motion_gate is not None:
+                self.motion_gate.record_inference(elapsed)
+            if self.roi is not None:
+                self.roi.record(roi, elapsed)
+            # Só passes no frame inteiro medem o custo do imgsz atual
+            if self.adaptive is not None and roi is None:
+                self.adaptive.observe(elapsed)
+        return results, roi
+    
+    def _postprocess(self, results, timestamp, roi=None, right=None):
+        """
+        Posição 3D, física e comando do robô para cada detecção
+        
+        Args:
+            results: Saída do detector
+            timestamp: Instante da captura do frame
+            roi: Recorte usado na inferência (None = frame inteiro)
+            right: Detecções da câmera direita (modo estéreo)
+        
+        Returns:
+            (detecções [(bbox, class_id, confidence, pos_3d)], pouso, trajetória)
+        """
+        detections = []
+        landing = None
+        trajectory = None
+        found_width = None
+        
+        # Todas as caixas do frame em NumPy de uma vez: (N, 6|7)
+        data = results_to_array(results)
+        if len(data):
+            bboxes, class_ids, confidences, widths, positions, valid = \
+                extract_detections(data, self.spatial, self.sizes, self.triangulator, right)
+            
+            for i in np.flatnonzero(valid):
+                pos_3d = positions[i]
                 
-                if pos_3d is not None:
-                    x, y, z = pos_3d
-                    pos_3d_array = np.array([x, y, z])
-                    
-                    # Adicionar ao histórico e prever trajetória
-                    self.physics.add_point(pos_3d_array)
+                # Adicionar ao histórico e prever trajetória
+                with self.track_lock:
+                    self.physics.add_point(pos_3d, timestamp, weight=float(confidences[i]))
                     landing = self.physics.predict_landing()
                     trajectory = self.physics.predict_trajectory()
-                    
-                    # Atualizar visualização 3D (se dev mode ativo)
-                    if self.dev_mode and self.visualizer.is_active():
-                        landing_3d = landing if landing is not None else None
-                        self.visualizer.update(
-                            current_pos=(x, y, z),
-                            trajectory=[(p[0], p[1], p[2]) for p in trajectory] if len(trajectory) > 0 else None,
-                            landing_pos=landing_3d
-                        )
-                    
-                    # Enviar comando ao robô (se não pausado)
-                    if not self.paused and landing is not None:
-                        self._send_robot_command(landing[:2])  # Passar apenas (x, y)
-                    
-                    # Desenhar visualizações (se dev mode)
-                    if self.dev_mode:
-                        self._draw_detection(frame, bbox, class_id, confidence, pos_3d)
-        
-        # Desenhar overlay
-        self._draw_overlay(frame)
+                found_width = float(widths[i])
+                
+                # Enviar comando ao robô (se não pausado)
+                if not self.paused and landing is not None:
+                    self._send_robot_command(landing[:2])  # Passar apenas (x, y)
+                
+                detections.append((tuple(bboxes[i].tolist()), int(class_ids[i]),
+                                   float(confidences[i]), pos_3d))
         
-        return frame
+        # Frame pulado pelo gate não muda o estado do ROI
+        if self.roi is not None and results and roi is not FLOW_PASS:
+            with self.track_lock:
+                self.roi.update(roi, found_width is not None, found_width)
+        
+        if detections and not self.first_detection_logged:
+            self.first_detection_logged = True
+            print(f"⏱️  Primeira detecção {perf_counter() - self.startup_time:.2f}s após a partida")
+        
+        return detections, landing, trajectory
+    
+    def _render(self, frame, detections, landing, trajectory, roi=None):
+        """Desenha detecções e overlay; atualiza a visualização 3D (thread principal)"""
+        if self.dev_mode:
+            if roi is not None and roi is not FLOW_PASS:
+                cv2.rectangle(frame, roi[:2], roi[2:], (255, 128, 0), 1)
+
+            for bbox, class_id, confidence, pos_3d in detections:
+                self._draw_detection(frame, bbox, class_id, confidence, pos_3d)
+            
+            # Atualizar visualização 3D com a última posição
+            if detections and self.visualizer.is_active():
+                x, y, z = detections[-1][3]
+                self.visualizer.update(
+                    current_pos=(x, y, z),
+                    trajectory=[(p[0], p[1], p[2]) for p in trajectory] if trajectory is not None and len(trajectory) > 0 else None,
+                    landing_pos=landing
+                )
+        
+        self._draw_overlay(frame)
     
     def _send_robot_command(self, landing_point):
         """Envia comando de movimento ao robô no formato correto V:vy,vx"""
@@ -245,6 +667,32 @@ class DetectionApp:
         if self.dev_mode:
             cv2.putText(frame, "DEV MODE", (w - 180, 30),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2)
+            
+            # Latência da captura: idade do frame e frames descartados
+            cam = self.camera.stats()
+            cv2.putText(frame, f"Idade: {cam['age_ms']:.1f}ms  Drop: {cam['dropped']}", (10, h - 15),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            
+            # Gate de movimento: score atual e frames pulados
+            if self.last_motion is not None:
+                gate = self.motion_gate.stats()
+                skipped_pct = gate['skipped'] / gate['frames'] * 100 if gate['frames'] else 0.0
+                cv2.putText(frame, f"Mov: {self.last_motion.score:.3f} ({self.last_motion.reason})  Pulados: {skipped_pct:.0f}%",
+                           (10, h - 35), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            
+            # Resolução adaptativa
+            if self.adaptive is not None:
+                ad = self.adaptive.stats()
+                cv2.putText(frame, f"imgsz: {ad['imgsz']}  {ad['latency_ms']:.0f}/{ad['budget_ms']:.0f}ms  Trocas: {ad['switches']}",
+                           (w - 300, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            
+            # Pipeline: latência por estágio e profundidade das filas
+            if self.pipeline is not None:
+                stats = self.pipeline.stats()
+                stages = "  ".join(f"{name}: {st['avg_ms']:.1f}ms" for name, st in stats['stages'].items())
+                queues = "  ".join(f"{name}: {q['depth']} (-{q['dropped']})" for name, q in stats['queues'].items())
+                cv2.putText(frame, stages, (10, h - 55), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+                cv2.putText(frame, queues, (10, h - 75), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
     
     def handle_keyboard(self, key):
         """Gerencia eventos de teclado"""
@@ -285,22 +733,22 @@ class DetectionApp:
         
         try:
             # Criar janela antecipadamente para garantir foco
-            cv2.namedWindow("Lixeira Inteligente", cv2.WINDOW_NORMAL)
+            if not self.headless:
+                cv2.namedWindow("Lixeira Inteligente", cv2.WINDOW_NORMAL)
+            
+            self.run_start_time = perf_counter()
             
             while self.running:
-                # Capturar frame
-                frame = self.camera.get_frame()
+                if self.pipeline is not None:
+                    self._pipeline_step()
+                else:
+                    self._serial_step()
+                
+                if self.max_frames is not None and self.frames_processed >= self.max_frames:
+                    self.running = False
                 
-                if frame is not None:
-                    # Processar frame
-                    processed_frame = self.process_frame(frame)
-                    
-                    # Mostrar resultado
-                    if processed_frame is not None:
-                        cv2.imshow("Lixeira Inteligente", processed_frame)
-                    
-                    # Atualizar FPS
-                    self.update_fps()
+                if self.headless:
+                    continue
                 
                 # Verificar teclas (sempre, mesmo sem frame)
                 key = cv2.waitKey(1) & 0xFF
@@ -314,6 +762,112 @@ class DetectionApp:
         
         finally:
             self.cleanup()
+            self._print_throughput()
+    
+    def _serial_step(self):
+        """Captura, inferência, pós-processamento e exibição em série"""
+        # Esperar um frame NOVO (sem busy-wait nem inferência repetida)
+        frame_ref = self.camera.wait_for_frame(self.last_seq, timeout=config.FRAME_WAIT_TIMEOUT)
+        
+        if frame_ref is not None:
+            self.last_seq = frame_ref.seq
+            
+            # Processar frame
+            t0 = perf_counter()
+            with frame_ref:
+                processed_frame = self.process_frame(frame_ref.frame, frame_ref.timestamp,
+                                                     getattr(frame_ref, 'right', None))
+            self.processing_time += perf_counter() - t0
+            self.frames_processed += 1
+            
+            # Mostrar resultado
+            if processed_frame is not None and not self.headless:
+                cv2.imshow("Lixeira Inteligente", processed_frame)
+            
+            # Atualizar FPS
+            self.update_fps()
+        
+        elif not self.camera.is_running:
+            # Fim da gravação (ou câmera parou de responder)
+            print("\n🏁 Fonte de frames encerrada")
+            self.running = False
+    
+    def _pipeline_step(self):
+        """Exibe o resultado mais novo do pipeline (estágios rodam em outras threads)"""
+        if self.display_queue is None:
+            # Headless: nada a exibir, só acompanha o fim da fonte
+            if self.pipeline.wait(config.FRAME_WAIT_TIMEOUT):
+                print("\n🏁 Fonte de frames encerrada")
+                self.running = False
+            return
+        
+        packet = self.display_queue.get(timeout=config.FRAME_WAIT_TIMEOUT)
+        if packet is None:
+            if self.display_queue.finished:
+                print("\n🏁 Fonte de frames encerrada")
+                self.running = False
+            return
+        
+        # Cópia gravável para desenhar; o slot volta logo para a câmera
+        frame = packet.frame.copy()
+        packet.release()
+        
+        self._render(frame, packet.detections, packet.landing, packet.trajectory, packet.roi)
+        cv2.imshow("Lixeira Inteligente", frame)
+        self.update_fps()
+    
+    def _print_throughput(self):
+        """Relatório de vazão fim-a-fim (útil em replays headless)"""
+        if self.run_start_time is None or self.frames_processed == 0:
+            return
+        
+        elapsed = perf_counter() - self.run_start_time
+        print("\n=== VAZÃO ===")
+        print(f"  Frames processados: {self.frames_processed}")
+        print(f"  Tempo total: {elapsed:.2f}s ({self.frames_processed / elapsed:.1f} FPS)")
+        print(f"  Latência média (inferência → pós): {self.processing_time / self.frames_processed * 1000:.1f} ms/frame")
+        
+        if self.pipeline is not None:
+            stats = self.pipeline.stats()
+            for name, st in stats['stages'].items():
+                print(f"  Estágio {name}: {st['avg_ms']:.1f} ms média, {st['max_ms']:.1f} ms máx ({st['count']} itens)")
+            for name, q in stats['queues'].items():
+                print(f"  Fila {name}: profundidade máx {q['max_depth']}, {q['dropped']} descartados")
+        
+        if self.adaptive is not None:
+            ad = self.adaptive.stats()
+            print(f"  imgsz adaptativo: {ad['imgsz']} (média {ad['latency_ms']:.1f} ms, "
+                  f"orçamento {ad['budget_ms']:.1f} ms, {ad['switches']} trocas)")
+            for _, old, new, ema_ms in list(self.adaptive.events)[-5:]:
+                print(f"    {old} → {new} ({ema_ms:.1f} ms)")
+        
+        if self.flow is not None:
+            fl = self.flow.stats()
+            print(f"  Fluxo óptico: {fl['flow_passes']} frames propagados x {fl['detect_passes']} "
+                  f"detecções ({fl['flow_ms']:.1f} ms/frame, N atual {fl['interval']}, "
+                  f"{fl['speed']:.1f} px/frame, {fl['lost']} caixas perdidas)")
+        
+        if self.roi is not None:
+            roi = self.roi.stats()
+            print(f"  Inferência no ROI: {roi['roi_passes']} passes ({roi['roi_ms']:.1f} ms, "
+                  f"{roi['roi_area'] * 100:.0f}% da área) x frame inteiro: {roi['full_passes']} "
+                  f"({roi['full_ms']:.1f} ms); {roi['lost']} perdas")
+        
+        if self.triangulator is not None:
+            st = self.triangulator.stats()
+            pair = self.camera.stats()
+            print(f"  Estéreo: {st['matched']} detecções trianguladas, {st['unmatched']} pela largura "
+                  f"({st['triangulate_ms']:.2f} ms/frame)")
+            print(f"  Pares sincronizados: {pair['pairs']} ({pair['rejected']} rejeitados, "
+                  f"desvio médio {pair['skew_ms']:.2f} ms)")
+        
+        if self.motion_gate is not None:
+            gate = self.motion_gate.stats()
+            print(f"  Gate de movimento: {gate['inferred']}/{gate['frames']} frames inferidos "
+                  f"({gate['skipped']} pulados, custo {gate['gate_ms']:.2f} ms/frame)")
+            print(f"  CPU economizado (estimado): {gate['saved_ms'] / 1000:.1f}s ({gate['saved_pct']:.0f}%)")
+            print(f"  Latência extra no início do lançamento: {gate['onset_latency_ms']:.2f} ms")
+        print("=" * 40)
     
     def cleanup(self):
         """Limpa recursos"""
@@ -326,6 +880,19 @@ class DetectionApp:
         except Exception as e:
             print(f"⚠️  Erro ao fechar janelas OpenCV: {e}")
         
+        # Parar estágios antes da câmera (devolvem os frames emprestados)
+        try:
+            if self.worker is not None:
+                self.worker.unregister(self.camera_name)
+        except Exception as e:
+            print(f"⚠️  Erro ao sair da inferência em lote: {e}")
+        
+        try:
+            if self.pipeline:
+                self.pipeline.stop()
+        except Exception as e:
+            print(f"⚠️  Erro ao parar pipeline: {e}")
+        
         # Depois parar câmera (thread-safe agora)
         try:
             if self.camera:
@@ -348,9 +915,102 @@ class DetectionApp:
         print("✅ Encerrado com sucesso!")
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lixeira Inteligente - detecção e rastreamento 3D")
+    parser.add_argument("--source", help="Vídeo, pasta de frames gravados ou bus:NOME (padrão: câmera do config)")
+    parser.add_argument("--bus", default=config.CAMERA_BUS_NAME,
+                        help="Publica os frames da câmera neste barramento compartilhado")
+    parser.add_argument("--pacing", choices=PACINGS, default=PACING_REALTIME,
+                        help="Ritmo da gravação: realtime, fast (sem espera) ou step (timestamps fixos)")
+    parser.add_argument("--headless", action="store_true", help="Sem janela, teclado nem visualização 3D")
+    parser.add_argument("--offline", action="store_true", help="Não conectar ao robô")
+    parser.add_argument("--max-frames", type=int, help="Encerrar após N frames")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--pipeline", dest="pipelined", action="store_true", default=config.PIPELINE_ENABLED,
+                      help="Inferência, pós-processamento e exibição em threads separadas")
+    mode.add_argument("--serial", dest="pipelined", action="store_false",
+                      help="Sem pipeline: tudo em série no loop principal")
+    parser.add_argument("--frame-skip", type=int, default=config.FRAME_SKIP,
+                        help="Detector a cada até N frames, fluxo óptico entre eles (1 = todo frame)")
+    parser.add_argument("--cameras", nargs="+", metavar="SRC",
+                        help="Várias fontes (índice de câmera ou gravação) com inferência em lote compartilhada")
+    parser.add_argument("--stereo", metavar="RIGHT",
+                        help="Câmera direita (índice ou gravação): profundidade por triangulação com --source")
+    return parser.parse_args(argv)
+
+
+def run_cameras(args):
+    """
+    Uma DetectionApp headless por fonte, todas alimentando o mesmo
+    BatchInferenceWorker (um modelo, um forward por lote)
+    
+    Cada câmera segue com rastreador, 3D e física próprios (sem fusão entre
+    elas); só a primeira comanda o robô.
+    """
+    print(f"\n🎥 {len(args.cameras)} fontes com inferência em lote (espera máx {config.BATCH_MAX_WAIT * 1000:.1f} ms)")
+    print(f"Carregando modelo {config.MODEL_PATH}...")
+    model = load_yolo_model(config.MODEL_PATH)
+    if getattr(model, "backend", "pytorch") != "pytorch":
+        print("❌ Inferência em lote precisa do backend PyTorch")
+        return
+    engine = DirectEngine(model, imgsz=config.CAMERA_WIDTH, device=config.DEVICE)
+    worker = BatchInferenceWorker(engine, max_wait=config.BATCH_MAX_WAIT).start()
+    
+    apps = [
+        DetectionApp(
+            source=src,
+            pacing=args.pacing,
+            headless=True,
+            offline=args.offline or i > 0,
+            max_frames=args.max_frames,
+            bus=None,
+            frame_skip=1,
+            worker=worker,
+            name=f"{i}:{src}"
+        )
+        for i, src in enumerate(args.cameras)
+    ]
+    threads = [threading.Thread(target=app.run, name=f"camera:{app.camera_name}") for app in apps]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrompido pelo usuário")
+        for app in apps:
+            app.running = False
+        for thread in threads:
+            thread.join()
+    finally:
+        worker.stop()
+    
+    stats = worker.stats()
+    print("\n=== INFERÊNCIA EM LOTE ===")
+    print(f"  Lotes: {stats['batches']} (média {stats['avg_batch']:.2f} frames/lote)")
+    print(f"  Espera pelo lote: {stats['wait_ms']:.2f} ms, forward: {stats['forward_ms']:.1f} ms")
+    for name, frames in stats['cameras'].items():
+        print(f"  Câmera {name}: {frames} frames")
+
+
 def main():
     """Entry point"""
-    app = DetectionApp()
+    args = parse_args()
+    if args.cameras:
+        run_cameras(args)
+        return
+    app = DetectionApp(
+        source=args.source,
+        pacing=args.pacing,
+        headless=args.headless,
+        offline=args.offline,
+        max_frames=args.max_frames,
+        bus=args.bus,
+        pipelined=args.pipelined,
+        frame_skip=args.frame_skip,
+        stereo_source=args.stereo
+    )
     app.run()
 
 
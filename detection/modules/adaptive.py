@@ -0,0 +1,105 @@
+"""
+Controle adaptativo da resolução de inferência
+
+Acompanha a latência medida do detector (média móvel exponencial) contra um
+orçamento por frame e troca o imgsz entre tamanhos permitidos: desce quando
+estoura o orçamento e sobe quando sobra folga. A histerese vem de limiares
+diferentes para descer e subir e de um número mínimo de frames entre trocas.
+"""
+
+import time
+from collections import deque
+
+DEFAULT_SIZES = (640, 544, 480, 416, 320)
+MAX_EVENTS = 32  # Trocas recentes guardadas (o processo pode rodar por horas)
+
+
+class ResolutionController:
+    """Escolhe o imgsz do detector a partir da latência medida"""
+
+    def __init__(self, sizes=DEFAULT_SIZES, budget=1 / 30, alpha=0.2, down_ratio=1.0,
+                 up_ratio=0.8, min_dwell=15, initial=None):
+        """
+        Args:
+            sizes: Tamanhos permitidos (múltiplos de 32)
+            budget: Orçamento de inferência por frame (segundos)
+            alpha: Peso da amostra nova na média móvel
+            down_ratio: Desce quando a média passa de budget * down_ratio
+            up_ratio: Sobe quando a latência estimada no tamanho maior fica
+                abaixo de budget * up_ratio
+            min_dwell: Frames mínimos no tamanho atual antes de trocar de novo
+            initial: Tamanho inicial (padrão: o maior)
+        """
+        self.sizes = sorted(set(int(s) for s in sizes), reverse=True)
+        if not self.sizes:
+            raise ValueError("Informe pelo menos um tamanho")
+        if up_ratio >= down_ratio:
+            raise ValueError("up_ratio precisa ser menor que down_ratio (histerese)")
+
+        self.budget = budget
+        self.alpha = alpha
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.min_dwell = min_dwell
+
+        self.index = self.sizes.index(initial) if initial in self.sizes else 0
+        self.ema = None
+        self.dwell = 0
+        self.events = deque(maxlen=MAX_EVENTS)  # [(instante, de, para, média_ms)] mais recentes
+        self.switches = 0
+
+    @property
+    def size(self):
+        """imgsz atual"""
+        return self.sizes[self.index]
+
+    def observe(self, latency):
+        """
+        Registra a latência de uma inferência no tamanho atual
+
+        Args:
+            latency: Segundos gastos pelo detector
+
+        Returns:
+            int - imgsz para a próxima inferência
+        """
+        self.ema = latency if self.ema is None else self.alpha * latency + (1 - self.alpha) * self.ema
+        self.dwell += 1
+        if self.dwell < self.min_dwell:
+            return self.size
+
+        if self.ema > self.budget * self.down_ratio and self.index < len(self.sizes) - 1:
+            self._switch(self.index + 1)
+        elif self.index > 0 and self._estimate(self.index - 1) < self.budget * self.up_ratio:
+            self._switch(self.index - 1)
+        return self.size
+
+    def _estimate(self, index):
+        """Latência esperada em outro tamanho (custo ~ área da entrada)"""
+        return self.ema * (self.sizes[index] / self.size) ** 2
+
+    def _switch(self, index):
+        old = self.size
+        self.ema = self._estimate(index)
+        self.index = index
+        self.dwell = 0
+        self.switches += 1
+        self.events.append((time.monotonic(), old, self.size, self.ema * 1000))
+        direction = "⬇️ " if self.size < old else "⬆️ "
+        print(f"{direction} imgsz {old} → {self.size} (latência média {self.ema * 1000:.1f} ms, "
+              f"orçamento {self.budget * 1000:.1f} ms)")
+
+    def stats(self):
+        """
+        Returns:
+            dict com tamanho atual, média de latência (ms), orçamento (ms),
+            número de trocas e a última troca (de, para)
+        """
+        last = self.events[-1] if self.events else None
+        return {
+            'imgsz': self.size,
+            'latency_ms': (self.ema or 0.0) * 1000,
+            'budget_ms': self.budget * 1000,
+            'switches': self.switches,
+            'last_switch': (last[1], last[2]) if last else None,
+        }
@@ -0,0 +1,189 @@
+"""
+Inferência em lote para várias câmeras com um único modelo
+
+Um BatchInferenceWorker junta o frame mais novo de cada câmera registrada em
+um lote, roda um forward só (DirectEngine.infer_batch) e devolve as
+detecções para a fila de cada câmera, na forma de FramePacket com os
+resultados preenchidos, pronta para o estágio de pós-processamento do
+pipeline daquela câmera.
+
+O lote nunca espera mais que max_wait depois do primeiro frame chegar: a
+câmera atrasada fica para o próximo lote em vez de segurar as outras.
+"""
+
+import threading
+import time
+
+try:
+    from .pipeline import FramePacket, LatestQueue, StageStats
+except ImportError:  # Executado como script
+    from pipeline import FramePacket, LatestQueue, StageStats
+
+
+class _CameraEntry:
+    """Câmera registrada no worker"""
+
+    def __init__(self, name, camera, queue, keep_frames):
+        self.name = name
+        self.camera = camera
+        self.queue = queue
+        self.keep_frames = keep_frames
+        self.last_seq = 0
+
+
+class BatchInferenceWorker:
+    """Thread que agrupa frames de várias câmeras e roda um forward por lote"""
+
+    def __init__(self, engine, max_wait=0.004, imgsz=None, poll=0.0005):
+        """
+        Args:
+            engine: DirectEngine compartilhado (um modelo para todas as câmeras)
+            max_wait: Espera máxima (segundos) pelas outras câmeras depois
+                que o primeiro frame do lote chegou
+            imgsz: Lado da entrada (padrão: o do engine)
+            poll: Intervalo de consulta às câmeras enquanto espera
+        """
+        self.engine = engine
+        self.max_wait = max_wait
+        self.imgsz = imgsz
+        self.poll = poll
+
+        self.lock = threading.Lock()
+        self.cameras = {}
+        self.running = False
+        self.thread = None
+
+        # Estatísticas
+        self.batches = 0
+        self.batched_frames = 0
+        self.camera_frames = {}  # Nome -> frames inferidos (inclusive câmeras já removidas)
+        self.wait_stats = StageStats()
+        self.forward_stats = StageStats()
+
+    def register(self, name, camera, maxsize=1, keep_frames=False):
+        """
+        Adiciona uma câmera ao lote
+
+        Args:
+            name: Nome da câmera (estatísticas e fila)
+            camera: CameraManager (ou fonte com a mesma interface)
+            maxsize: Pacotes guardados na fila de saída antes de descartar
+            keep_frames: Mantém o frame emprestado no pacote (exibição);
+                False devolve ao buffer da câmera logo após a inferência
+
+        Returns:
+            LatestQueue de FramePacket com 'results' preenchido; fecha quando
+            a câmera para ou o worker é parado
+        """
+        queue = LatestQueue(f"lote:{name}", maxsize=maxsize, on_drop=FramePacket.release)
+        with self.lock:
+            if name in self.cameras:
+                raise ValueError(f"Câmera '{name}' já registrada")
+            self.cameras[name] = _CameraEntry(name, camera, queue, keep_frames)
+        return queue
+
+    def unregister(self, name):
+        """Remove a câmera do lote e fecha sua fila"""
+        with self.lock:
+            entry = self.cameras.pop(name, None)
+        if entry is not None:
+            entry.queue.close(drain=True)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="batch-inference", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=3.0):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout)
+        with self.lock:
+            entries = list(self.cameras.values())
+        for entry in entries:
+            entry.queue.close(drain=True)
+
+    def _loop(self):
+        while self.running:
+            batch = self._gather()
+            if not batch:
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                outputs = self.engine.infer_batch([packet.frame for _, packet in batch], self.imgsz)
+            except Exception as e:
+                self.forward_stats.errors += 1
+                print(f"❌ Erro na inferência em lote: {e}")
+                for _, packet in batch:
+                    packet.release()
+                continue
+            self.forward_stats.record(time.perf_counter() - t0)
+            self.batches += 1
+            self.batched_frames += len(batch)
+
+            for (entry, packet), out in zip(batch, outputs):
+                # Saída do engine é um buffer reutilizado: cada câmera leva sua cópia
+                packet.results = [out.copy()]
+                if not entry.keep_frames:
+                    packet.release()
+                self.camera_frames[entry.name] = self.camera_frames.get(entry.name, 0) + 1
+                entry.queue.put(packet)
+
+    def _gather(self):
+        """
+        Frame mais novo de cada câmera, esperando no máximo max_wait pelas
+        atrasadas depois do primeiro
+
+        Returns:
+            list[(entry, FramePacket)] (vazia se nenhum frame chegou)
+        """
+        batch = []
+        pending = None
+        deadline = None
+        while self.running:
+            with self.lock:
+                entries = list(self.cameras.values())
+            if pending is None:
+                pending = {entry.name: entry for entry in entries}
+
+            for name, entry in list(pending.items()):
+                if not entry.camera.is_running:
+                    # Fonte acabou (gravação) ou parou: avisa o pipeline dela
+                    entry.queue.close()
+                    del pending[name]
+                    continue
+                ref = entry.camera.wait_for_frame(entry.last_seq, timeout=0)
+                if ref is None:
+                    continue
+                entry.last_seq = ref.seq
+                batch.append((entry, FramePacket(ref)))
+                del pending[name]
+
+            if batch and deadline is None:
+                wait_start = time.perf_counter()
+                deadline = wait_start + self.max_wait
+            if not pending or (deadline is not None and time.perf_counter() >= deadline):
+                break
+            time.sleep(self.poll)
+
+        if batch:
+            self.wait_stats.record(time.perf_counter() - wait_start)
+        else:
+            time.sleep(self.poll)  # Nenhuma câmera ativa: não gira em falso
+        return batch
+
+    def stats(self):
+        """
+        Returns:
+            dict com lotes, tamanho médio do lote, espera média pelo lote
+            (ms), forward médio (ms) e frames por câmera
+        """
+        return {
+            'batches': self.batches,
+            'avg_batch': self.batched_frames / self.batches if self.batches else 0.0,
+            'wait_ms': self.wait_stats.snapshot()['avg_ms'],
+            'forward_ms': self.forward_stats.snapshot()['avg_ms'],
+            'cameras': dict(self.camera_frames),
+        }
@@ -0,0 +1,214 @@
+"""
+Calibração intrínseca da câmera (tabuleiro de xadrez) e tabela pixel -> raio
+
+A calibração (matriz K + distorção) é medida uma vez com
+tools/calibrate_camera.py nos frames já no formato do CameraManager
+(quadrados, CAMERA_WIDTH) e salva em .npz. Na partida, o SpatialProcessor
+carrega o arquivo e monta uma tabela (H, W, 2) com o raio sem distorção de
+cada pixel, em coordenadas normalizadas (X/Z, Y/Z): por frame, cada caixa
+vira raio com um índice no array, sem cv2.undistortPoints.
+
+Extrínseca: pose da câmera em relação ao robô/chão, medida com marcadores no
+chão (tools/calibrate_extrinsics.py) e guardada como uma matriz 4x4
+mundo <- câmera. Mundo: origem no robô, X/Y no plano do chão, Z para cima
+(altura), que é o que a física espera.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+
+class CameraCalibration:
+    """Intrínsecos + distorção para um tamanho de imagem"""
+
+    def __init__(self, camera_matrix, dist_coeffs, image_size, rms=None):
+        """
+        Args:
+            camera_matrix: Matriz K 3x3 (pixels)
+            dist_coeffs: Coeficientes de distorção do OpenCV (k1, k2, p1, p2, k3, ...)
+            image_size: (largura, altura) das imagens calibradas
+            rms: Erro de reprojeção da calibração (pixels)
+        """
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64).reshape(3, 3)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64).ravel()
+        self.image_size = (int(image_size[0]), int(image_size[1]))
+        self.rms = rms
+
+    @classmethod
+    def pinhole(cls, focal_length, width, height):
+        """Câmera ideal (sem distorção) com foco único e centro na imagem"""
+        matrix = np.array([[focal_length, 0, width // 2], [0, focal_length, height // 2], [0, 0, 1]], dtype=np.float64)
+        return cls(matrix, np.zeros(5), (width, height))
+
+    @property
+    def fx(self):
+        return self.camera_matrix[0, 0]
+
+    @property
+    def fy(self):
+        return self.camera_matrix[1, 1]
+
+    @property
+    def principal_point(self):
+        return self.camera_matrix[0, 2], self.camera_matrix[1, 2]
+
+    def scaled_to(self, width, height):
+        """
+        Mesma câmera em outra resolução (distorção é em coordenadas
+        normalizadas e não muda; K escala com a imagem)
+        """
+        if (width, height) == self.image_size:
+            return self
+        sx, sy = width / self.image_size[0], height / self.image_size[1]
+        matrix = self.camera_matrix.copy()
+        matrix[0] *= sx
+        matrix[1] *= sy
+        return CameraCalibration(matrix, self.dist_coeffs, (width, height), self.rms)
+
+    def ray_table(self):
+        """
+        Raio sem distorção de cada pixel
+
+        Returns:
+            np.ndarray (altura, largura, 2) float32 com (X/Z, Y/Z) do centro
+            de cada pixel
+        """
+        width, height = self.image_size
+        u, v = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+        pixels = np.stack([u.ravel(), v.ravel()], axis=1).reshape(-1, 1, 2)
+        rays = cv2.undistortPoints(pixels, self.camera_matrix, self.dist_coeffs)
+        return rays.reshape(height, width, 2)
+
+    def project(self, points):
+        """
+        Pontos 3D (N, 3) na câmera -> pixels (N, 2), com distorção
+
+        Pontos atrás da câmera saem como NaN
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        pixels = np.full((len(points), 2), np.nan)
+        front = points[:, 2] > 0
+        if front.any():
+            projected, _ = cv2.projectPoints(points[front], np.zeros(3), np.zeros(3),
+                                             self.camera_matrix, self.dist_coeffs)
+            pixels[front] = projected.reshape(-1, 2)
+        return pixels
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path, camera_matrix=self.camera_matrix, dist_coeffs=self.dist_coeffs,
+                 image_size=np.array(self.image_size), rms=np.nan if self.rms is None else self.rms)
+
+
+def load_calibration(path):
+    """
+    Carrega a calibração salva por CameraCalibration.save
+
+    Returns:
+        CameraCalibration ou None se o arquivo não existir
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        rms = float(data['rms']) if 'rms' in data and np.isfinite(data['rms']) else None
+        return CameraCalibration(data['camera_matrix'], data['dist_coeffs'], tuple(data['image_size']), rms)
+
+
+def find_board(image, board_size):
+    """
+    Cantos internos do tabuleiro com precisão subpixel
+
+    Args:
+        image: Imagem BGR ou cinza
+        board_size: (colunas, linhas) de cantos internos
+
+    Returns:
+        np.ndarray (colunas * linhas, 1, 2) float32 ou None se não achou
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    flags = cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE
+    found, corners = cv2.findChessboardCorners(gray, board_size, flags=flags)
+    if not found:
+        return None
+    criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_MAX_ITER, 30, 1e-3)
+    return cv2.cornerSubPix(gray, corners, (5, 5), (-1, -1), criteria)
+
+
+def calibrate(corner_sets, board_size, square_size, image_size):
+    """
+    Calibra K e distorção a partir dos cantos de várias vistas do tabuleiro
+
+    Args:
+        corner_sets: Lista de saídas de find_board (uma por imagem)
+        board_size: (colunas, linhas) de cantos internos
+        square_size: Lado do quadrado (metros; só escala os extrínsecos)
+        image_size: (largura, altura)
+
+    Returns:
+        CameraCalibration
+    """
+    cols, rows = board_size
+    board = np.zeros((cols * rows, 3), dtype=np.float32)
+    board[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2) * square_size
+
+    rms, matrix, dist, _, _ = cv2.calibrateCamera(
+        [board] * len(corner_sets), corner_sets, image_size, None, None)
+    return CameraCalibration(matrix, dist, image_size, rms)
+
+
+def solve_extrinsics(world_points, image_points, calibration):
+    """
+    Pose da câmera a partir de marcadores com posição conhecida
+
+    Args:
+        world_points: Array (N, 3) em metros no referencial do mundo (N >= 4)
+        image_points: Array (N, 2) com os pixels correspondentes
+        calibration: CameraCalibration da imagem dos pixels
+
+    Returns:
+        (matriz 4x4 mundo <- câmera, erro de reprojeção em pixels)
+    """
+    world_points = np.asarray(world_points, dtype=np.float64).reshape(-1, 3)
+    image_points = np.asarray(image_points, dtype=np.float64).reshape(-1, 2)
+    if len(world_points) < 4:
+        raise ValueError("São necessários pelo menos 4 marcadores")
+
+    # Marcadores no chão são coplanares: IPPE é o método exato para esse caso
+    planar = np.ptp(world_points[:, 2]) < 1e-9
+    method = cv2.SOLVEPNP_IPPE if planar else cv2.SOLVEPNP_ITERATIVE
+    ok, rvec, tvec = cv2.solvePnP(world_points, image_points, calibration.camera_matrix,
+                                  calibration.dist_coeffs, flags=method)
+    if not ok:
+        raise RuntimeError("solvePnP não convergiu")
+
+    projected, _ = cv2.projectPoints(world_points, rvec, tvec, calibration.camera_matrix, calibration.dist_coeffs)
+    rms = float(np.sqrt(np.mean(np.sum((projected.reshape(-1, 2) - image_points) ** 2, axis=1))))
+
+    # solvePnP dá câmera <- mundo; a física precisa do inverso
+    rotation, _ = cv2.Rodrigues(rvec)
+    transform = np.eye(4)
+    transform[:3, :3] = rotation.T
+    transform[:3, 3] = -rotation.T @ tvec.ravel()
+    return transform, rms
+
+
+def save_extrinsics(path, transform, rms=None):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez(path, world_from_camera=np.asarray(transform, dtype=np.float64),
+             rms=np.nan if rms is None else rms)
+
+
+def load_extrinsics(path):
+    """
+    Carrega a matriz salva por save_extrinsics
+
+    Returns:
+        np.ndarray 4x4 mundo <- câmera ou None se o arquivo não existir
+        (quem usa trata None como identidade)
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return np.asarray(data['world_from_camera'], dtype=np.float64).reshape(4, 4)
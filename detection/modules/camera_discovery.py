@@ -0,0 +1,278 @@
+"""
+Descoberta de câmeras - sondagem paralela com timeout e cache em disco
+
+Cada dispositivo é sondado em sua própria thread (só com os backends que
+existem neste SO) e o resultado fica em cache com invalidação, para que uma
+inicialização normal abra a câmera conhecida sem varrer tudo de novo.
+"""
+
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+try:
+    from . import gst_pipeline
+except ImportError:  # Executado como script
+    import gst_pipeline
+
+CACHE_VERSION = 1
+CACHE_TTL = 24 * 3600  # Sem assinatura de dispositivos (Windows/macOS): expira em 1 dia
+DEFAULT_PROBE_TIMEOUT = 2.0
+DEFAULT_MAX_DEVICES = 10
+FOURCC_CANDIDATES = ("MJPG", "YUYV")
+
+
+def cache_path():
+    """Arquivo de cache (XDG_CACHE_HOME / LOCALAPPDATA / ~/.cache)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "lixeira-inteligente", "cameras.json")
+
+
+def platform_backends():
+    """
+    Backends de câmera deste SO que o OpenCV realmente tem
+
+    Returns:
+        list[(api_id, nome)] em ordem de prioridade
+    """
+    if sys.platform.startswith("win"):
+        wanted = [(cv2.CAP_DSHOW, "DirectShow"), (cv2.CAP_MSMF, "MSMF")]
+    elif sys.platform == "darwin":
+        wanted = [(cv2.CAP_AVFOUNDATION, "AVFoundation")]
+    else:
+        wanted = [(cv2.CAP_V4L2, "V4L2")]
+
+    try:
+        available = set(cv2.videoio_registry.getCameraBackends())
+    except Exception:
+        return wanted
+    return [(api, name) for api, name in wanted if api in available] or [(cv2.CAP_ANY, "Auto")]
+
+
+def candidate_devices(max_devices=DEFAULT_MAX_DEVICES):
+    """No Linux só os /dev/videoN existentes; nos demais SOs, 0..max_devices-1"""
+    if gst_pipeline.is_linux():
+        ids = []
+        for path in glob.glob("/dev/video*"):
+            suffix = path[len("/dev/video"):]
+            if suffix.isdigit():
+                ids.append(int(suffix))
+        return sorted(i for i in ids if i < max_devices)
+    return list(range(max_devices))
+
+
+def device_signature():
+    """
+    Assinatura dos dispositivos conectados: muda quando câmeras são
+    plugadas/renumeradas (None quando o SO não permite calcular)
+    """
+    if not gst_pipeline.is_linux():
+        return None
+    entries = []
+    for path in sorted(glob.glob("/dev/video*") + glob.glob("/dev/v4l/by-id/*")):
+        try:
+            st = os.stat(path)
+            target = os.path.realpath(path)
+            entries.append(f"{path}->{target}:{st.st_rdev}:{int(st.st_ctime)}")
+        except OSError:
+            continue
+    return "|".join(entries)
+
+
+def _fourcc_to_str(value):
+    value = int(value)
+    if value <= 0:
+        return None
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+def _supported_fourccs(cap, index):
+    """FOURCCs aceitos: v4l2-ctl no Linux, ou teste de set/get no backend"""
+    if gst_pipeline.is_linux():
+        formats = gst_pipeline.list_v4l2_formats(gst_pipeline.device_path(index))
+        if formats:
+            return sorted(formats)
+
+    current = cap.get(cv2.CAP_PROP_FOURCC)
+    supported = []
+    for fourcc in FOURCC_CANDIDATES:
+        if cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc)) and \
+                _fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)) == fourcc:
+            supported.append(fourcc)
+    if current > 0:
+        cap.set(cv2.CAP_PROP_FOURCC, current)
+    return supported
+
+
+def probe_device(index, backends):
+    """
+    Sonda um dispositivo (tenta os backends em ordem, um frame cada)
+
+    Returns:
+        dict {'id', 'resolution', 'backend', 'backend_name', 'fourccs'} ou None
+    """
+    for api, name in backends:
+        cap = None
+        try:
+            cap = cv2.VideoCapture(index, api)
+            if not cap.isOpened():
+                continue
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                continue
+            h, w = frame.shape[:2]
+            return {
+                'id': index,
+                'resolution': f"{w}x{h}",
+                'backend': int(api),
+                'backend_name': name,
+                'fourccs': _supported_fourccs(cap, index),
+            }
+        except Exception:
+            continue
+        finally:
+            if cap is not None:
+                cap.release()
+    return None
+
+
+def probe_all(devices, backends, timeout=DEFAULT_PROBE_TIMEOUT):
+    """
+    Sonda todos os dispositivos em paralelo
+
+    Threads daemon: um driver travado no open() é abandonado após o timeout
+    em vez de segurar a inicialização.
+    """
+    results = {}
+
+    def worker(index):
+        info = probe_device(index, backends)
+        if info is not None:
+            results[index] = info
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in devices]
+    for t in threads:
+        t.start()
+
+    deadline = time.monotonic() + timeout
+    for t in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+
+    return [results[i] for i in sorted(results)]
+
+
+def load_cache():
+    """
+    Lê o cache se ainda válido (mesma versão, assinatura e dentro do TTL)
+
+    Returns:
+        dict do cache ou None
+    """
+    try:
+        with open(cache_path()) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if data.get('version') != CACHE_VERSION:
+        return None
+    signature = device_signature()
+    if signature is not None:
+        if data.get('signature') != signature:
+            return None
+    elif time.time() - data.get('created', 0) > CACHE_TTL:
+        return None
+    return data
+
+
+def save_cache(cameras, opened=None):
+    """Grava câmeras descobertas (e o último backend aberto por ID)"""
+    data = load_cache() or {}
+    data.update({
+        'version': CACHE_VERSION,
+        'signature': device_signature(),
+        'created': time.time(),
+        'cameras': cameras,
+    })
+    if opened is not None:
+        data['opened'] = opened
+    data.setdefault('opened', {})
+
+    path = cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️  Não foi possível gravar cache de câmeras: {e}")
+
+
+def invalidate_cache():
+    """Remove o cache (ex: câmera do cache não abriu mais)"""
+    try:
+        os.remove(cache_path())
+    except OSError:
+        pass
+
+
+def discover_cameras(max_devices=DEFAULT_MAX_DEVICES, timeout=DEFAULT_PROBE_TIMEOUT,
+                     refresh=False):
+    """
+    Lista câmeras disponíveis, usando o cache quando válido
+
+    Args:
+        max_devices: Maior ID sondado (exclusivo)
+        timeout: Tempo total máximo da sondagem paralela (segundos)
+        refresh: Ignora o cache e sonda novamente
+
+    Returns:
+        list[dict] - ver probe_device()
+    """
+    if not refresh:
+        cached = load_cache()
+        if cached is not None and cached.get('cameras'):
+            # O cache pode vir de uma sondagem com max_devices maior
+            cameras = [cam for cam in cached['cameras'] if cam['id'] < max_devices]
+            if cameras:
+                return cameras
+
+    cameras = probe_all(candidate_devices(max_devices), platform_backends(), timeout)
+    save_cache(cameras)
+    return cameras
+
+
+def cached_backend(src):
+    """Nome do backend do CameraManager que abriu 'src' da última vez (ou None)"""
+    cached = load_cache()
+    if cached is None:
+        return None
+    return cached.get('opened', {}).get(str(src))
+
+
+def remember_backend(src, backend_name):
+    """Registra qual backend do CameraManager abriu 'src' com sucesso"""
+    cached = load_cache() or {}
+    opened = dict(cached.get('opened', {}))
+    if opened.get(str(src)) == backend_name:
+        return
+    opened[str(src)] = backend_name
+    save_cache(cached.get('cameras', []), opened)
+
+
+def forget_backend(src):
+    """Esquece o backend de 'src' (abertura pelo cache falhou)"""
+    cached = load_cache()
+    if cached is None or str(src) not in cached.get('opened', {}):
+        return
+    opened = dict(cached['opened'])
+    del opened[str(src)]
+    save_cache(cached.get('cameras', []), opened)
@@ -1,54 +1,184 @@
 import cv2 
+import os
 import threading
 import time
 import numpy as np
 
+try:
+    from .frame_buffer import FrameRingBuffer, DEFAULT_SLOTS
+    from .frame_bus import FrameBusPublisher, DEFAULT_BUS_SLOTS
+    from . import gst_pipeline
+    from . import camera_discovery
+except ImportError:  # Executado como script
+    from frame_buffer import FrameRingBuffer, DEFAULT_SLOTS
+    from frame_bus import FrameBusPublisher, DEFAULT_BUS_SLOTS
+    import gst_pipeline
+    import camera_discovery
+
 DEFAULT_FPS = 30
 DEFAULT_SIZE = 640
 
+# Modos de captura
+CAPTURE_PACED = "paced"    # read() + sleep(1/fps) (comportamento original)
+CAPTURE_LATEST = "latest"  # grab() no ritmo do driver, decodifica só o frame mais novo
+DEFAULT_CAPTURE_MODE = CAPTURE_PACED
+
+# Backends de captura
+BACKEND_AUTO = "auto"            # Linux: GStreamer -> V4L2 -> auto; Windows: DSHOW -> MSMF -> auto
+BACKEND_GSTREAMER = "gstreamer"  # Pipeline faz crop/resize/BGR (frame já chega no tamanho final)
+BACKEND_V4L2 = "v4l2"            # V4L2 direto com FOURCC negociado (crop/resize no Python)
+BACKEND_DEFAULT = "default"      # Comportamento original (DSHOW -> MSMF -> auto)
+BACKENDS = (BACKEND_AUTO, BACKEND_GSTREAMER, BACKEND_V4L2, BACKEND_DEFAULT)
+DEFAULT_CAPTURE_RESOLUTION = (640, 480)
+DEFAULT_WARMUP_FRAMES = 10  # Leituras descartadas após abrir (estabiliza exposição)
+
+# grab() que retorna em menos que esta fração do período veio da fila do driver
+STALE_GRAB_FRACTION = 0.25
+MAX_FLUSH_GRABS = 4
+
 
 class CameraManager:
     """Gerenciador de câmera que captura frames em thread separada"""
     
-    def __init__(self, src=0, size=DEFAULT_SIZE, fps=DEFAULT_FPS):
+    def __init__(self, src=0, size=DEFAULT_SIZE, fps=DEFAULT_FPS, buffer_slots=DEFAULT_SLOTS,
+                 capture_mode=DEFAULT_CAPTURE_MODE, backend=BACKEND_DEFAULT,
+                 capture_resolution=DEFAULT_CAPTURE_RESOLUTION,
+                 warmup_frames=DEFAULT_WARMUP_FRAMES, use_cache=True,
+                 publish_name=None, bus_slots=DEFAULT_BUS_SLOTS):
+        """
+        Args:
+            src: ID da câmera, caminho (/dev/videoN, arquivo) ou pipeline GStreamer
+            size: Lado do frame quadrado entregue
+            fps: FPS desejado
+            buffer_slots: Slots do ring buffer de frames
+            capture_mode: CAPTURE_PACED ou CAPTURE_LATEST
+            backend: Um de BACKENDS
+            capture_resolution: (largura, altura) nativa pedida à câmera
+                (usada pelos backends GStreamer e V4L2)
+            warmup_frames: Leituras descartadas após abrir a câmera
+            use_cache: Tentar primeiro o backend que abriu esta câmera da última vez
+            publish_name: Se definido, publica os frames no barramento de
+                memória compartilhada com este nome (ver frame_bus)
+            bus_slots: Slots do barramento compartilhado
+        """
+        if capture_mode not in (CAPTURE_PACED, CAPTURE_LATEST):
+            raise ValueError(f"capture_mode inválido: {capture_mode!r}")
+        if backend not in BACKENDS:
+            raise ValueError(f"backend inválido: {backend!r} (opções: {BACKENDS})")
+        
         self.src = src
         self.size = size
         self.fps = fps
-        self.frame = None
-        self.ret = False
+        self.capture_mode = capture_mode
+        self.backend = backend
+        self.capture_resolution = tuple(capture_resolution)
+        self.warmup_frames = warmup_frames
+        self.use_cache = use_cache
+        self.publish_name = publish_name
+        self.bus_slots = bus_slots
+        self.bus = None  # FrameBusPublisher (criado em start())
+        self.backend_name = None
         self.is_running = False
-        self.lock = threading.Lock()
         self.cap = None
         
+        # Estatísticas de captura
+        self.native_fps = float(fps)
+        self.frames_captured = 0
+        self.frames_flushed = 0  # Frames velhos descartados da fila do driver
+        self.frames_missed = 0   # Lacunas no ritmo do driver (frames perdidos)
+        self.last_age = 0.0      # Idade do último frame entregue (segundos)
+        self._last_grab = None
+        
+        # Frames pré-alocados: captura escreve nos slots, consumidores pegam emprestado
+        self.buffer = FrameRingBuffer((size, size, 3), slots=buffer_slots)
+        self._raw = None  # Frame bruto reutilizado por cap.read()
+        self._prescaled = False  # Backend já entrega frames no tamanho final
+        
         # Tenta abrir a câmera com diferentes backends
         self._open_camera()
     
+    def _candidate_backends(self):
+        """
+        Lista de (nome, abertura) na ordem de prioridade para o backend escolhido
+        
+        Returns:
+            list[(str, callable)] - cada callable retorna um cv2.VideoCapture
+        """
+        src = self.src
+        width, height = self.capture_resolution
+        
+        windows = [
+            ("DirectShow (Windows)", lambda: cv2.VideoCapture(src, cv2.CAP_DSHOW)),
+            ("Media Foundation (Windows)", lambda: cv2.VideoCapture(src, cv2.CAP_MSMF)),
+        ]
+        auto = [("Auto-detect", lambda: cv2.VideoCapture(src, cv2.CAP_ANY))]
+        
+        if self.backend == BACKEND_DEFAULT:
+            return windows + auto
+        
+        # Pipeline GStreamer passado diretamente como src
+        if isinstance(src, str) and "!" in src:
+            return [("GStreamer (pipeline)", lambda: cv2.VideoCapture(src, cv2.CAP_GSTREAMER))]
+        
+        is_device = isinstance(src, int) or str(src).startswith("/dev/video")
+        linux = []
+        if gst_pipeline.is_linux() and is_device:
+            device = gst_pipeline.device_path(src)
+            if self.backend in (BACKEND_AUTO, BACKEND_GSTREAMER) and gst_pipeline.gstreamer_available():
+                def open_gst():
+                    pipeline = gst_pipeline.build_pipeline(device, width, height, self.fps, self.size)
+                    print(f"  Pipeline: {pipeline}")
+                    return cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+                linux.append(("GStreamer (V4L2)", open_gst))
+            if self.backend in (BACKEND_AUTO, BACKEND_V4L2):
+                def open_v4l2():
+                    fmt = gst_pipeline.negotiate_format(device, width, height)
+                    return gst_pipeline.open_v4l2(device, width, height, self.fps, fmt)
+                linux.append(("V4L2", open_v4l2))
+        
+        if gst_pipeline.is_linux() or self.backend != BACKEND_AUTO:
+            return linux + auto
+        return windows + auto
+    
     def _open_camera(self):
         """Tenta abrir a câmera com diferentes backends"""
         print(f"🔍 Tentando abrir câmera {self.src}...")
         
-        # Lista de backends para tentar (ordem de prioridade)
-        backends = [
-            (cv2.CAP_DSHOW, "DirectShow (Windows)"),
-            (cv2.CAP_MSMF, "Media Foundation (Windows)"),
-            (cv2.CAP_ANY, "Auto-detect"),
-        ]
+        candidates = self._candidate_backends()
+        
+        # Backend que funcionou da última vez vai para o início (abre direto)
+        cached = None
+        if self.use_cache and self._is_device():
+            cached = camera_discovery.cached_backend(self.src)
+            if cached is not None:
+                candidates.sort(key=lambda c: c[0] != cached)
+                if candidates[0][0] != cached:
+                    cached = None
         
-        for backend, name in backends:
-            print(f"  Tentando {name}...")
+        for name, opener in candidates:
+            print(f"  Tentando {name}{' (cache)' if name == cached else ''}...")
             try:
-                self.cap = cv2.VideoCapture(self.src, backend)
+                self.cap = opener()
                 
                 if self.cap.isOpened():
                     # Testa se consegue ler um frame
                     ret, test_frame = self.cap.read()
                     if ret and test_frame is not None:
                         print(f"  ✅ Câmera aberta com sucesso usando {name}")
+                        self.backend_name = name
+                        if self.use_cache and self._is_device():
+                            camera_discovery.remember_backend(self.src, name)
+                        
+                        # Backend já faz crop/resize: captura lê direto no slot do buffer
+                        self._prescaled = test_frame.shape == self.buffer.shape
+                        if self._prescaled:
+                            print(f"  ⚡ Frames já chegam em {self.size}x{self.size} (sem crop/resize no Python)")
                         
                         # Aquece a câmera
-                        print("  Aquecendo câmera...")
-                        for _ in range(10):
-                            self.cap.read()
+                        if self.warmup_frames > 0:
+                            print("  Aquecendo câmera...")
+                            for _ in range(self.warmup_frames):
+                                self.cap.read()
                         print("  ✅ Câmera pronta!")
                         return
                     else:
@@ -58,6 +188,10 @@ class CameraManager:
                     print(f"  ❌ Não conseguiu abrir com {name}")
             except Exception as e:
                 print(f"  ❌ Erro ao tentar {name}: {e}")
+            
+            if name == cached:
+                # Cache apontou para um backend que não abre mais
+                camera_discovery.forget_backend(self.src)
         
         # Se chegou aqui, nenhum backend funcionou
         self._show_available_cameras()
@@ -71,23 +205,19 @@ class CameraManager:
             f"\nTente fechar outros programas que podem estar usando a câmera."
         )
     
+    def _is_device(self):
+        """src é uma câmera (ID ou /dev/videoN), não arquivo nem pipeline"""
+        return isinstance(self.src, int) or str(self.src).startswith("/dev/video")
+    
     @staticmethod
     def _show_available_cameras(max_test=5):
-        """Lista câmeras disponíveis no sistema"""
+        """Lista câmeras disponíveis no sistema (sonda de novo: o cache falhou)"""
         print("\n🔍 Procurando câmeras disponíveis...")
-        available = []
+        cameras = camera_discovery.discover_cameras(max_test, refresh=True)
+        available = [cam['id'] for cam in cameras]
         
-        for i in range(max_test):
-            try:
-                cap = cv2.VideoCapture(i, cv2.CAP_ANY)
-                if cap.isOpened():
-                    ret, _ = cap.read()
-                    if ret:
-                        available.append(i)
-                        print(f"  ✅ Câmera encontrada no ID: {i}")
-                cap.release()
-            except:
-                pass
+        for cam in cameras:
+            print(f"  ✅ Câmera encontrada no ID: {cam['id']} ({cam['backend_name']})")
         
         if available:
             print(f"\n💡 Câmeras disponíveis: {available}")
@@ -97,31 +227,19 @@ class CameraManager:
             print("💡 Verifique se a câmera está conectada e os drivers instalados")
     
     @staticmethod
-    def list_cameras(max_test=10):
-        """Lista todas as câmeras disponíveis"""
+    def list_cameras(max_test=10, refresh=False):
+        """
+        Lista todas as câmeras disponíveis (sondagem paralela + cache em disco)
+        
+        Returns:
+            list[dict] com 'id', 'resolution', 'backend', 'backend_name', 'fourccs'
+        """
         print("🔍 Procurando câmeras disponíveis...")
-        available = []
+        available = camera_discovery.discover_cameras(max_test, refresh=refresh)
         
-        for i in range(max_test):
-            try:
-                # Tenta diferentes backends
-                for backend in [cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY]:
-                    cap = cv2.VideoCapture(i, backend)
-                    if cap.isOpened():
-                        ret, frame = cap.read()
-                        if ret and frame is not None:
-                            h, w = frame.shape[:2]
-                            available.append({
-                                'id': i,
-                                'resolution': f"{w}x{h}",
-                                'backend': backend
-                            })
-                            print(f"  ✅ ID {i}: {w}x{h}")
-                            cap.release()
-                            break
-                    cap.release()
-            except Exception as e:
-                pass
+        for cam in available:
+            fourccs = ",".join(cam['fourccs']) or "?"
+            print(f"  ✅ ID {cam['id']}: {cam['resolution']} ({cam['backend_name']}, {fourccs})")
         
         if available:
             print(f"\n✅ Total de câmeras encontradas: {len(available)}")
@@ -139,38 +257,62 @@ class CameraManager:
         if not self.cap or not self.cap.isOpened():
             raise ValueError("Câmera não está aberta. Não é possível iniciar.")
         
+        if self.capture_mode == CAPTURE_LATEST:
+            self._configure_latest()
+        
+        if self.publish_name and self.bus is None:
+            self.bus = FrameBusPublisher(self.publish_name, self.buffer.shape, slots=self.bus_slots)
+            print(f"  📡 Publicando frames no barramento '{self.publish_name}'")
+        
         self.is_running = True
+        self.buffer.open()
         self.thread = threading.Thread(target=self._capture_loop, daemon=True)
         self.thread.start()
         print("✅ Captura iniciada em thread separada")
         return self
     
+    def _configure_latest(self):
+        """Fila do driver com 1 frame e FPS nativo do dispositivo"""
+        if not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+            print("  ⚠️  Backend não aceita CAP_PROP_BUFFERSIZE; descartando frames velhos via grab()")
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        
+        native = self.cap.get(cv2.CAP_PROP_FPS)
+        if native and native > 0:
+            self.native_fps = float(native)
+        print(f"  ⏱️  Captura no ritmo do driver ({self.native_fps:.0f} FPS nativo)")
+    
     def _capture_loop(self):
         """Loop de captura (roda em thread separada)"""
         consecutive_failures = 0
         max_failures = 30  # 30 falhas consecutivas = ~1 segundo
+        latest = self.capture_mode == CAPTURE_LATEST
         
         try:
             while self.is_running:
-                ret, frame = self.cap.read()
+                # Frame já no tamanho final: decodifica direto no slot do buffer
+                index, slot = self.buffer.acquire_write() if self._prescaled else (None, None)
+                target = slot if slot is not None else self._raw
                 
-                if ret and frame is not None:
+                if latest:
+                    ret, timestamp = self._grab_latest()
+                    raw = None
+                    if ret:
+                        ret, raw = self.cap.retrieve(target)
+                else:
+                    # Reutiliza o array do frame anterior (sem alocação por frame)
+                    ret, raw = self.cap.read(target)
+                    timestamp = time.monotonic()
+                
+                if ret and raw is not None:
                     consecutive_failures = 0  # Reset contador
-                    
-                    # Crop para quadrado (pega o centro da imagem)
-                    h, w = frame.shape[:2]
-                    size = min(h, w)
-                    start_x = (w - size) // 2
-                    start_y = (h - size) // 2
-                    frame = frame[start_y:start_y + size, start_x:start_x + size]
-                    
-                    # Redimensiona para o tamanho desejado
-                    frame = cv2.resize(frame, (self.size, self.size))
-                    
-                    # Atualiza frame com thread-safe
-                    with self.lock:
-                        self.frame = frame
-                        self.ret = ret
+                    self.frames_captured += 1
+                    if slot is not None and raw is slot:
+                        seq = self.buffer.publish(index, timestamp)
+                        self._publish_bus(slot, seq, timestamp, None)
+                    else:
+                        self._raw = raw
+                        self._store_frame(raw, timestamp)
                 else:
                     consecutive_failures += 1
                     if consecutive_failures >= max_failures:
@@ -178,18 +320,149 @@ class CameraManager:
                         self.is_running = False
                         break
                 
-                # Controla FPS
-                time.sleep(1 / self.fps)
+                # Controla FPS (no modo latest quem dita o ritmo é o grab())
+                if not latest:
+                    time.sleep(1 / self.fps)
         except Exception as e:
             print(f"❌ Erro no loop de captura: {e}")
             self.is_running = False
     
+    def _grab_latest(self):
+        """
+        grab() bloqueia até o próximo frame do driver; grabs que retornam
+        imediatamente vieram da fila (velhos) e são descartados sem decodificar.
+        Só o frame mais novo passa por retrieve() (feito pelo chamador).
+        
+        Returns:
+            (grabbed, timestamp)
+        """
+        period = 1.0 / self.native_fps
+        last = self._last_grab
+        
+        t0 = time.monotonic()
+        # Processamento passou de um período: a fila do driver pode ter frames velhos
+        behind = self._is_live_source() and last is not None and t0 - last > period
+        grabbed = self.cap.grab()
+        timestamp = time.monotonic()
+        
+        flushed = 0
+        while (grabbed and behind and flushed < MAX_FLUSH_GRABS
+               and timestamp - t0 < period * STALE_GRAB_FRACTION):
+            t0 = timestamp
+            grabbed = self.cap.grab()
+            timestamp = time.monotonic()
+            flushed += 1
+        
+        if not grabbed:
+            return False, timestamp
+        
+        self.frames_flushed += flushed
+        
+        # Lacuna maior que 1,5 período (além dos descartados) = driver perdeu frames
+        if last is not None:
+            gap = (timestamp - last) / period
+            if gap > 1.5:
+                self.frames_missed += max(0, int(round(gap)) - 1 - flushed)
+        self._last_grab = timestamp
+        return True, timestamp
+    
+    def _is_live_source(self):
+        """Arquivos de vídeo não têm fila de driver: não descartar frames"""
+        return not (isinstance(self.src, str) and os.path.isfile(self.src))
+    
+    def _store_frame(self, raw, timestamp, captured_at=None):
+        """Faz crop quadrado + resize direto em um slot livre do buffer"""
+        index, slot = self.buffer.acquire_write()
+        if index is None:
+            # Todos os slots emprestados: descarta o frame em vez de alocar
+            return False
+        
+        # Crop para quadrado (pega o centro da imagem) - apenas uma view
+        h, w = raw.shape[:2]
+        size = min(h, w)
+        start_x = (w - size) // 2
+        start_y = (h - size) // 2
+        square = raw[start_y:start_y + size, start_x:start_x + size]
+        
+        # Redimensiona escrevendo no slot pré-alocado
+        if size == self.size:
+            np.copyto(slot, square)
+        else:
+            cv2.resize(square, (self.size, self.size), dst=slot)
+        
+        seq = self.buffer.publish(index, timestamp, captured_at)
+        self._publish_bus(slot, seq, timestamp, captured_at)
+        return True
+    
+    def _publish_bus(self, frame, seq, timestamp, captured_at):
+        """Repassa o frame já pronto aos assinantes de outros processos"""
+        if self.bus is not None:
+            self.bus.publish(frame, seq, timestamp, captured_at)
+    
+    def borrow(self):
+        """
+        Empresta o frame mais recente sem cópia (view somente leitura)
+        
+        Returns:
+            FrameRef com .frame, .seq e .timestamp - liberar com release()
+            ou usar com 'with'
+            None se ainda não há frame
+        """
+        return self._track_age(self.buffer.borrow())
+    
+    def wait_for_frame(self, after_seq=0, timeout=None):
+        """
+        Espera (sem busy-wait) por um frame mais novo que after_seq
+        
+        Args:
+            after_seq: Sequência do último frame processado (0 = qualquer)
+            timeout: Segundos até desistir (None = espera indefinidamente)
+        
+        Returns:
+            FrameRef emprestado (ver borrow()) ou None em timeout/parada
+        """
+        return self._track_age(self.buffer.wait_newer(after_seq, timeout))
+    
+    def _track_age(self, ref):
+        if ref is not None:
+            self.last_age = ref.age()
+        return ref
+    
+    def stats(self):
+        """
+        Estatísticas de captura
+        
+        Returns:
+            dict com modo, FPS nativo, frames capturados, descartados
+            (fila do driver + perdidos pelo driver), sobrescritos antes de
+            serem lidos e idade do último frame entregue (ms)
+        """
+        return {
+            'mode': self.capture_mode,
+            'backend': self.backend_name,
+            'prescaled': self._prescaled,
+            'native_fps': self.native_fps,
+            'captured': self.frames_captured,
+            'dropped': self.frames_flushed + self.frames_missed,
+            'flushed': self.frames_flushed,
+            'missed': self.frames_missed,
+            'overwritten': self.buffer.overwritten,
+            'age_ms': self.last_age * 1000,
+            'bus': self.publish_name if self.bus is not None else None,
+        }
+    
+    @property
+    def latest_seq(self):
+        """Sequência do frame mais recente capturado (0 se nenhum)"""
+        return self.buffer.latest_seq
+    
     def read(self):
-        """Retorna (ret, frame) - similar ao cv2.VideoCapture.read()"""
-        with self.lock:
-            if self.frame is None:
-                return False, None
-            return self.ret, self.frame.copy()
+        """Retorna (ret, frame) - similar ao cv2.VideoCapture.read() (cópia gravável)"""
+        ref = self.buffer.borrow()
+        if ref is None:
+            return False, None
+        with ref:
+            return True, ref.frame.copy()
     
     def get_frame(self):
         """Retorna apenas o frame (None se não disponível)"""
@@ -200,6 +473,7 @@ class CameraManager:
         """Para a captura e libera recursos"""
         print("⏹️  Parando câmera...")
         self.is_running = False
+        self.buffer.close()  # Acorda quem está em wait_for_frame()
         
         # CRÍTICO: Aguardar thread terminar ANTES de liberar recursos
         if hasattr(self, 'thread') and self.thread and self.thread.is_alive():
@@ -207,6 +481,11 @@ class CameraManager:
             if self.thread.is_alive():
                 print("⚠️  Thread de captura não parou a tempo")
         
+        # Barramento compartilhado: assinantes veem is_running = False
+        if getattr(self, 'bus', None) is not None:
+            self.bus.close()
+            self.bus = None
+        
         # Liberar recursos OpenCV apenas DEPOIS que thread parou
         if hasattr(self, 'cap') and self.cap:
             try:
@@ -15,14 +15,37 @@ CAMERA_ID = 0
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 640
 CAMERA_FPS = 60
+CAMERA_BUFFER_SLOTS = 4  # Slots pré-alocados do ring buffer de frames
+CAMERA_CAPTURE_MODE = "paced"  # "paced" (sleep 1/fps, original) ou "latest" (ritmo do driver, só frame mais novo)
+CAMERA_BACKEND = "default"  # "default" (DSHOW/MSMF/auto, original), "auto", "gstreamer" ou "v4l2"
+CAMERA_CAPTURE_RESOLUTION = (640, 480)  # Resolução nativa pedida (GStreamer/V4L2 fazem crop+resize)
+CAMERA_WARMUP_FRAMES = 10  # Leituras descartadas ao abrir a câmera
+FRAME_WAIT_TIMEOUT = 0.05  # Espera máxima por frame novo (segundos) - mantém teclado responsivo
+CAMERA_BUS_NAME = None  # Ex: "lixeira-cam" publica os frames em memória compartilhada para outros processos
 
 # ===== YOLO =====
 MODEL_PATH = "./detection/models/below-trash-v2.pt"
 CONFIDENCE_THRESHOLD = 0.30
+MODEL_BACKEND = "pytorch"  # "pytorch", "onnx", "openvino" ou "auto" (exporta uma vez e guarda em cache)
+MODEL_IMGSZ = CAMERA_WIDTH  # Entrada do modelo exportado (fixa)
+MODEL_WARMUP_FRAMES = 3  # Inferências em frames sintéticos antes de liberar o detector (0 = sem)
+MODEL_FUSED_CACHE = True  # Grava o .pt já fundido (Conv+BN) no cache e carrega ele nas próximas vezes
+INFERENCE_ENGINE = "ultralytics"  # "ultralytics" (predictor) ou "direct" (forward direto, requer TRACKER = "numpy" e PyTorch)
+TRACKER = "ultralytics"  # "ultralytics" (track() com TRACKER_CONFIG) ou "numpy" (modules/tracker.py, detector em predict)
+TRACKER_CONFIG = "bytetrack.yaml"  # Rastreador do ultralytics usado por track()
+TRACKER_IOU_THRESHOLD = 0.2  # IoU mínimo para casar trilha e detecção (rastreador NumPy)
+TRACKER_MAX_DISTANCE = 1.0  # Distância entre centros aceita sem IoU (em lados da caixa)
+TRACKER_MAX_AGE = 15  # Frames sem detecção antes de descartar a trilha
+TRACKER_MIN_HITS = 2  # Detecções seguidas para confirmar uma trilha (falso positivo isolado não ganha id)
 TARGET_CLASSES = ['can', 'paper']
 
 # ===== FÍSICA E 3D =====
-FOCAL_LENGTH = 1000  # Distância focal calibrada (pixels)
+FOCAL_LENGTH = 1000  # Distância focal (pixels) quando não há arquivo de calibração
+CALIBRATION_PATH = "./detection/calibration/camera.npz"  # tools/calibrate_camera.py (intrínsecos + distorção)
+EXTRINSICS_PATH = "./detection/calibration/extrinsics.npz"  # tools/calibrate_extrinsics.py (câmera -> robô/chão); ausente = identidade
+STEREO_CALIBRATION_PATH = "./detection/calibration/stereo.npz"  # tools/calibrate_camera.py --right-camera (modo --stereo)
+STEREO_MAX_SKEW = 0.005  # Diferença máxima entre os timestamps de captura de um par (s)
+STEREO_MAX_ROW_ERROR = 4.0  # Diferença máxima de linha retificada entre as vistas de um objeto (pixels)
 GRAVITY = 9.81  # Aceleração da gravidade (m/s²)
 
 # Dimensões reais dos objetos (metros)
@@ -36,8 +59,42 @@ DEFAULT_OBJECT_SIZE = 0.10
 AXIS_LIMITS = 2.0
 HEIGHT_LIMIT = 3.0
 
+# ===== PIPELINE =====
+PIPELINE_ENABLED = False  # Inferência / pós-processamento / exibição em threads separadas
+BATCH_MAX_WAIT = 0.004  # --cameras: espera máxima (s) pelas outras câmeras antes de fechar o lote
+
+# ===== DETECÇÃO A CADA N FRAMES =====
+FRAME_SKIP = 1  # Maior N: detector a cada até N frames, fluxo óptico entre eles (1 = todo frame)
+FLOW_MAX_SHIFT = 24.0  # Deslocamento (pixels) tolerado entre detecções; define o N conforme a velocidade
+FLOW_POINTS_PER_BOX = 12  # Cantos rastreados pelo Lucas-Kanade em cada caixa
+
+# ===== RESOLUÇÃO ADAPTATIVA =====
+ADAPTIVE_IMGSZ = False  # Troca o imgsz conforme a latência medida (só PyTorch)
+ADAPTIVE_SIZES = (640, 544, 480, 416, 320)  # Tamanhos permitidos (múltiplos de 32)
+INFERENCE_BUDGET = 1 / 30  # Orçamento de inferência por frame (segundos)
+ADAPTIVE_MIN_DWELL = 15  # Frames mínimos entre duas trocas de tamanho
+
+# ===== INFERÊNCIA NO ROI =====
+ROI_INFERENCE = False  # Objeto em voo: YOLO só no recorte em volta da posição prevista
+ROI_MARGIN = 2.5  # Lado do recorte em múltiplos da largura prevista do objeto
+ROI_MIN_SIZE = 160  # Lado mínimo do recorte (pixels, múltiplo de 32)
+ROI_FULL_INTERVAL = 15  # Passes no recorte entre dois passes no frame inteiro
+ROI_MAX_PREDICTION = 0.25  # Horizonte máximo da previsão (s); além disso volta ao frame inteiro
+# Obs: modelos exportados (ONNX/OpenVINO) têm entrada fixa; o recorte é
+# ampliado para MODEL_IMGSZ e o ganho de tempo fica só no PyTorch
+
+# ===== GATE DE MOVIMENTO =====
+MOTION_GATING = False  # Só roda o YOLO quando há movimento (ou no heartbeat)
+MOTION_METHOD = "diff"  # "diff" (diferença entre frames) ou "mog2" (subtração de fundo)
+MOTION_SIZE = 96  # Lado do frame reduzido analisado (pixels)
+MOTION_THRESHOLD = 0.002  # Fração de pixels em movimento para disparar
+MOTION_PIXEL_THRESHOLD = 25  # Diferença de intensidade que conta como movimento (0-255)
+MOTION_HEARTBEAT = 1.0  # Inferência mínima a cada N segundos mesmo sem movimento
+MOTION_HOLD = 0.5  # Continua inferindo N segundos após o movimento parar
+
 # ===== TRACKING E PREDIÇÃO =====
 HISTORY_SIZE = 10  # Frames para calcular velocidade
+PHYSICS_FIT_MODE = "ballistic"  # "ballistic" (z com gravidade fixa; só com EXTRINSICS_PATH) ou "linear" (reta em cada eixo)
 ROBOT_HEIGHT = 0.0  # Altura onde o robô pega (metros)
 PREDICTION_STEP = 0.05  # Resolução da trajetória (segundos)
 
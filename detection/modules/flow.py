@@ -0,0 +1,230 @@
+"""
+Detecção a cada N frames com propagação por fluxo óptico entre elas
+
+O YOLO roda em um frame e, nos seguintes, as caixas são levadas adiante com
+Lucas-Kanade piramidal (cv2) em alguns cantos de cada caixa: deslocamento e
+escala medianos dos pontos que passam na checagem ida-e-volta. A física
+continua recebendo uma posição por frame da câmera.
+
+N se adapta à velocidade: o deslocamento por frame medido (pelo fluxo e entre
+detecções) define quantos frames cabem antes de o objeto andar max_shift
+pixels, então um lançamento rápido ganha mais passes do detector.
+"""
+
+import time
+
+import cv2
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+# Marca de "caixas propagadas pelo fluxo" no lugar do recorte da inferência
+FLOW_PASS = "flow"
+
+
+class FlowPropagator:
+    """Decide quando detectar e propaga as caixas nos frames intermediários"""
+
+    def __init__(self, max_skip=3, max_shift=24.0, points_per_box=12, win_size=15,
+                 max_level=2, fb_threshold=1.0, min_points=3, alpha=0.5):
+        """
+        Args:
+            max_skip: Maior N (frames por passe do detector)
+            max_shift: Deslocamento (pixels) tolerado entre duas detecções
+            points_per_box: Cantos rastreados por caixa
+            win_size: Janela do Lucas-Kanade (pixels)
+            max_level: Níveis da pirâmide
+            fb_threshold: Erro máximo ida-e-volta de um ponto (pixels)
+            min_points: Pontos válidos mínimos para manter a caixa
+            alpha: Peso da medida nova na média da velocidade
+        """
+        self.max_skip = max(1, int(max_skip))
+        self.max_shift = max_shift
+        self.points_per_box = points_per_box
+        self.lk_params = dict(
+            winSize=(win_size, win_size),
+            maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+        )
+        self.fb_threshold = fb_threshold
+        self.min_points = min_points
+        self.alpha = alpha
+
+        self.prev_gray = None
+        self.data = None        # Caixas atuais (N, 6|7), formato de boxes.data
+        self.detected = None    # Caixas do último passe do detector
+        self.points = None      # Cantos (M, 1, 2) float32
+        self.owner = None       # Caixa de cada canto (M,)
+        self.since_detect = 0
+        self.speed = 0.0        # Pixels/frame (média)
+
+        # Estatísticas
+        self.detect_passes = 0
+        self.flow_passes = 0
+        self.flow_time = 0.0
+        self.lost = 0
+
+    @property
+    def interval(self):
+        """N atual: frames por passe do detector"""
+        if self.speed <= 0:
+            return self.max_skip
+        return int(min(self.max_skip, max(1, self.max_shift // self.speed)))
+
+    def should_detect(self):
+        """True quando o próximo frame precisa do detector"""
+        return self.data is None or not len(self.data) or self.since_detect + 1 >= self.interval
+
+    def reset(self, frame, data):
+        """
+        Novo passe do detector: troca as caixas e escolhe os cantos
+
+        Args:
+            frame: Frame BGR em que o detector rodou
+            data: Caixas detectadas (N, 6|7), formato de boxes.data
+        """
+        self.detect_passes += 1
+        data = np.asarray(data, dtype=np.float32)
+        self._speed_from_detections(data)
+
+        self.prev_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.data = data.copy()
+        self.detected = data.copy()
+        self.since_detect = 0
+        self.points, self.owner = self._corners(self.prev_gray, self.data)
+
+    def clear(self):
+        """
+        Descarta caixas e frame anterior: o próximo frame vai para o detector
+
+        Usado quando frames são pulados sem passar por aqui (gate de
+        movimento), para não rastrear contra um prev_gray velho
+        """
+        self.prev_gray = None
+        self._fail()
+
+    def propagate(self, frame):
+        """
+        Leva as caixas do último frame para este
+
+        Returns:
+            np.ndarray (N, 6|7) com as caixas que sobreviveram ou None se
+            nenhuma sobreviveu (o chamador deve rodar o detector)
+        """
+        t0 = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.points is None or not len(self.points):
+            return self._fail()
+
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, self.points, None, **self.lk_params)
+        p0b, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, p1, None, **self.lk_params)
+        fb_error = np.linalg.norm((self.points - p0b).reshape(-1, 2), axis=1)
+        good = (st.ravel() == 1) & (st_back.ravel() == 1) & (fb_error < self.fb_threshold)
+
+        p0 = self.points.reshape(-1, 2)
+        p1 = p1.reshape(-1, 2)
+        h, w = gray.shape[:2]
+        keep = np.zeros(len(self.data), dtype=bool)
+        fastest = 0.0
+        for b in range(len(self.data)):
+            mask = good & (self.owner == b)
+            if np.count_nonzero(mask) < self.min_points:
+                continue
+            a, c = p0[mask], p1[mask]
+            shift = np.median(c - a, axis=0)
+
+            # Escala: espalhamento dos pontos em volta da mediana
+            spread0 = np.median(np.linalg.norm(a - np.median(a, axis=0), axis=1))
+            spread1 = np.median(np.linalg.norm(c - np.median(c, axis=0), axis=1))
+            scale = float(np.clip(spread1 / spread0, 0.8, 1.25)) if spread0 > 1 else 1.0
+
+            x1, y1, x2, y2 = self.data[b, :4]
+            cx, cy = (x1 + x2) / 2 + shift[0], (y1 + y2) / 2 + shift[1]
+            half_w, half_h = (x2 - x1) * scale / 2, (y2 - y1) * scale / 2
+            if not (0 <= cx < w and 0 <= cy < h):
+                continue  # Saiu da imagem
+            self.data[b, :4] = (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
+            keep[b] = True
+            fastest = max(fastest, float(np.hypot(*shift)))
+
+        self.lost += int(np.count_nonzero(~keep))
+        if not keep.any():
+            return self._fail()
+
+        # Só os cantos bons das caixas que ficaram seguem para o próximo frame
+        point_keep = good & keep[self.owner]
+        remap = np.cumsum(keep) - 1
+        self.points = p1[point_keep].reshape(-1, 1, 2).astype(np.float32)
+        self.owner = remap[self.owner[point_keep]]
+        self.data = self.data[keep]
+        self.prev_gray = gray
+        self.since_detect += 1
+        self._update_speed(fastest)
+
+        self.flow_passes += 1
+        self.flow_time += time.perf_counter() - t0
+        return self.data.copy()
+
+    def _fail(self):
+        self.data = None
+        self.points = None
+        return None
+
+    def _corners(self, gray, data):
+        """Cantos (goodFeaturesToTrack) dentro de cada caixa; grade se faltar textura"""
+        h, w = gray.shape[:2]
+        points, owner = [], []
+        for b, (x1, y1, x2, y2) in enumerate(data[:, :4]):
+            x1, y1 = int(max(x1, 0)), int(max(y1, 0))
+            x2, y2 = int(min(x2, w)), int(min(y2, h))
+            if x2 - x1 < 4 or y2 - y1 < 4:
+                continue
+            corners = cv2.goodFeaturesToTrack(gray[y1:y2, x1:x2], self.points_per_box, 0.01, 3)
+            if corners is None or len(corners) < self.min_points:
+                gx, gy = np.meshgrid(np.linspace(0.25, 0.75, 3) * (x2 - x1), np.linspace(0.25, 0.75, 3) * (y2 - y1))
+                corners = np.stack([gx.ravel(), gy.ravel()], axis=1)
+            corners = corners.reshape(-1, 2) + (x1, y1)
+            points.append(corners)
+            owner.append(np.full(len(corners), b))
+
+        if not points:
+            return None, None
+        return np.concatenate(points).reshape(-1, 1, 2).astype(np.float32), np.concatenate(owner)
+
+    def _speed_from_detections(self, data):
+        """Velocidade pelos centros de uma mesma trilha (id) entre duas detecções"""
+        if self.detected is None or data.shape[1] < 7 or self.detected.shape[1] < 7 or not len(data):
+            return
+        frames = self.since_detect + 1
+        prev = {int(row[4]): row for row in self.detected}
+        fastest = 0.0
+        for row in data:
+            old = prev.get(int(row[4]))
+            if old is None:
+                continue
+            delta = (row[:4] - old[:4]).reshape(2, 2).mean(axis=0)
+            fastest = max(fastest, float(np.hypot(*delta)) / frames)
+        if fastest > 0:
+            self._update_speed(fastest)
+
+    def _update_speed(self, pixels_per_frame):
+        self.speed = self.alpha * pixels_per_frame + (1 - self.alpha) * self.speed
+
+    def to_results(self, data, frame, names):
+        """Caixas propagadas como Results do ultralytics (mesmo caminho do detector)"""
+        return [Results(frame, path="", names=names, boxes=torch.from_numpy(np.ascontiguousarray(data)))]
+
+    def stats(self):
+        """
+        Returns:
+            dict com passes do detector/fluxo, custo médio do fluxo (ms), N
+            atual, velocidade (pixels/frame) e caixas perdidas pelo fluxo
+        """
+        return {
+            'detect_passes': self.detect_passes,
+            'flow_passes': self.flow_passes,
+            'flow_ms': self.flow_time / self.flow_passes * 1000 if self.flow_passes else 0.0,
+            'interval': self.interval,
+            'speed': self.speed,
+            'lost': self.lost,
+        }
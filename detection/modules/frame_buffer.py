@@ -0,0 +1,225 @@
+"""
+Buffer circular de frames pré-alocado - hand-off sem cópia entre threads
+"""
+
+import threading
+import time
+import numpy as np
+
+DEFAULT_SLOTS = 4
+
+
+class FrameRef:
+    """Referência emprestada a um slot do buffer (view somente leitura)"""
+
+    __slots__ = ('_buffer', '_index', 'frame', 'seq', 'timestamp', 'captured_at', 'released')
+
+    def __init__(self, buffer, index, frame, seq, timestamp, captured_at):
+        self._buffer = buffer
+        self._index = index
+        self.frame = frame
+        self.seq = seq                  # Número de sequência (monotônico, começa em 1)
+        self.timestamp = timestamp      # Instante da captura (relógio da fonte)
+        self.captured_at = captured_at  # Instante da captura em time.monotonic
+        self.released = False
+
+    def release(self):
+        """Devolve o slot ao buffer (pode ser chamado mais de uma vez)"""
+        if not self.released:
+            self.released = True
+            self._buffer._release(self._index)
+
+    def age(self):
+        """Idade do frame em segundos (agora - instante da captura)"""
+        return time.monotonic() - self.captured_at
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __del__(self):
+        # Rede de segurança: consumidor esqueceu de chamar release()
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+class FrameRingBuffer:
+    """
+    Ring buffer de N slots pré-alocados com contagem de referências
+
+    A thread de captura escreve em um slot livre (nem emprestado, nem o mais
+    recente) e publica; consumidores pegam emprestado o frame mais recente
+    como view somente leitura, sem cópia. Um slot só é reutilizado depois que
+    todos os consumidores o devolvem.
+
+    Cada publicação recebe um número de sequência e o timestamp da captura;
+    wait_newer() dorme em uma Condition até existir frame mais novo.
+    """
+
+    def __init__(self, shape, slots=DEFAULT_SLOTS, dtype=np.uint8):
+        """
+        Args:
+            shape: Formato de cada frame, ex: (640, 640, 3)
+            slots: Número de slots (mínimo 2: um sendo escrito, um publicado)
+            dtype: Tipo dos pixels
+        """
+        if slots < 2:
+            raise ValueError("FrameRingBuffer precisa de pelo menos 2 slots")
+
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+
+        self._data = np.zeros((slots,) + self.shape, dtype=dtype)
+        self._views = []
+        for i in range(slots):
+            view = self._data[i].view()
+            view.flags.writeable = False
+            self._views.append(view)
+
+        self._refcount = [0] * slots
+        self._seqs = [0] * slots
+        self._timestamps = [0.0] * slots
+        self._captured_at = [0.0] * slots
+        self._latest = -1
+        self._seq = 0
+        self._borrowed_seq = 0  # Maior sequência já emprestada
+        self.overwritten = 0    # Frames substituídos antes de qualquer leitura
+        self._closed = False
+        self._writing = -1
+        self._next = 0
+
+    def acquire_write(self):
+        """
+        Reserva um slot livre para escrita
+
+        Returns:
+            (index, array) - Slot gravável
+            (None, None) se todos os slots estiverem emprestados
+        """
+        with self.lock:
+            for offset in range(self.slots):
+                i = (self._next + offset) % self.slots
+                if i != self._latest and self._refcount[i] == 0:
+                    self._writing = i
+                    self._next = (i + 1) % self.slots
+                    return i, self._data[i]
+        return None, None
+
+    def publish(self, index, timestamp, captured_at=None):
+        """
+        Torna o slot escrito o frame mais recente e acorda quem espera
+
+        Args:
+            index: Slot retornado por acquire_write()
+            timestamp: Instante da captura no relógio da fonte (câmera:
+                time.monotonic; gravação: tempo do vídeo, determinístico)
+            captured_at: Instante em time.monotonic para medir idade
+                (None = igual a timestamp)
+
+        Returns:
+            int - Número de sequência atribuído
+        """
+        with self.cond:
+            if self._seq > self._borrowed_seq:
+                self.overwritten += 1
+            self._seq += 1
+            self._seqs[index] = self._seq
+            self._timestamps[index] = timestamp
+            self._captured_at[index] = timestamp if captured_at is None else captured_at
+            self._latest = index
+            self._writing = -1
+            self.cond.notify_all()
+            return self._seq
+
+    @property
+    def latest_seq(self):
+        """Sequência do frame mais recente (0 se nenhum)"""
+        return self._seq
+
+    def borrow(self):
+        """
+        Empresta o frame mais recente
+
+        Returns:
+            FrameRef - Deve ser liberado com release() (ou usado com 'with')
+            None se nenhum frame foi publicado ainda
+        """
+        with self.lock:
+            return self._borrow_locked()
+
+    def wait_newer(self, after_seq, timeout=None):
+        """
+        Bloqueia até existir um frame com sequência maior que after_seq
+
+        Args:
+            after_seq: Última sequência já processada (0 = qualquer frame)
+            timeout: Tempo máximo de espera em segundos (None = sem limite)
+
+        Returns:
+            FrameRef do frame mais recente, ou None em timeout/fechamento
+        """
+        with self.cond:
+            ready = self.cond.wait_for(
+                lambda: self._closed or (self._latest >= 0 and self._seq > after_seq),
+                timeout
+            )
+            if not ready or self._closed:
+                return None
+            return self._borrow_locked()
+
+    def _borrow_locked(self):
+        if self._latest < 0:
+            return None
+        index = self._latest
+        self._refcount[index] += 1
+        if self._seqs[index] > self._borrowed_seq:
+            self._borrowed_seq = self._seqs[index]
+            self.cond.notify_all()  # Acorda produtor esperando em wait_consumed()
+        return FrameRef(self, index, self._views[index], self._seqs[index],
+                        self._timestamps[index], self._captured_at[index])
+
+    def wait_consumed(self, seq, timeout=None):
+        """
+        Bloqueia até algum consumidor pegar emprestado o frame 'seq'
+        (usado por fontes gravadas em modo lockstep)
+
+        Returns:
+            bool - False em timeout ou se o buffer foi fechado
+        """
+        with self.cond:
+            ready = self.cond.wait_for(
+                lambda: self._closed or self._borrowed_seq >= seq, timeout
+            )
+            return ready and not self._closed
+
+    def _release(self, index):
+        with self.lock:
+            if self._refcount[index] > 0:
+                self._refcount[index] -= 1
+
+    def borrowed_count(self):
+        """Quantidade de referências emprestadas no momento"""
+        with self.lock:
+            return sum(self._refcount)
+
+    def clear(self):
+        """Descarta o frame publicado (referências emprestadas continuam válidas)"""
+        with self.lock:
+            self._latest = -1
+
+    def open(self):
+        """Reabre o buffer para novas esperas (após close())"""
+        with self.lock:
+            self._closed = False
+
+    def close(self):
+        """Acorda todos os consumidores bloqueados em wait_newer()"""
+        with self.cond:
+            self._closed = True
+            self.cond.notify_all()
@@ -0,0 +1,412 @@
+"""
+Barramento de frames em memória compartilhada
+
+Um processo (o dono da câmera) publica cada frame em um ring nomeado de
+multiprocessing.shared_memory; qualquer número de processos locais
+(main.py, preview do camera_selector, tools/preview_bus.py, streamer...)
+assina o mesmo ring e lê os frames sem cópia e sem decodificar de novo.
+
+Layout do segmento:
+    cabeçalho   uint64[10]         magic, versão, slots, altura, largura, canais, seq mais recente,
+                                   fechado, pid do publicador, batimento (monotonic_ns)
+    travas      uint64[slots]      seqlock por slot (ímpar = escrita em andamento)
+    sequências  uint64[slots]      seq do frame em cada slot
+    tempos      float64[slots, 2]  (timestamp, captured_at)
+    dados       uint8[slots, h, w, c]
+
+Não há trava entre processos: o escritor nunca espera. O leitor confere o
+seqlock do slot antes e depois de usar o frame (BusFrame.valid()) para
+detectar que o escritor deu a volta no ring e sobrescreveu o slot.
+
+O publicador renova o batimento em uma thread própria a cada
+HEARTBEAT_INTERVAL segundos, independente de chegar frame (câmera travada
+ou reconectando não faz o barramento parecer abandonado): um segmento com o
+mesmo nome só é reaproveitado se estiver fechado, se o pid dono não existir
+mais (POSIX) ou se estiver sem batimento há STALE_AFTER segundos (sobra de
+um processo que morreu); senão há outro publicador vivo e a criação falha
+em vez de apagar o ring dos assinantes dele.
+"""
+
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+MAGIC = 0x4C58464255533031  # "LXFBUS01"
+VERSION = 2
+DEFAULT_BUS_SLOTS = 8
+DEFAULT_POLL_INTERVAL = 0.0005  # Espera entre consultas em wait_for_frame() (segundos)
+HEARTBEAT_INTERVAL = 1.0  # Segundos entre batimentos do publicador
+STALE_AFTER = 5.0  # Segundos sem batimento para considerar o publicador morto
+
+# Índices do cabeçalho
+(_H_MAGIC, _H_VERSION, _H_SLOTS, _H_HEIGHT, _H_WIDTH, _H_CHANNELS, _H_LATEST, _H_CLOSED,
+ _H_PID, _H_HEARTBEAT) = range(10)
+_HEADER_WORDS = 10
+
+
+def _segment_size(slots, shape):
+    frame_bytes = int(np.prod(shape))
+    return 8 * _HEADER_WORDS + slots * (8 + 8 + 16) + slots * frame_bytes
+
+
+def _map_segment(buf, slots, shape):
+    """Cria as views numpy sobre o segmento (mesmo layout no escritor e leitores)"""
+    offset = 0
+    header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=buf, offset=offset)
+    offset += header.nbytes
+    locks = np.ndarray((slots,), dtype=np.uint64, buffer=buf, offset=offset)
+    offset += locks.nbytes
+    seqs = np.ndarray((slots,), dtype=np.uint64, buffer=buf, offset=offset)
+    offset += seqs.nbytes
+    times = np.ndarray((slots, 2), dtype=np.float64, buffer=buf, offset=offset)
+    offset += times.nbytes
+    data = np.ndarray((slots,) + tuple(shape), dtype=np.uint8, buffer=buf, offset=offset)
+    return header, locks, seqs, times, data
+
+
+def _attach(name):
+    """
+    Abre um segmento existente sem registrá-lo no resource_tracker deste
+    processo (senão o leitor apagaria o segmento do escritor ao sair)
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+def _pid_exists(pid):
+    """False só quando o sistema garante que o processo não existe (POSIX)"""
+    if os.name != "posix" or pid <= 0:
+        return True  # No Windows os.kill(pid, 0) encerraria o processo: fica só o batimento
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Existe, mas é de outro usuário
+    return True
+
+
+def _live_publisher(shm):
+    """
+    Pid do publicador ainda ativo no segmento, ou None se ele está fechado,
+    morreu, está sem batimento há mais de STALE_AFTER segundos ou não é um
+    barramento desta versão
+    """
+    if shm.size < 8 * _HEADER_WORDS:
+        return None
+    header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+    try:
+        if int(header[_H_MAGIC]) != MAGIC or int(header[_H_VERSION]) != VERSION or int(header[_H_CLOSED]):
+            return None
+        if time.monotonic_ns() - int(header[_H_HEARTBEAT]) > STALE_AFTER * 1e9:
+            return None
+        pid = int(header[_H_PID])
+        return pid if _pid_exists(pid) else None
+    finally:
+        del header
+
+
+class FrameBusPublisher:
+    """Lado do escritor: cria o segmento e publica frames (sem nunca bloquear)"""
+
+    def __init__(self, name, shape, slots=DEFAULT_BUS_SLOTS):
+        """
+        Args:
+            name: Nome do segmento (o mesmo usado pelos assinantes)
+            shape: (altura, largura, canais) dos frames
+            slots: Frames mantidos no ring (quanto maior, mais tempo um
+                leitor pode segurar um frame sem cópia)
+        """
+        if slots < 2:
+            raise ValueError("O barramento precisa de pelo menos 2 slots")
+
+        self.name = name
+        self.shape = tuple(shape)
+        self.slots = slots
+        size = _segment_size(slots, self.shape)
+
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Sobra de um processo que morreu sem limpar: recria (nunca o de um publicador vivo)
+            stale = _attach(name)
+            try:
+                owner = _live_publisher(stale)
+            finally:
+                stale.close()
+            if owner is not None:
+                raise ValueError(f"❌ Barramento de frames '{name}' já está sendo publicado (pid {owner})")
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self._header, self._locks, self._seqs, self._times, self._data = \
+            _map_segment(self._shm.buf, slots, self.shape)
+        self._locks[:] = 0
+        self._seqs[:] = 0
+        self._header[:] = (MAGIC, VERSION, slots) + self.shape + (0, 0, os.getpid(), time.monotonic_ns())
+        self.frames_published = 0
+
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name=f"FrameBus-{name}", daemon=True)
+        self._heartbeat.start()
+
+    def _heartbeat_loop(self):
+        """Renova o batimento até close(), chegue frame ou não"""
+        while not self._stop_heartbeat.wait(HEARTBEAT_INTERVAL):
+            self._header[_H_HEARTBEAT] = time.monotonic_ns()
+
+    def publish(self, frame, seq, timestamp, captured_at=None):
+        """Copia o frame para o slot de 'seq' (uma cópia, sem decodificar)"""
+        index = seq % self.slots
+        self._locks[index] += 1  # Ímpar: leitores descartam este slot
+        np.copyto(self._data[index], frame)
+        self._seqs[index] = seq
+        self._times[index] = (timestamp, timestamp if captured_at is None else captured_at)
+        self._locks[index] += 1
+        self._header[_H_LATEST] = seq
+        self.frames_published += 1
+
+    def close(self):
+        """Marca o barramento como fechado (acorda os assinantes) e remove o segmento"""
+        if self._shm is None:
+            return
+        self._stop_heartbeat.set()
+        self._heartbeat.join()
+        self._header[_H_CLOSED] = 1
+        del self._header, self._locks, self._seqs, self._times, self._data
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+
+class BusFrame:
+    """
+    Frame emprestado do barramento (view somente leitura, sem cópia)
+
+    Mesma interface do FrameRef do ring buffer local. Como o escritor não
+    espera ninguém, confira valid() depois de usar o frame (ou use copy())
+    se o processamento puder levar mais que (slots - 1) frames. Com
+    FrameBusSubscriber(copy=True) o frame já é uma cópia validada (index
+    None) e valid() é sempre True.
+    """
+
+    __slots__ = ('_subscriber', '_index', '_lock', 'frame', 'seq', 'timestamp', 'captured_at')
+
+    def __init__(self, subscriber, index, lock, frame, seq, timestamp, captured_at):
+        self._subscriber = subscriber
+        self._index = index
+        self._lock = lock
+        self.frame = frame
+        self.seq = seq
+        self.timestamp = timestamp
+        self.captured_at = captured_at
+
+    def valid(self):
+        """True se o escritor ainda não sobrescreveu o slot"""
+        return self._index is None or self._subscriber._lock_value(self._index) == self._lock
+
+    def copy(self):
+        """Cópia gravável do frame (None se o slot já foi sobrescrito)"""
+        frame = self.frame.copy()
+        return frame if self.valid() else None
+
+    def age(self):
+        """Segundos desde a captura"""
+        return time.monotonic() - self.captured_at
+
+    def release(self):
+        """Nada a devolver (o escritor não espera leitores)"""
+        if not self.valid():
+            self._subscriber.frames_torn += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class FrameBusSubscriber:
+    """
+    Lado do leitor: mapeia o segmento de outro processo
+
+    Imita a parte de leitura do CameraManager (wait_for_frame, borrow,
+    get_frame, stats, is_running, stop), então pode substituí-lo em quem
+    só consome frames.
+    """
+
+    def __init__(self, name, timeout=None, copy=False):
+        """
+        Args:
+            name: Nome do segmento publicado
+            timeout: Segundos esperando o publicador aparecer (None = falha na hora)
+            copy: Entregar cópias validadas em vez de views do segmento (para
+                quem segura o frame por mais que (slots - 1) frames, como a
+                inferência: um frame rasgado nunca chega ao detector)
+        """
+        self.name = name
+        self.copy = copy
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                self._shm = _attach(name)
+                break
+            except FileNotFoundError:
+                if deadline is None or time.monotonic() >= deadline:
+                    raise ValueError(f"❌ Barramento de frames '{name}' não encontrado")
+                time.sleep(0.1)
+
+        header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=self._shm.buf)
+        if int(header[_H_MAGIC]) != MAGIC or int(header[_H_VERSION]) != VERSION:
+            self._shm.close()
+            raise ValueError(f"❌ Segmento '{name}' não é um barramento de frames compatível")
+
+        self.slots = int(header[_H_SLOTS])
+        self.shape = (int(header[_H_HEIGHT]), int(header[_H_WIDTH]), int(header[_H_CHANNELS]))
+        self._header, self._locks, self._seqs, self._times, self._data = \
+            _map_segment(self._shm.buf, self.slots, self.shape)
+        self._data.flags.writeable = False
+
+        # Estatísticas do leitor
+        self.frames_read = 0
+        self.frames_skipped = 0  # Frames publicados que este leitor não chegou a ver
+        self.frames_torn = 0     # Leituras invalidadas pelo escritor
+        self.last_age = 0.0
+        self._last_seq = 0
+
+    def _lock_value(self, index):
+        return int(self._locks[index])
+
+    @property
+    def latest_seq(self):
+        """Sequência do frame mais recente publicado (0 se nenhum)"""
+        return int(self._header[_H_LATEST]) if self._shm is not None else 0
+
+    @property
+    def is_running(self):
+        """False depois que o publicador fechou o barramento"""
+        return self._shm is not None and not int(self._header[_H_CLOSED])
+
+    def borrow(self):
+        """
+        Frame mais recente sem cópia
+
+        Returns:
+            BusFrame ou None se ainda não há frame / o slot está sendo escrito
+        """
+        seq = self.latest_seq
+        if seq == 0:
+            return None
+
+        index = seq % self.slots
+        lock = self._lock_value(index)
+        if lock & 1 or int(self._seqs[index]) != seq:
+            return None  # Escritor já está no slot: próxima consulta pega o novo
+        timestamp, captured_at = self._times[index]
+        frame = self._data[index]
+        if self.copy:
+            frame = frame.copy()
+            if self._lock_value(index) != lock:
+                self.frames_torn += 1
+                return None  # Sobrescrito durante a cópia
+            index = None
+
+        if self._last_seq and seq > self._last_seq + 1:
+            self.frames_skipped += seq - self._last_seq - 1
+        self._last_seq = max(self._last_seq, seq)
+        self.frames_read += 1
+
+        ref = BusFrame(self, index, lock, frame, seq, float(timestamp), float(captured_at))
+        self.last_age = ref.age()
+        return ref
+
+    def wait_for_frame(self, after_seq=0, timeout=None, poll=DEFAULT_POLL_INTERVAL):
+        """
+        Espera por um frame mais novo que after_seq (consulta a cada 'poll' segundos)
+
+        Returns:
+            BusFrame ou None em timeout / barramento fechado
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_running:
+            if self.latest_seq > after_seq:
+                ref = self.borrow()
+                if ref is not None:
+                    return ref
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+        return None
+
+    def read(self):
+        """Retorna (ret, frame) com cópia gravável validada"""
+        for _ in range(self.slots):
+            ref = self.borrow()
+            if ref is None:
+                return False, None
+            frame = ref.frame if self.copy else ref.copy()  # Com copy=True o borrow já copiou e validou
+            if frame is not None:
+                return True, frame
+            self.frames_torn += 1
+        return False, None
+
+    def get_frame(self):
+        """Retorna apenas o frame (None se não disponível)"""
+        ret, frame = self.read()
+        return frame if ret else None
+
+    def stats(self):
+        """
+        Estatísticas do leitor
+
+        Returns:
+            dict no mesmo formato do CameraManager.stats() (campos de
+            captura que só o publicador conhece ficam zerados)
+        """
+        return {
+            'mode': "bus",
+            'backend': f"barramento '{self.name}'",
+            'prescaled': False,
+            'native_fps': 0.0,
+            'captured': self.latest_seq,
+            'dropped': self.frames_skipped,
+            'flushed': 0,
+            'missed': 0,
+            'overwritten': self.frames_torn,
+            'age_ms': self.last_age * 1000,
+        }
+
+    def start(self):
+        """Compatibilidade com CameraManager (o publicador já está capturando)"""
+        return self
+
+    def stop(self):
+        """Desmapeia o segmento (não afeta o publicador nem outros leitores)"""
+        if self._shm is None:
+            return
+        del self._header, self._locks, self._seqs, self._times, self._data
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # Ainda há BusFrame vivo apontando para o segmento: o GC fecha depois
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
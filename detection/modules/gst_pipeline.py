@@ -0,0 +1,181 @@
+"""
+Backend de captura Linux - pipelines GStreamer / V4L2
+
+O pipeline negocia o formato com a câmera (MJPEG ou YUYV) e faz o crop
+quadrado, o resize e a conversão para BGR fora do Python, de modo que o
+CameraManager já recebe frames no tamanho final.
+"""
+
+import re
+import shutil
+import subprocess
+import sys
+
+import cv2
+
+FORMAT_MJPEG = "MJPG"
+FORMAT_YUYV = "YUYV"
+
+# Preferência: MJPEG usa menos banda USB (mais FPS em resoluções altas)
+FORMAT_PREFERENCE = (FORMAT_MJPEG, FORMAT_YUYV)
+
+
+def is_linux():
+    return sys.platform.startswith("linux")
+
+
+def gstreamer_available():
+    """OpenCV foi compilado com suporte a GStreamer?"""
+    info = cv2.getBuildInformation()
+    match = re.search(r"GStreamer:\s*(\w+)", info)
+    return bool(match and match.group(1).upper() == "YES")
+
+
+def gst_element_available(name):
+    """Verifica se um elemento GStreamer existe (ex: v4l2convert no Raspberry)"""
+    inspect = shutil.which("gst-inspect-1.0")
+    if inspect is None:
+        return False
+    try:
+        result = subprocess.run([inspect, "--exists", name], timeout=2,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return result.returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def device_path(src):
+    """Converte ID numérico em caminho V4L2 (/dev/videoN)"""
+    if isinstance(src, int):
+        return f"/dev/video{src}"
+    return str(src)
+
+
+def list_v4l2_formats(device):
+    """
+    Lista formatos suportados via v4l2-ctl
+
+    Returns:
+        dict {fourcc: set((largura, altura))} - vazio se v4l2-ctl indisponível
+    """
+    ctl = shutil.which("v4l2-ctl")
+    if ctl is None:
+        return {}
+    try:
+        output = subprocess.run(
+            [ctl, f"--device={device}", "--list-formats-ext"],
+            capture_output=True, text=True, timeout=3
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+
+    formats = {}
+    current = None
+    for line in output.splitlines():
+        fmt = re.search(r"'(\w{4})'", line)
+        if fmt and "[" in line:
+            current = fmt.group(1)
+            formats.setdefault(current, set())
+            continue
+        size = re.search(r"Size: Discrete (\d+)x(\d+)", line)
+        if size and current:
+            formats[current].add((int(size.group(1)), int(size.group(2))))
+    return formats
+
+
+def negotiate_format(device, width, height):
+    """
+    Escolhe o formato de captura para a resolução pedida
+
+    Returns:
+        FORMAT_MJPEG ou FORMAT_YUYV
+    """
+    formats = list_v4l2_formats(device)
+    if not formats:
+        return FORMAT_MJPEG
+
+    for fourcc in FORMAT_PREFERENCE:
+        if (width, height) in formats.get(fourcc, ()):
+            return fourcc
+    for fourcc in FORMAT_PREFERENCE:
+        if fourcc in formats:
+            return fourcc
+    return FORMAT_MJPEG
+
+
+def build_pipeline(device, width, height, fps, out_size, fmt=None, hw_convert=None):
+    """
+    Monta o pipeline GStreamer: captura -> decode -> crop central -> scale -> BGR
+
+    Args:
+        device: Caminho V4L2 (/dev/videoN)
+        width, height: Resolução nativa pedida à câmera
+        fps: FPS pedido à câmera
+        out_size: Lado do frame quadrado entregue ao appsink
+        fmt: FORMAT_MJPEG / FORMAT_YUYV (None = negociar via v4l2-ctl)
+        hw_convert: Usar v4l2convert/v4l2jpegdec (ISP do Raspberry);
+            None = detectar
+
+    Returns:
+        str - Pipeline para cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+    """
+    if fmt is None:
+        fmt = negotiate_format(device, width, height)
+    if hw_convert is None:
+        hw_convert = gst_element_available("v4l2convert")
+
+    side = min(width, height)
+    crop_x = (width - side) // 2
+    crop_y = (height - side) // 2
+
+    source = f"v4l2src device={device} io-mode=mmap"
+    if fmt == FORMAT_MJPEG:
+        decoder = "v4l2jpegdec" if hw_convert and gst_element_available("v4l2jpegdec") else "jpegdec"
+        caps = f"image/jpeg,width={width},height={height},framerate={fps}/1 ! {decoder}"
+    else:
+        caps = f"video/x-raw,format=YUY2,width={width},height={height},framerate={fps}/1"
+
+    crop = (f"videocrop left={crop_x} right={width - side - crop_x} "
+            f"top={crop_y} bottom={height - side - crop_y}")
+    scale = "v4l2convert" if hw_convert else "videoscale ! videoconvert"
+    sink = "appsink drop=true max-buffers=1 sync=false"
+
+    return (f"{source} ! {caps} ! {crop} ! {scale} ! "
+            f"video/x-raw,format=BGR,width={out_size},height={out_size} ! {sink}")
+
+
+def build_test_pipeline(width, height, fps, out_size=None):
+    """
+    Pipeline sintético (videotestsrc) para benchmarks sem câmera
+
+    out_size=None entrega o frame bruto (crop/resize ficam no Python)
+    """
+    source = (f"videotestsrc is-live=true pattern=ball ! "
+              f"video/x-raw,width={width},height={height},framerate={fps}/1")
+    sink = "appsink drop=true max-buffers=1 sync=false"
+    if out_size is None:
+        return f"{source} ! videoconvert ! video/x-raw,format=BGR ! {sink}"
+
+    side = min(width, height)
+    crop_x = (width - side) // 2
+    crop_y = (height - side) // 2
+    crop = (f"videocrop left={crop_x} right={width - side - crop_x} "
+            f"top={crop_y} bottom={height - side - crop_y}")
+    return (f"{source} ! {crop} ! videoscale ! videoconvert ! "
+            f"video/x-raw,format=BGR,width={out_size},height={out_size} ! {sink}")
+
+
+def open_v4l2(device, width, height, fps, fmt=FORMAT_MJPEG):
+    """
+    Abre a câmera direto no V4L2 com FOURCC/resolução/FPS negociados
+
+    Sem GStreamer o crop/resize continua no Python, mas evita os backends
+    do Windows e o CAP_ANY escolher um formato ruim (ex: YUYV a 5 FPS).
+    """
+    cap = cv2.VideoCapture(device, cv2.CAP_V4L2)
+    if cap.isOpened():
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fmt))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    return cap
@@ -0,0 +1,191 @@
+"""
+Inferência direta - forward da rede sem o predictor genérico do ultralytics
+
+O CameraManager já entrega o frame quadrado no tamanho de entrada do modelo,
+então fonte, letterbox e construção de Results do predictor são só overhead.
+O DirectEngine converte o frame uint8 para um tensor de entrada
+pré-alocado e reutilizado, chama o forward da DetectionModel e faz o NMS
+escrevendo em arrays NumPy de saída também reutilizados. Confiança e classes
+seguem o que o model_loader configurou no modelo.
+
+Saída: (N, 6) float32 - x1, y1, x2, y2, confiança, classe (formato de
+boxes.data do predict()), em pixels do frame recebido. infer_batch() faz o
+mesmo para vários frames (ex: várias câmeras) em um único forward.
+"""
+
+import cv2
+import numpy as np
+import torch
+import torchvision
+
+# Saídas em trânsito ao mesmo tempo no pipeline: uma na inferência, uma na
+# fila de resultados e uma no pós-processamento (+1 de folga)
+OUTPUT_SLOTS = 4
+
+MAX_WH = 7680  # Deslocamento por classe no NMS (igual ao ultralytics)
+
+
+class DirectEngine:
+    """Forward direto + NMS com buffers reutilizados (só backend PyTorch)"""
+
+    def __init__(self, model, imgsz, device="cpu", conf=None, classes=None, iou=0.7, max_det=300):
+        """
+        Args:
+            model: YOLO carregado por load_yolo_model (backend PyTorch)
+            imgsz: Lado da entrada (frame quadrado)
+            device: Dispositivo do forward
+            conf: Confiança mínima (padrão: a configurada no modelo)
+            classes: Índices de classe aceitos (padrão: os configurados no modelo)
+            iou: Limiar de IoU do NMS (padrão do predict())
+            max_det: Máximo de detecções por frame
+        """
+        # Rede já preparada (fundida) pelo predictor do warm-up, se houver
+        backend = getattr(getattr(model, "predictor", None), "model", None)
+        net = getattr(backend, "model", None)
+        if not isinstance(net, torch.nn.Module):
+            net = getattr(model, "model", None)
+        if not isinstance(net, torch.nn.Module):
+            raise TypeError("DirectEngine precisa de um modelo PyTorch (backend exportado não tem forward direto)")
+
+        overrides = getattr(model, "overrides", {}) or {}
+        if conf is None:
+            conf = overrides.get("conf", getattr(model, "conf", None))
+        if classes is None:
+            classes = overrides.get("classes", getattr(model, "classes", None))
+
+        self.device = torch.device(device if device != "cuda" or torch.cuda.is_available() else "cpu")
+        self.net = net.to(self.device).eval()
+        self.dtype = next(self.net.parameters()).dtype
+        self.end2end = bool(getattr(self.net.model[-1], "end2end", False))
+        self.names = model.names
+
+        self.conf = 0.25 if conf is None else float(conf)
+        self.iou = iou
+        self.max_det = max_det
+        self.classes = None
+        if classes is not None:
+            self.classes = torch.as_tensor(list(classes), device=self.device)
+
+        self.imgsz = imgsz
+        # (imgsz, lote) -> (tensor host, tensor no dispositivo, view NumPy de preenchimento, buffers de resize)
+        self._inputs = {}
+        self._outputs = {}  # lote -> OUTPUT_SLOTS arrays (lote, max_det, 6)
+        self._slot = 0
+
+        # Estatísticas
+        self.calls = 0
+        self.frames = 0
+
+    def _input(self, imgsz, batch=1):
+        """Tensor de entrada (lote, 3, imgsz, imgsz) reutilizado para este tamanho"""
+        buffers = self._inputs.get((imgsz, batch))
+        if buffers is None:
+            shape = (batch, 3, imgsz, imgsz)
+            host = torch.empty(shape, dtype=torch.float32)
+            if self.device.type == "cpu" and self.dtype == torch.float32:
+                tensor = host  # O forward lê direto do buffer preenchido
+            else:
+                if self.device.type != "cpu":
+                    host = host.pin_memory()
+                tensor = torch.empty(shape, dtype=self.dtype, device=self.device)
+            resized = np.empty((batch, imgsz, imgsz, 3), dtype=np.uint8)
+            buffers = self._inputs[(imgsz, batch)] = (host, tensor, host.numpy(), resized)
+        return buffers
+
+    def infer(self, frame, imgsz=None):
+        """
+        Detecta em um frame BGR uint8
+
+        Args:
+            frame: Imagem (H, W, 3); redimensionada se não for imgsz x imgsz
+            imgsz: Lado da entrada (padrão: o do construtor)
+
+        Returns:
+            np.ndarray (N, 6) float32 - view de um buffer reutilizado, válida
+            até OUTPUT_SLOTS chamadas depois (copie para guardar)
+        """
+        return self.infer_batch((frame,), imgsz)[0]
+
+    @torch.inference_mode()
+    def infer_batch(self, frames, imgsz=None):
+        """
+        Detecta em vários frames com um único forward
+
+        Args:
+            frames: Sequência de imagens BGR uint8 (H, W, 3), tamanhos livres
+            imgsz: Lado da entrada (padrão: o do construtor)
+
+        Returns:
+            list[np.ndarray (N_i, 6)] - views de buffers reutilizados, como em infer()
+        """
+        imgsz = imgsz or self.imgsz
+        batch = len(frames)
+        host, tensor, fill, resized = self._input(imgsz, batch)
+
+        shapes = []
+        for i, frame in enumerate(frames):
+            h, w = frame.shape[:2]
+            shapes.append((h, w))
+            if (h, w) != (imgsz, imgsz):
+                frame = cv2.resize(frame, (imgsz, imgsz), dst=resized[i], interpolation=cv2.INTER_LINEAR)
+            # BGR HWC uint8 -> RGB CHW float [0, 1], uma única passada sem temporários
+            np.multiply(frame[..., ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=fill[i], casting="unsafe")
+        if tensor is not host:
+            tensor.copy_(host, non_blocking=True)
+
+        preds = self.net(tensor)
+        if isinstance(preds, (list, tuple)):
+            preds = preds[0]
+
+        ring = self._outputs.get(batch)
+        if ring is None:
+            ring = self._outputs[batch] = [np.empty((batch, self.max_det, 6), dtype=np.float32)
+                                           for _ in range(OUTPUT_SLOTS)]
+        outputs = ring[self._slot % OUTPUT_SLOTS]
+        self._slot += 1
+        self.calls += 1
+        self.frames += batch
+
+        results = []
+        for i, (h, w) in enumerate(shapes):
+            out = outputs[i]
+            det = self._select(preds[i])
+            n = det.shape[0]
+            if n:
+                out[:n] = det.float().cpu().numpy()
+                if (h, w) != (imgsz, imgsz):
+                    out[:n, [0, 2]] *= w / imgsz
+                    out[:n, [1, 3]] *= h / imgsz
+                out[:n, 0:4:2] = np.clip(out[:n, 0:4:2], 0, w)
+                out[:n, 1:4:2] = np.clip(out[:n, 1:4:2], 0, h)
+            results.append(out[:n])
+        return results
+
+    def _select(self, pred):
+        """Filtro de confiança/classe + NMS (mesma regra do non_max_suppression do ultralytics)"""
+        if self.end2end:
+            # (300, 6) já sem sobreposição: só filtra
+            mask = pred[:, 4] > self.conf
+            if self.classes is not None:
+                mask &= (pred[:, 5:6] == self.classes).any(1)
+            return pred[mask][:self.max_det]
+
+        # (4 + nc, A): melhor classe por âncora
+        scores, cls = pred[4:].max(0)
+        keep = scores > self.conf
+        if self.classes is not None:
+            keep &= (cls[:, None] == self.classes).any(1)
+        if not keep.any():
+            return pred.new_zeros((0, 6))
+
+        xywh = pred[:4, keep].T
+        scores, cls = scores[keep], cls[keep].to(pred.dtype)
+        boxes = torch.cat((xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2), 1)
+
+        # NMS por classe: caixas de classes diferentes deslocadas para não se sobreporem
+        idx = torchvision.ops.nms(boxes + cls[:, None] * MAX_WH, scores, self.iou)[:self.max_det]
+        return torch.cat((boxes[idx], scores[idx, None], cls[idx, None]), 1)
+
+    def predict(self, frame, imgsz=None, **kwargs):
+        """Mesma chamada do YOLO.predict(); retorna [array (N, 6)] no lugar de [Results]"""
+        return [self.infer(frame, imgsz)]
@@ -1,10 +1,204 @@
+import hashlib
+import importlib.util
+import os
+import shutil
+import time
+
+import numpy as np
 import torch
 from ultralytics import YOLO
 from modules import config
 
-def load_yolo_model(model_name: str | None = None):
+# Backends de inferência
+BACKEND_PYTORCH = "pytorch"    # .pt direto (comportamento original)
+BACKEND_ONNX = "onnx"          # ONNX Runtime (CPU)
+BACKEND_OPENVINO = "openvino"  # OpenVINO IR (CPU Intel / ARM)
+BACKEND_ONNX_INT8 = "onnx-int8"  # ONNX INT8 gerado por tools/quantize_model.py
+BACKEND_AUTO = "auto"          # OpenVINO > ONNX Runtime > PyTorch, conforme instalado
+BACKENDS = (BACKEND_PYTORCH, BACKEND_ONNX, BACKEND_OPENVINO, BACKEND_ONNX_INT8, BACKEND_AUTO)
+
+EXPORT_CACHE_DIR = ".export_cache"  # Criado ao lado dos pesos
+WARMUP_FILL = 114  # Cinza do letterbox do ultralytics
+
+
+def _runtime_available(backend):
+    """Runtime do backend instalado?"""
+    module = {BACKEND_ONNX: "onnxruntime", BACKEND_ONNX_INT8: "onnxruntime",
+              BACKEND_OPENVINO: "openvino"}.get(backend)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def resolve_backend(backend):
+    """Troca 'auto' pelo melhor backend instalado"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend inválido: {backend!r} (opções: {BACKENDS})")
+    if backend != BACKEND_AUTO:
+        return backend
+    for candidate in (BACKEND_OPENVINO, BACKEND_ONNX):
+        if _runtime_available(candidate):
+            return candidate
+    return BACKEND_PYTORCH
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hash do arquivo de pesos (chave do cache de exportação)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_key(model_name, digest=None):
+    """(pasta do cache, '<nome>-<hash>') para os pesos"""
+    digest = digest or file_sha256(model_name)
+    directory = os.path.join(os.path.dirname(os.path.abspath(model_name)), EXPORT_CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(model_name))[0]
+    return directory, f"{stem}-{digest[:16]}"
+
+
+def export_path(model_name, backend, imgsz, digest=None):
+    """
+    Caminho do modelo exportado no cache: <pasta dos pesos>/.export_cache/
+    <nome>-<hash>-<imgsz>.onnx, <nome>-<hash>-<imgsz>-int8.onnx ou
+    <nome>-<hash>-<imgsz>_openvino_model/
+    """
+    directory, key = _cache_key(model_name, digest)
+    key = f"{key}-{imgsz}"
+    if backend == BACKEND_OPENVINO:
+        return os.path.join(directory, f"{key}_openvino_model")
+    if backend == BACKEND_ONNX_INT8:
+        return os.path.join(directory, f"{key}-int8.onnx")
+    return os.path.join(directory, f"{key}.onnx")
+
+
+def fused_path(model_name, digest=None):
+    """Artefato PyTorch já fundido (Conv+BN) no cache: <nome>-<hash>-fused.pt"""
+    directory, key = _cache_key(model_name, digest)
+    return os.path.join(directory, f"{key}-fused.pt")
+
+
+def fused_model(model_name):
+    """
+    Funde Conv+BN uma vez e grava o checkpoint pronto para rodar (sem
+    otimizador/EMA), para as próximas inicializações pularem a fusão
+
+    Returns:
+        str - Caminho do artefato fundido
+    """
+    target = fused_path(model_name)
+    if os.path.exists(target):
+        print(f"♻️  Usando modelo fundido em cache: {target}")
+        return target
+
+    model = YOLO(model_name)
+    model.fuse()
+    ckpt = dict(getattr(model, "ckpt", None) or {})
+    ckpt.update({"model": model.model, "ema": None, "optimizer": None})
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + ".tmp"
+    torch.save(ckpt, tmp)
+    os.replace(tmp, target)
+    print(f"✅ Modelo fundido gravado: {target}")
+    return target
+
+
+def warmup_model(model, imgsz, frames, tracker="bytetrack.yaml"):
+    """
+    Roda track() em frames sintéticos no tamanho de produção e depois zera
+    os rastreadores: fusão preguiçosa, crescimento do alocador e criação do
+    tracker acontecem aqui, não no primeiro lançamento. Com tracker=None
+    (rastreador próprio, ver modules/tracker.py) roda predict()
+
+    Returns:
+        list[float] - Latência de cada frame do warm-up (segundos)
+    """
+    if frames <= 0:
+        return []
+
+    rng = np.random.default_rng(0)
+    frame = np.full((imgsz, imgsz, 3), WARMUP_FILL, dtype=np.uint8)
+    frame += rng.integers(0, 16, frame.shape, dtype=np.uint8)  # Textura leve, sem objetos
+
+    times = []
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        if tracker is None:
+            model.predict(frame, verbose=False, device=config.DEVICE)
+        else:
+            model.track(frame, persist=True, tracker=tracker, verbose=False, device=config.DEVICE)
+        times.append(time.perf_counter() - t0)
+
+    # Trilhas/IDs do warm-up não podem vazar para a detecção real
+    predictor = getattr(model, "predictor", None)
+    for t in getattr(predictor, "trackers", None) or []:
+        t.reset()
+
+    print(f"🔥 Warm-up: {frames} frames {imgsz}x{imgsz} "
+          f"(primeiro {times[0] * 1000:.0f} ms, último {times[-1] * 1000:.0f} ms)")
+    return times
+
+
+def export_model(model_name, backend, imgsz):
+    """
+    Exporta o .pt uma única vez e reaproveita o resultado enquanto o hash
+    dos pesos e o imgsz forem os mesmos
+
+    Returns:
+        str - Caminho do modelo exportado
+    """
+    target = export_path(model_name, backend, imgsz)
+    if os.path.exists(target):
+        print(f"♻️  Usando exportação em cache: {target}")
+        return target
+
+    # Exporta a partir de uma cópia com o nome da chave: a exportação do
+    # ultralytics escreve ao lado do .pt e não pode sobrescrever nada do usuário
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    key = os.path.basename(target)
+    key = key[:-len("_openvino_model")] if backend == BACKEND_OPENVINO else os.path.splitext(key)[0]
+    staged = os.path.join(directory, f"{key}.pt")
+    shutil.copyfile(model_name, staged)
+    # Exportação OpenVINO passa por um .onnx intermediário (que pode já ser o cache ONNX)
+    intermediate = os.path.join(directory, f"{key}.onnx")
+    keep_intermediate = os.path.exists(intermediate)
+
+    print(f"🔄 Exportando {model_name} para {backend} (imgsz={imgsz}, só na primeira vez)...")
+    try:
+        exported = YOLO(staged).export(format=backend, imgsz=imgsz, verbose=False)
+    finally:
+        os.remove(staged)
+        if backend == BACKEND_OPENVINO and not keep_intermediate and os.path.exists(intermediate):
+            os.remove(intermediate)
+
+    if os.path.abspath(exported) != os.path.abspath(target):
+        shutil.move(exported, target)
+    print(f"✅ Exportado: {target}")
+    return target
+
+
+def load_yolo_model(model_name: str | None = None, backend: str | None = None, imgsz: int | None = None,
+                    warmup: int | None = None):
+    """
+    Carrega o detector YOLO no backend pedido (mesma interface track()/predict())
+
+    Args:
+        model_name: Pesos .pt (padrão: config.MODEL_PATH)
+        backend: Um de BACKENDS (padrão: config.MODEL_BACKEND)
+        imgsz: Tamanho de entrada fixado na exportação (padrão: config.MODEL_IMGSZ)
+        warmup: Frames sintéticos de warm-up (padrão: config.MODEL_WARMUP_FRAMES; 0 = sem)
+    """
+    t_start = time.perf_counter()
     if model_name is None:
         model_name = config.MODEL_PATH
+    if backend is None:
+        backend = getattr(config, "MODEL_BACKEND", BACKEND_PYTORCH)
+    if imgsz is None:
+        imgsz = getattr(config, "MODEL_IMGSZ", 640)
+    if warmup is None:
+        warmup = getattr(config, "MODEL_WARMUP_FRAMES", 0)
 
     # mantem compatibilidade com serialização (se necessário)
     try:
@@ -12,8 +206,39 @@ def load_yolo_model(model_name: str | None = None):
     except Exception:
         pass
 
-    print(f"📦 Carregando modelo: {model_name}")
-    model = YOLO(model_name)
+    backend = resolve_backend(backend)
+    path = model_name
+    if backend != BACKEND_PYTORCH:
+        if not model_name.endswith(".pt"):
+            print(f"⚠️  Backend {backend} precisa de pesos .pt; usando {model_name} como está")
+            backend = BACKEND_PYTORCH
+        elif not _runtime_available(backend):
+            print(f"⚠️  Runtime de {backend} não instalado; usando PyTorch")
+            backend = BACKEND_PYTORCH
+        else:
+            if backend == BACKEND_ONNX_INT8:
+                path = export_path(model_name, backend, imgsz)
+                if not os.path.exists(path):
+                    print("⚠️  Modelo INT8 não encontrado (rode detection/tools/quantize_model.py); usando ONNX FP32")
+                    backend = BACKEND_ONNX
+            if backend != BACKEND_ONNX_INT8:
+                try:
+                    path = export_model(model_name, backend, imgsz)
+                except Exception as e:
+                    print(f"⚠️  Falha ao exportar para {backend} ({e}); usando PyTorch")
+                    backend = BACKEND_PYTORCH
+                    path = model_name
+
+    if backend == BACKEND_PYTORCH and model_name.endswith(".pt") and getattr(config, "MODEL_FUSED_CACHE", False):
+        try:
+            path = fused_model(model_name)
+        except Exception as e:
+            print(f"⚠️  Falha ao gravar modelo fundido ({e}); usando {model_name}")
+            path = model_name
+
+    print(f"📦 Carregando modelo: {path} (backend: {backend})")
+    model = YOLO(path, task="detect")
+    model.backend = backend
 
     # --- Confidence ---
     conf_value = getattr(config, "CONFIDENCE_THRESHOLD", None)
@@ -65,16 +290,23 @@ def load_yolo_model(model_name: str | None = None):
             overrides["conf"] = conf_value
         if classes_to_set is not None:
             overrides["classes"] = classes_to_set
+        if backend != BACKEND_PYTORCH:
+            overrides["imgsz"] = imgsz  # Modelo exportado tem entrada fixa
         if overrides and hasattr(model, "overrides"):
             model.overrides.update(overrides)
     except Exception:
         pass
 
-    print("✅ Modelo carregado")
+    print(f"✅ Modelo carregado em {time.perf_counter() - t_start:.2f}s")
     print(f"📊 Todas as classes (index:name): {model.names}")
     print(f"🔎 Confidence aplicado: {getattr(model, 'conf', conf_value)}")
     print(f"🎯 Classes aplicadas (índices): {getattr(model, 'classes', classes_to_set)}")
 
+    tracker = None if getattr(config, "TRACKER", "ultralytics") == "numpy" \
+        else getattr(config, "TRACKER_CONFIG", "bytetrack.yaml")
+    warmup_model(model, imgsz, warmup, tracker=tracker)
+    print(f"⏱️  Detector pronto em {time.perf_counter() - t_start:.2f}s")
+
     return model
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""
+Gate de movimento - evita rodar o YOLO em frames estáticos
+
+Diferença entre frames (ou subtração de fundo) em uma versão reduzida do
+frame, com buffers pré-alocados. A inferência só roda quando o score de
+movimento passa do limiar, durante um tempo de 'hold' depois do último
+movimento, ou em um heartbeat de baixa frequência.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+METHOD_DIFF = "diff"  # Diferença com o frame anterior (mais barato)
+METHOD_MOG2 = "mog2"  # Subtração de fundo (robusto a ruído, um pouco mais caro)
+
+
+class MotionResult:
+    """Resultado do gate para um frame"""
+
+    __slots__ = ('score', 'regions', 'run_inference', 'reason')
+
+    def __init__(self, score, regions, run_inference, reason):
+        self.score = score                  # Fração de pixels em movimento (0..1)
+        self.regions = regions              # list[(x1, y1, x2, y2)] em pixels do frame original
+        self.run_inference = run_inference  # Rodar o detector neste frame?
+        self.reason = reason                # "motion", "hold", "heartbeat" ou "idle"
+
+
+class MotionGate:
+    """Decide, a custo baixo, se o frame merece passar pelo detector"""
+
+    def __init__(self, size=96, threshold=0.002, pixel_threshold=25, heartbeat=1.0,
+                 hold=0.5, min_region_area=4, method=METHOD_DIFF):
+        """
+        Args:
+            size: Lado do frame reduzido usado na análise (pixels)
+            threshold: Fração mínima de pixels em movimento para disparar
+            pixel_threshold: Diferença de intensidade (0-255) que conta como movimento
+            heartbeat: Roda a inferência pelo menos a cada N segundos
+            hold: Continua inferindo por N segundos após o último movimento
+            min_region_area: Área mínima (pixels reduzidos) de uma região
+            method: METHOD_DIFF ou METHOD_MOG2
+        """
+        if method not in (METHOD_DIFF, METHOD_MOG2):
+            raise ValueError(f"method inválido: {method!r}")
+
+        self.size = size
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.heartbeat = heartbeat
+        self.hold = hold
+        self.min_region_area = min_region_area
+        self.method = method
+
+        # Buffers pré-alocados
+        self._small = np.empty((size, size, 3), dtype=np.uint8)
+        self._gray = np.empty((size, size), dtype=np.uint8)
+        self._prev = np.empty((size, size), dtype=np.uint8)
+        self._diff = np.empty((size, size), dtype=np.uint8)
+        self._mask = np.empty((size, size), dtype=np.uint8)
+        self._has_prev = False
+        self._subtractor = None
+        if method == METHOD_MOG2:
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(
+                history=120, varThreshold=pixel_threshold, detectShadows=False
+            )
+
+        self._last_motion = None
+        self._last_inference = None
+        self._moving = False
+
+        # Estatísticas
+        self.frames = 0
+        self.inferred = 0
+        self.gate_time = 0.0
+        self.inference_time = 0.0
+        self.onset_count = 0
+        self.onset_time = 0.0
+
+    def update(self, frame, now=None):
+        """
+        Analisa o frame e decide se roda a inferência
+
+        Args:
+            frame: Frame BGR (qualquer tamanho; pode ser somente leitura)
+            now: Instante do frame (padrão: time.monotonic)
+
+        Returns:
+            MotionResult
+        """
+        t0 = time.perf_counter()
+        now = time.monotonic() if now is None else now
+
+        score = self._motion_score(frame)
+        moving = score >= self.threshold
+        regions = self._regions(frame.shape) if moving else []
+
+        if moving:
+            self._last_motion = now
+            reason = "motion"
+        elif self._last_motion is not None and now - self._last_motion < self.hold:
+            reason = "hold"
+        elif self._last_inference is None or now - self._last_inference >= self.heartbeat:
+            reason = "heartbeat"
+        else:
+            reason = "idle"
+
+        run = reason != "idle"
+        if run:
+            self._last_inference = now
+            self.inferred += 1
+
+        elapsed = time.perf_counter() - t0
+        self.frames += 1
+        self.gate_time += elapsed
+
+        # Primeiro frame de um lançamento: latência extra = custo do gate
+        if moving and not self._moving:
+            self.onset_count += 1
+            self.onset_time += elapsed
+        self._moving = moving
+
+        return MotionResult(score, regions, run, reason)
+
+    def _motion_score(self, frame):
+        cv2.resize(frame, (self.size, self.size), dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._subtractor is not None:
+            self._mask[...] = self._subtractor.apply(self._gray)
+        else:
+            if not self._has_prev:
+                self._prev[...] = self._gray
+                self._has_prev = True
+                self._mask.fill(0)
+                return 0.0
+            cv2.absdiff(self._gray, self._prev, dst=self._diff)
+            cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+            self._prev[...] = self._gray
+
+        return cv2.countNonZero(self._mask) / float(self.size * self.size)
+
+    def _regions(self, shape):
+        """Caixas das regiões em movimento, em coordenadas do frame original"""
+        count, _, stats, _ = cv2.connectedComponentsWithStats(self._mask, connectivity=8)
+        sy = shape[0] / self.size
+        sx = shape[1] / self.size
+        regions = []
+        for x, y, w, h, area in stats[1:count]:
+            if area < self.min_region_area:
+                continue
+            regions.append((int(x * sx), int(y * sy), int((x + w) * sx), int((y + h) * sy)))
+        return regions
+
+    def record_inference(self, seconds):
+        """Informa quanto custou a inferência (para estimar o CPU economizado)"""
+        self.inference_time += seconds
+
+    def stats(self):
+        """
+        Returns:
+            dict com frames, inferidos, pulados, custo médio do gate (ms),
+            CPU economizado estimado (ms e %) e latência extra no início de
+            um lançamento (ms)
+        """
+        skipped = self.frames - self.inferred
+        avg_infer = self.inference_time / self.inferred if self.inferred else 0.0
+        saved = skipped * avg_infer
+        spent = self.inference_time + self.gate_time
+        return {
+            'frames': self.frames,
+            'inferred': self.inferred,
+            'skipped': skipped,
+            'gate_ms': self.gate_time / self.frames * 1000 if self.frames else 0.0,
+            'saved_ms': saved * 1000,
+            'saved_pct': saved / (saved + spent) * 100 if saved + spent > 0 else 0.0,
+            'onset_latency_ms': self.onset_time / self.onset_count * 1000 if self.onset_count else 0.0,
+        }
@@ -1,64 +1,194 @@
 import numpy as np
 from collections import deque
-from time import time
+from time import monotonic
+
+
+# Modos de ajuste da trajetória
+FIT_LINEAR = "linear"        # Reta em cada eixo (velocidade média da janela)
+FIT_BALLISTIC = "ballistic"  # z(t) = z0 + vz·t - ½g·t² com g fixo; x, y retas
+FIT_MODES = (FIT_LINEAR, FIT_BALLISTIC)
 
 
 class PhysicsPredictor:
     """Prediz trajetória de queda livre considerando gravidade"""
     
-    def __init__(self, history_size=10, robot_height=0.0, gravity=9.81):
+    def __init__(self, history_size=10, robot_height=0.0, gravity=9.81, fit_mode=FIT_LINEAR):
         """
         Args:
             history_size: Quantos pontos guardar no histórico
             robot_height: Altura onde o robô pega o objeto (metros)
             gravity: Aceleração da gravidade (m/s²)
+            fit_mode: FIT_LINEAR ou FIT_BALLISTIC
         """
+        if fit_mode not in FIT_MODES:
+            raise ValueError(f"fit_mode inválido: {fit_mode!r} (opções: {FIT_MODES})")
+        
         self.robot_height = robot_height
         self.gravity = gravity
+        self.fit_mode = fit_mode
         
         # Histórico circular
         self.positions = deque(maxlen=history_size)
         self.timestamps = deque(maxlen=history_size)
+        self.weights = deque(maxlen=history_size)
+        
+        # Somas ponderadas da regressão sobre a janela, com o tempo relativo a
+        # self.origin (valores pequenos, sem cancelamento com monotonic() grande):
+        # Σw, Σw·t, Σw·t², Σw·t³, Σw·p (3,), Σw·t·p (3,)
+        self.origin = 0.0
+        self.count = 0
+        self._reset_sums()
+    
+    def _reset_sums(self):
+        self.sum_w = 0.0
+        self.sum_t = 0.0
+        self.sum_tt = 0.0
+        self.sum_ttt = 0.0
+        self.sum_p = np.zeros(3)
+        self.sum_tp = np.zeros(3)
+        self.evictions = 0
     
-    def add_point(self, position_3d):
+    def add_point(self, position_3d, timestamp=None, weight=1.0):
         """
-        Adiciona ponto 3D ao histórico
+        Adiciona ponto 3D ao histórico (O(1): atualiza as somas da regressão)
         
         Args:
             position_3d: np.array([x, y, z]) em metros
+            timestamp: Instante da captura do frame (time.monotonic);
+                None usa o instante atual
+            weight: Peso do ponto no ajuste (ex: confiança da detecção)
         """
+        timestamp = monotonic() if timestamp is None else timestamp
+        if not self.timestamps:
+            self.origin = timestamp
+        
+        if len(self.timestamps) == self.timestamps.maxlen:
+            # Ponto mais antigo sai da janela: tira a contribuição dele
+            self._accumulate(self.positions[0], self.timestamps[0], -self.weights[0])
+            self.count -= 1
+            self.evictions += 1
+        
         self.positions.append(position_3d)
-        self.timestamps.append(time())
+        self.timestamps.append(timestamp)
+        self.weights.append(weight)
+        self._accumulate(position_3d, timestamp, weight)
+        self.count += 1
+        
+        # A cada janela inteira renovada, recalcula as somas com a origem no
+        # ponto mais novo: descarta o erro de arredondamento acumulado pelas
+        # subtrações e mantém t pequeno (custo O(janela) amortizado em O(1))
+        if self.evictions >= self.timestamps.maxlen:
+            self._rebase()
+    
+    def _accumulate(self, position, timestamp, weight):
+        t = timestamp - self.origin
+        wt = weight * t
+        position = np.asarray(position, dtype=np.float64)
+        self.sum_w += weight
+        self.sum_t += wt
+        self.sum_tt += wt * t
+        self.sum_ttt += wt * t * t
+        self.sum_p += weight * position
+        self.sum_tp += wt * position
+    
+    def _rebase(self):
+        """Recalcula as somas a partir do histórico com nova origem"""
+        self.origin = self.timestamps[-1]
+        self._reset_sums()
+        for position, timestamp, weight in zip(self.positions, self.timestamps, self.weights):
+            self._accumulate(position, timestamp, weight)
     
     def clear_history(self):
         """Limpa histórico"""
         self.positions.clear()
         self.timestamps.clear()
+        self.weights.clear()
+        self.count = 0
+        self._reset_sums()
     
-    def calculate_velocity(self):
+    def fit_state(self):
         """
-        Calcula velocidade atual usando regressão linear
+        Posição e velocidade no instante do último ponto, pelo ajuste da janela
+        
+        Mínimos quadrados ponderados em forma fechada sobre as somas mantidas
+        por add_point (sem montar arrays). FIT_LINEAR: inclinação da reta de
+        cada eixo (= np.polyfit grau 1 com pesos iguais) e a posição medida
+        do último ponto. FIT_BALLISTIC: z + ½g·t² é linear em t, então a
+        mesma regressão dá z0 e vz com g fixo (usa Σw·t³); a posição sai
+        do ajuste, o que filtra o ruído do último ponto.
         
         Returns:
-            np.array([vx, vy, vz]) - Velocidade em m/s
+            (posição np.array([x, y, z]), velocidade np.array([vx, vy, vz]))
             None se dados insuficientes
         """
-        if len(self.positions) < 3:
+        if self.count < 3:
             return None
         
-        # Converter para arrays numpy
-        t = np.array(self.timestamps)
-        pos = np.array(self.positions)
+        # Inclinação = (W·Σwtp - Σwt·Σwp) / (W·Σwt² - (Σwt)²)
+        denominator = self.sum_w * self.sum_tt - self.sum_t * self.sum_t
+        if denominator <= 0.0:
+            return None  # Todos os pontos no mesmo instante
+        
+        if self.fit_mode == FIT_LINEAR:
+            velocity = (self.sum_w * self.sum_tp - self.sum_t * self.sum_p) / denominator
+            return np.asarray(self.positions[-1], dtype=np.float64), velocity
+        
+        # Eixo z com a gravidade somada de volta: w = z + ½g·t²
+        half_g = 0.5 * self.gravity
+        sum_p = self.sum_p.copy()
+        sum_tp = self.sum_tp.copy()
+        sum_p[2] += half_g * self.sum_tt
+        sum_tp[2] += half_g * self.sum_ttt
+        
+        slope = (self.sum_w * sum_tp - self.sum_t * sum_p) / denominator
+        intercept = (sum_p - slope * self.sum_t) / self.sum_w
+        
+        # Estado no último ponto (t relativo à origem)
+        t = self.timestamps[-1] - self.origin
+        position = intercept + slope * t
+        position[2] -= half_g * t * t
+        slope[2] -= self.gravity * t
+        return position, slope
+    
+    def calculate_velocity(self):
+        """
+        Calcula velocidade atual usando regressão (modo em fit_mode)
+        
+        Returns:
+            np.array([vx, vy, vz]) - Velocidade em m/s no último ponto
+            None se dados insuficientes
+        """
+        state = self.fit_state()
+        return None if state is None else state[1]
+    
+    @property
+    def last_timestamp(self):
+        """Instante do ponto mais recente (None se histórico vazio)"""
+        return self.timestamps[-1] if self.timestamps else None
+    
+    def predict_position(self, dt):
+        """
+        Posição prevista dt segundos após o último ponto (queda livre)
+        
+        Args:
+            dt: Intervalo a partir do último ponto (segundos)
         
-        # Normalizar tempo (último frame = 0)
-        t_rel = t - t[-1]
+        Returns:
+            np.array([x, y, z]) - Posição prevista
+            None se dados insuficientes
+        """
+        state = self.fit_state()
+        if state is None:
+            return None
         
-        # Regressão linear para cada eixo
-        vx = np.polyfit(t_rel, pos[:, 0], 1)[0]
-        vy = np.polyfit(t_rel, pos[:, 1], 1)[0]
-        vz = np.polyfit(t_rel, pos[:, 2], 1)[0]
+        x0, y0, z0 = state[0]
+        vx, vy, vz = state[1]
         
-        return np.array([vx, vy, vz])
+        return np.array([
+            x0 + vx * dt,
+            y0 + vy * dt,
+            z0 + vz * dt - 0.5 * self.gravity * dt**2
+        ])
     
     def predict_landing(self):
         """
@@ -68,18 +198,14 @@ class PhysicsPredictor:
             landing_point: np.array([x, y, z]) - Ponto de chegada
             None se não puder calcular
         """
-        if len(self.positions) < 3:
-            return None
-        
         # Posição e velocidade atuais
-        current_pos = self.positions[-1]
-        velocity = self.calculate_velocity()
+        state = self.fit_state()
         
-        if velocity is None:
+        if state is None:
             return None
         
-        x0, y0, z0 = current_pos
-        vx, vy, vz = velocity
+        x0, y0, z0 = state[0]
+        vx, vy, vz = state[1]
         
         # Resolver equação de queda livre
         # z(t) = z0 + vz*t - 0.5*g*t²
@@ -127,10 +253,8 @@ class PhysicsPredictor:
             return []
         
         # Posição e velocidade atuais
-        current_pos = self.positions[-1]
-        velocity = self.calculate_velocity()
-        
-        x0, y0, z0 = current_pos
+        position, velocity = self.fit_state()
+        x0, y0, z0 = position
         vx, vy, vz = velocity
         
         # Calcular tempo até impacto
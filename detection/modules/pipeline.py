@@ -0,0 +1,330 @@
+"""
+Pipeline em estágios - captura → inferência → pós-processamento → exibição
+
+Cada estágio roda em sua própria thread e passa o resultado adiante por uma
+fila limitada do tipo "o mais novo vence": se o estágio seguinte está
+ocupado, o item antigo é descartado (e seu frame devolvido ao buffer) em vez
+de acumular atraso. Assim a inferência do frame N+1 sobrepõe o
+pós-processamento e a exibição do frame N, e nenhum estágio espera por um
+estágio posterior.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Slots mínimos do ring buffer da câmera com o pipeline ligado: um frame na
+# inferência, um em cada fila, um no pós-processamento, o mais recente e o
+# que está sendo escrito
+MIN_BUFFER_SLOTS = 6
+
+
+class FramePacket:
+    """Frame em trânsito pelo pipeline, com os resultados de cada estágio"""
+
+    __slots__ = ('ref', 'frame', 'seq', 'timestamp', 't_start',
+                 'results', 'right', 'roi', 'detections', 'landing', 'trajectory')
+
+    def __init__(self, ref):
+        self.ref = ref              # FrameRef emprestado do buffer da câmera
+        self.frame = ref.frame      # View somente leitura (None após release())
+        self.seq = ref.seq
+        self.timestamp = ref.timestamp
+        self.t_start = time.perf_counter()
+        self.results = None         # Saída do detector
+        self.right = None           # Detecções da câmera direita (modo estéreo)
+        self.roi = None             # Recorte usado na inferência (None = frame inteiro)
+        self.detections = None      # [(bbox, class_id, confidence, pos_3d)]
+        self.landing = None
+        self.trajectory = None
+
+    def release(self):
+        """Devolve o frame ao buffer da câmera (pode ser chamado mais de uma vez)"""
+        if self.ref is not None:
+            self.ref.release()
+            self.ref = None
+            self.frame = None
+
+
+class LatestQueue:
+    """Fila limitada em que o item mais novo vence (descarta o mais antigo)"""
+
+    def __init__(self, name, maxsize=1, on_drop=None):
+        """
+        Args:
+            name: Nome da fila (estatísticas)
+            maxsize: Itens mantidos antes de começar a descartar
+            on_drop: Chamado com cada item descartado (ex: liberar o frame)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize precisa ser >= 1")
+
+        self.name = name
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.cond = threading.Condition()
+        self._items = deque()
+        self.closed = False
+
+        # Estatísticas
+        self.put_count = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, item):
+        """
+        Enfileira sem nunca bloquear
+
+        Returns:
+            bool - False se a fila já estava fechada (item descartado)
+        """
+        dropped = []
+        with self.cond:
+            if self.closed:
+                dropped.append(item)
+            else:
+                self._items.append(item)
+                self.put_count += 1
+                while len(self._items) > self.maxsize:
+                    dropped.append(self._items.popleft())
+                    self.dropped += 1
+                self.max_depth = max(self.max_depth, len(self._items))
+                self.cond.notify()
+
+        # Fora da trava: on_drop pode mexer em outras travas (ring buffer)
+        for old in dropped:
+            self._drop(old)
+        return not self.closed
+
+    def get(self, timeout=None):
+        """
+        Retira o item mais antigo disponível
+
+        Returns:
+            item ou None em timeout / fila fechada e vazia
+        """
+        with self.cond:
+            if not self._items and not self.closed:
+                self.cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    @property
+    def finished(self):
+        """Fechada e sem itens pendentes"""
+        with self.cond:
+            return self.closed and not self._items
+
+    @property
+    def depth(self):
+        with self.cond:
+            return len(self._items)
+
+    def close(self, drain=False):
+        """
+        Fecha a fila (acorda quem espera em get())
+
+        Args:
+            drain: Descarta também os itens pendentes
+        """
+        with self.cond:
+            self.closed = True
+            pending = list(self._items) if drain else []
+            if drain:
+                self._items.clear()
+            self.cond.notify_all()
+        for item in pending:
+            self._drop(item)
+
+    def _drop(self, item):
+        if self.on_drop is not None:
+            try:
+                self.on_drop(item)
+            except Exception as e:
+                print(f"⚠️  Erro ao descartar item da fila {self.name}: {e}")
+
+    def stats(self):
+        with self.cond:
+            return {
+                'depth': len(self._items),
+                'max_depth': self.max_depth,
+                'put': self.put_count,
+                'dropped': self.dropped,
+            }
+
+
+class CameraSource:
+    """Adapta um CameraManager à interface de fila (get/finished) do primeiro estágio"""
+
+    def __init__(self, camera, wait_timeout=0.05):
+        self.name = "camera"
+        self.camera = camera
+        self.wait_timeout = wait_timeout
+        self.last_seq = 0
+        self.closed = False
+
+    def get(self, timeout=None):
+        ref = self.camera.wait_for_frame(self.last_seq, timeout=timeout or self.wait_timeout)
+        if ref is not None:
+            self.last_seq = ref.seq
+        return ref
+
+    @property
+    def finished(self):
+        return self.closed or not self.camera.is_running
+
+    def close(self, drain=False):
+        self.closed = True
+
+    def stats(self):
+        cam = self.camera.stats()
+        return {'depth': 0, 'max_depth': 0, 'put': cam['captured'], 'dropped': cam['dropped']}
+
+
+class StageStats:
+    """Latência de um estágio (média, última e máxima)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'avg_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'last_ms': self.last * 1000,
+            'max_ms': self.max * 1000,
+            'errors': self.errors,
+        }
+
+
+class Stage:
+    """Thread que consome 'inbox', aplica 'work' e publica em 'outbox'"""
+
+    def __init__(self, name, work, inbox, outbox=None, release=None, poll=0.05):
+        """
+        Args:
+            name: Nome do estágio (thread e estatísticas)
+            work: Função item -> resultado (None = nada a repassar)
+            inbox: LatestQueue ou CameraSource
+            outbox: LatestQueue do próximo estágio (None = último estágio)
+            release: Chamado com o item quando 'work' falha
+            poll: Espera máxima por item antes de reavaliar a parada
+        """
+        self.name = name
+        self.work = work
+        self.inbox = inbox
+        self.outbox = outbox
+        self.release = release
+        self.poll = poll
+        self.stats = StageStats()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name=f"pipeline-{self.name}", daemon=True)
+        self.thread.start()
+
+    def _loop(self):
+        try:
+            while self.running:
+                item = self.inbox.get(timeout=self.poll)
+                if item is None:
+                    if self.inbox.finished:
+                        break
+                    continue
+
+                t0 = time.perf_counter()
+                try:
+                    result = self.work(item)
+                except Exception as e:
+                    self.stats.errors += 1
+                    print(f"❌ Erro no estágio {self.name}: {e}")
+                    if self.release is not None:
+                        self.release(item)
+                    continue
+                self.stats.record(time.perf_counter() - t0)
+
+                if result is not None and self.outbox is not None:
+                    self.outbox.put(result)
+        finally:
+            # Propaga o fim para o próximo estágio
+            if self.outbox is not None:
+                self.outbox.close()
+
+    def stop(self):
+        self.running = False
+
+    def join(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+            return not self.thread.is_alive()
+        return True
+
+
+class Pipeline:
+    """Conjunto de estágios encadeados com estatísticas agregadas"""
+
+    def __init__(self):
+        self.stages = []
+        self.queues = []
+
+    def queue(self, name, maxsize=1, on_drop=None):
+        """Cria uma fila entre estágios"""
+        q = LatestQueue(name, maxsize=maxsize, on_drop=on_drop)
+        self.queues.append(q)
+        return q
+
+    def stage(self, name, work, inbox, outbox=None, release=None):
+        """Adiciona um estágio (na ordem do fluxo)"""
+        s = Stage(name, work, inbox, outbox, release=release)
+        self.stages.append(s)
+        return s
+
+    def start(self):
+        for s in self.stages:
+            s.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Espera o último estágio terminar; retorna True se terminou"""
+        return self.stages[-1].join(timeout) if self.stages else True
+
+    @property
+    def finished(self):
+        """Todos os estágios terminaram (fonte esgotada ou stop())"""
+        return all(s.thread is not None and not s.thread.is_alive() for s in self.stages)
+
+    def stop(self, timeout=3.0):
+        """Para os estágios, descarta (e libera) o que ficou nas filas"""
+        for s in self.stages:
+            s.stop()
+        for q in self.queues:
+            q.close(drain=True)
+        for s in self.stages:
+            if not s.join(timeout):
+                print(f"⚠️  Estágio {s.name} não parou a tempo")
+        # Itens publicados por estágios que terminaram depois do close()
+        for q in self.queues:
+            q.close(drain=True)
+
+    def stats(self):
+        """
+        Returns:
+            dict {'stages': {nome: latência}, 'queues': {nome: profundidade/descartes}}
+        """
+        return {
+            'stages': {s.name: s.stats.snapshot() for s in self.stages},
+            'queues': {q.name: q.stats() for q in self.queues},
+        }
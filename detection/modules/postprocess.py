@@ -0,0 +1,112 @@
+"""
+Pós-processamento vetorizado das detecções
+
+Em vez de percorrer caixa por caixa (um tensor 1x4 por detecção), os
+resultados do detector vão para NumPy uma única vez por frame e tamanho real,
+caixas inteiras e posição 3D saem de operações em arrays.
+"""
+
+import numpy as np
+
+# Colunas de boxes.data: x1, y1, x2, y2, [id do rastreador], confiança, classe.
+# O id só existe com track(), por isso confiança e classe são lidas do fim.
+COL_CONF = -2
+COL_CLASS = -1
+
+
+def results_to_array(results):
+    """
+    Junta as caixas de todos os Results em um único array
+
+    Args:
+        results: Lista de Results do ultralytics ou de arrays (N, 6|7)
+            (saída do DirectEngine)
+
+    Returns:
+        np.ndarray (N, 6) ou (N, 7) float32 (N = 0 se não houver caixas)
+    """
+    arrays = []
+    for result in results:
+        if isinstance(result, np.ndarray):
+            if len(result):
+                arrays.append(result)
+            continue
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            continue
+        data = boxes.data
+        if hasattr(data, 'cpu'):
+            data = data.cpu().numpy()
+        arrays.append(np.asarray(data, dtype=np.float32))
+
+    if not arrays:
+        return np.empty((0, 6), dtype=np.float32)
+    if len(arrays) == 1:
+        return arrays[0]
+    if len(set(a.shape[1] for a in arrays)) > 1:
+        # Mistura de resultados com e sem id: descarta o id
+        arrays = [a[:, [0, 1, 2, 3, COL_CONF, COL_CLASS]] for a in arrays]
+    return np.concatenate(arrays)
+
+
+class SizeLookup:
+    """Tabela classe -> largura real (metros) consultada com um array de classes"""
+
+    def __init__(self, dimensions, default):
+        """
+        Args:
+            dimensions: dict {class_id: largura em metros} (config.OBJECT_DIMENSIONS)
+            default: Largura das classes fora da tabela
+        """
+        size = max(dimensions) + 1 if dimensions else 1
+        self.table = np.full(size, default, dtype=np.float64)
+        for class_id, width in dimensions.items():
+            self.table[class_id] = width
+        self.default = default
+
+    def __call__(self, class_ids):
+        """
+        Args:
+            class_ids: Array (N,) de classes (inteiros)
+
+        Returns:
+            np.ndarray (N,) com a largura real de cada classe
+        """
+        class_ids = np.asarray(class_ids, dtype=np.int64)
+        inside = (class_ids >= 0) & (class_ids < len(self.table))
+        return np.where(inside, self.table[np.clip(class_ids, 0, len(self.table) - 1)], self.default)
+
+
+def extract_detections(data, spatial, sizes, stereo=None, right=None):
+    """
+    Caixas, classes, confianças e posições 3D (referencial do mundo) de um frame
+
+    Args:
+        data: Saída de results_to_array
+        spatial: SpatialProcessor
+        sizes: SizeLookup
+        stereo: StereoTriangulator (modo estéreo) ou None
+        right: Detecções da câmera direita (M, 6|7), usadas com stereo
+
+    Returns:
+        (bboxes int (N, 4), class_ids (N,), confidences (N,), widths (N,),
+         positions (N, 3), valid (N,)) - valid marca as posições 3D calculáveis
+         e, com extrínseca, dentro dos limites físicos (valid_positions)
+    """
+    # Caixas truncadas para pixels inteiros (como int() na versão escalar)
+    bboxes = data[:, :4].astype(np.int32)
+    class_ids = data[:, COL_CLASS].astype(np.int64)
+    confidences = data[:, COL_CONF]
+    widths = sizes(class_ids)
+    positions, valid = spatial.calculate_3d_positions(bboxes, widths)
+    if stereo is not None and right is not None:
+        # Casadas na direita: triangulação; as demais ficam com a estimativa pela largura
+        triangulated, matched = stereo.calculate_3d_positions(bboxes, class_ids, right)
+        positions[matched] = triangulated[matched]
+        valid |= matched
+    spatial.to_world(positions, out=positions)  # Extrínseca no lote inteiro, antes da física
+    if spatial.extrinsics is not None:
+        # Limites de valid_positions são do mundo (Z = altura); sem extrínseca
+        # o Z é a profundidade e o limite de altura cortaria objetos distantes
+        valid &= spatial.valid_positions(positions)
+    return bboxes, class_ids, confidences, widths, positions, valid
@@ -0,0 +1,246 @@
+"""
+Fonte de frames gravados - vídeo ou sequência de imagens no lugar da câmera
+
+Mesma API do CameraManager (start/get_frame/borrow/wait_for_frame/stop), para
+rodar benchmarks e testes de regressão sem webcam. Os timestamps vêm do
+arquivo (sidecar ou índice/FPS), então são determinísticos entre execuções.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import cv2
+
+try:
+    from .camera_manager import CameraManager, DEFAULT_SIZE, DEFAULT_FPS, CAPTURE_PACED
+    from .frame_buffer import DEFAULT_SLOTS
+except ImportError:  # Executado como script
+    from camera_manager import CameraManager, DEFAULT_SIZE, DEFAULT_FPS, CAPTURE_PACED
+    from frame_buffer import DEFAULT_SLOTS
+
+# Modos de ritmo
+PACING_REALTIME = "realtime"  # Respeita os timestamps gravados (como a câmera real)
+PACING_FAST = "fast"          # Sem espera: próximo frame assim que o anterior for consumido
+PACING_STEP = "step"          # Como "fast", mas com timestamps sintéticos i * step
+PACINGS = (PACING_REALTIME, PACING_FAST, PACING_STEP)
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp'}
+TIMESTAMP_SIDECAR = "timestamps.txt"
+
+
+def load_timestamps(path, count):
+    """
+    Lê o sidecar de timestamps: um valor em segundos por linha
+    (ou 'arquivo,timestamp'); linhas vazias e '#' são ignoradas
+
+    Returns:
+        list[float] ou None se o arquivo não existir
+    """
+    path = Path(path)
+    if not path.is_file():
+        return None
+
+    values = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        values.append(float(line.split(',')[-1]))
+
+    if len(values) < count:
+        raise ValueError(f"{path}: {len(values)} timestamps para {count} frames")
+    return values[:count]
+
+
+class ImageSequenceReader:
+    """Lê uma pasta de imagens como se fosse um cv2.VideoCapture"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.files = sorted(
+            p for p in self.directory.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        self.index = 0
+
+    def isOpened(self):
+        return len(self.files) > 0
+
+    def read(self, image=None):
+        if self.index >= len(self.files):
+            return False, None
+        frame = cv2.imread(str(self.files[self.index]), cv2.IMREAD_COLOR)
+        self.index += 1
+        return frame is not None, frame
+
+    def rewind(self):
+        self.index = 0
+
+    def __len__(self):
+        return len(self.files)
+
+    def release(self):
+        pass
+
+
+class RecordedSource(CameraManager):
+    """CameraManager alimentado por vídeo gravado ou pasta de frames"""
+
+    def __init__(self, path, size=DEFAULT_SIZE, pacing=PACING_REALTIME, step=None,
+                 fps=None, loop=False, buffer_slots=DEFAULT_SLOTS):
+        """
+        Args:
+            path: Arquivo de vídeo ou pasta de imagens (+ timestamps.txt opcional)
+            size: Lado do frame quadrado entregue
+            pacing: PACING_REALTIME, PACING_FAST ou PACING_STEP
+            step: Intervalo fixo entre frames no modo step (padrão: 1/fps)
+            fps: FPS quando não há timestamps (padrão: do vídeo ou DEFAULT_FPS)
+            loop: Recomeçar ao chegar no fim
+            buffer_slots: Slots do ring buffer
+        """
+        if pacing not in PACINGS:
+            raise ValueError(f"pacing inválido: {pacing!r} (opções: {PACINGS})")
+
+        self.path = str(path)
+        self.pacing = pacing
+        self.loop = loop
+        self._requested_fps = fps
+        self._step = step
+        self.timestamps = None
+        self.finished = False
+
+        super().__init__(src=self.path, size=size, fps=fps or DEFAULT_FPS,
+                         buffer_slots=buffer_slots, capture_mode=CAPTURE_PACED)
+
+    def _open_camera(self):
+        """Abre o arquivo/pasta e prepara os timestamps determinísticos"""
+        print(f"🎞️  Abrindo gravação {self.path}...")
+
+        if os.path.isdir(self.path):
+            self.cap = ImageSequenceReader(self.path)
+            self.backend_name = "Sequência de imagens"
+            count = len(self.cap)
+            sidecar = os.path.join(self.path, TIMESTAMP_SIDECAR)
+            native_fps = self._requested_fps or DEFAULT_FPS
+        elif os.path.isfile(self.path):
+            self.cap = cv2.VideoCapture(self.path)
+            self.backend_name = "Arquivo de vídeo"
+            count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            sidecar = os.path.splitext(self.path)[0] + ".timestamps.txt"
+            native_fps = self._requested_fps or self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        else:
+            raise ValueError(f"❌ Gravação não encontrada: {self.path}")
+
+        if not self.cap.isOpened() or count <= 0:
+            raise ValueError(f"❌ Não foi possível ler frames de {self.path}")
+
+        self.fps = native_fps
+        self.native_fps = float(native_fps)
+        self.frame_count = count
+
+        if self.pacing == PACING_STEP:
+            step = self._step or 1.0 / native_fps
+            self.timestamps = [i * step for i in range(count)]
+        else:
+            self.timestamps = load_timestamps(sidecar, count)
+            if self.timestamps is None:
+                self.timestamps = [i / native_fps for i in range(count)]
+
+        # Normaliza para começar em 0 (mesmo resultado em toda execução)
+        t0 = self.timestamps[0]
+        self.timestamps = [t - t0 for t in self.timestamps]
+        self.duration = self.timestamps[-1] + 1.0 / native_fps
+
+        print(f"  ✅ {count} frames ({self.backend_name}, {self.pacing}, "
+              f"{self.duration:.2f}s gravados)")
+
+    def _capture_loop(self):
+        """Entrega os frames gravados no ritmo escolhido"""
+        lockstep = self.pacing != PACING_REALTIME
+        offset = 0.0
+        wall_start = time.monotonic()
+
+        try:
+            while self.is_running:
+                for i, media_ts in enumerate(self.timestamps):
+                    if not self.is_running:
+                        break
+
+                    ret, raw = self.cap.read(self._raw)
+                    if not ret or raw is None:
+                        break
+                    self._raw = raw
+                    timestamp = offset + media_ts
+
+                    if lockstep:
+                        # Espera o consumidor pegar o frame anterior: nenhum frame é pulado
+                        seq = self.buffer.latest_seq
+                        if seq and not self.buffer.wait_consumed(seq):
+                            break
+                    else:
+                        delay = wall_start + timestamp - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+
+                    # captured_at = agora: idade mede só o atraso do pipeline
+                    while not self._store_frame(raw, timestamp, time.monotonic()):
+                        if not self.is_running:
+                            break
+                        time.sleep(0.001)  # Todos os slots emprestados
+                    self.frames_captured += 1
+
+                if not (self.loop and self.is_running):
+                    break
+
+                offset += self.duration
+                self._rewind()
+        except Exception as e:
+            print(f"❌ Erro no loop da gravação: {e}")
+        finally:
+            # Dá chance do último frame ser consumido antes de sinalizar o fim
+            if self.is_running and self.buffer.latest_seq:
+                timeout = 5.0 if lockstep else 2.0 / self.native_fps
+                self.buffer.wait_consumed(self.buffer.latest_seq, timeout=timeout)
+            self.finished = True
+            self.is_running = False
+            self.buffer.close()
+            print("🏁 Fim da gravação")
+
+    def _rewind(self):
+        if isinstance(self.cap, ImageSequenceReader):
+            self.cap.rewind()
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+def record(camera, output_dir, seconds=None, max_frames=None, ext=".jpg"):
+    """
+    Grava frames de um CameraManager em pasta + timestamps.txt
+    (formato lido por RecordedSource)
+
+    Returns:
+        int - Frames gravados
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    seq = 0
+    count = 0
+    t_end = None if seconds is None else time.monotonic() + seconds
+    with open(output_dir / TIMESTAMP_SIDECAR, 'w') as sidecar:
+        sidecar.write("# arquivo,timestamp (s)\n")
+        while camera.is_running:
+            if t_end is not None and time.monotonic() >= t_end:
+                break
+            if max_frames is not None and count >= max_frames:
+                break
+            ref = camera.wait_for_frame(seq, timeout=1.0)
+            if ref is None:
+                continue
+            with ref:
+                seq = ref.seq
+                name = f"frame_{count:06d}{ext}"
+                cv2.imwrite(str(output_dir / name), ref.frame)
+                sidecar.write(f"{name},{ref.timestamp:.6f}\n")
+            count += 1
+    return count
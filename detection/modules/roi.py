@@ -0,0 +1,162 @@
+"""
+Inferência guiada pelo rastreamento - YOLO só em volta da posição prevista
+
+Com um objeto travado (achado no último passe e com velocidade conhecida), a
+física prevê onde ele estará no próximo frame; o detector roda em um recorte
+quadrado em volta dessa posição e as caixas voltam para coordenadas do frame
+inteiro. Um passe no frame inteiro roda periodicamente e sempre que o objeto
+se perde, para pegar objetos novos.
+"""
+
+import numpy as np
+
+
+def offset_results(results, x0, y0, shape):
+    """
+    Leva as caixas de um recorte para coordenadas do frame inteiro (in-place)
+
+    Args:
+        results: Lista de Results do ultralytics ou arrays (N, 6|7) do
+            DirectEngine (inferência no recorte)
+        x0, y0: Canto superior esquerdo do recorte no frame
+        shape: Formato do frame inteiro (altura, largura, ...)
+    """
+    for result in results:
+        if isinstance(result, np.ndarray):
+            result[:, [0, 2]] += x0
+            result[:, [1, 3]] += y0
+            continue
+        boxes = result.boxes
+        result.orig_shape = tuple(shape[:2])
+        if boxes is None or len(boxes) == 0:
+            continue
+        data = boxes.data.clone()
+        data[:, [0, 2]] += x0
+        data[:, [1, 3]] += y0
+        result.update(boxes=data)
+    return results
+
+
+class RoiController:
+    """Decide, frame a frame, entre passe no recorte (ROI) e no frame inteiro"""
+
+    def __init__(self, frame_size, margin=2.5, min_size=160, align=32,
+                 full_interval=15, max_prediction=0.25):
+        """
+        Args:
+            frame_size: Lado do frame quadrado (pixels)
+            margin: Lado do recorte em múltiplos da largura prevista do objeto
+            min_size: Lado mínimo do recorte (pixels)
+            align: Lado do recorte arredondado para múltiplo deste valor
+                (stride do YOLO: o recorte entra sem redimensionar)
+            full_interval: Passes no recorte entre dois passes no frame inteiro
+            max_prediction: Horizonte máximo da previsão (segundos); além
+                disso o rastreamento é considerado velho
+        """
+        self.frame_size = frame_size
+        self.margin = margin
+        self.min_size = min_size
+        self.align = align
+        self.full_interval = full_interval
+        self.max_prediction = max_prediction
+
+        self.locked = False
+        self.object_width = None  # Largura real (m) do objeto travado
+        self.since_full = 0
+
+        # Estatísticas
+        self.roi_passes = 0
+        self.full_passes = 0
+        self.lost = 0
+        self.roi_time = 0.0
+        self.full_time = 0.0
+        self.roi_area = 0.0
+
+    def plan(self, physics, spatial, timestamp):
+        """
+        Recorte para o próximo passe
+
+        Args:
+            physics: PhysicsPredictor com o histórico do objeto
+            spatial: SpatialProcessor (projeção 3D -> pixel)
+            timestamp: Instante do frame a ser inferido
+
+        Returns:
+            (x1, y1, x2, y2) do recorte ou None para o frame inteiro
+        """
+        if not self.locked or self.object_width is None or self.since_full >= self.full_interval:
+            return None
+
+        last = physics.last_timestamp
+        if last is None:
+            return None
+        dt = timestamp - last
+        if dt < 0 or dt > self.max_prediction:
+            return None
+
+        position = physics.predict_position(dt)
+        if position is None:
+            return None
+        projected = spatial.project_to_pixel(position, self.object_width)
+        if projected is None:
+            return None
+        u, v, w_pixel = projected
+        if not (0 <= u < self.frame_size and 0 <= v < self.frame_size):
+            return None  # Previsão saiu da imagem: procura no frame inteiro
+
+        side = max(self.min_size, self.margin * w_pixel)
+        side = int(-(-side // self.align) * self.align)  # Arredonda para cima
+        if side >= self.frame_size:
+            return None
+
+        # Centraliza na previsão, mantendo o recorte dentro do frame
+        x1 = int(min(max(u - side / 2, 0), self.frame_size - side))
+        y1 = int(min(max(v - side / 2, 0), self.frame_size - side))
+        return x1, y1, x1 + side, y1 + side
+
+    def record(self, roi, seconds):
+        """Contabiliza um passe e seu custo (segundos)"""
+        if roi is None:
+            self.full_passes += 1
+            self.full_time += seconds
+        else:
+            self.roi_passes += 1
+            self.roi_time += seconds
+            side = roi[2] - roi[0]
+            self.roi_area += (side * side) / float(self.frame_size * self.frame_size)
+
+    def update(self, roi, found, object_width=None):
+        """
+        Resultado do passe: trava, mantém ou perde o objeto
+
+        Args:
+            roi: Recorte usado (None = frame inteiro)
+            found: O passe achou o objeto (com posição 3D)
+            object_width: Largura real do objeto achado (metros)
+        """
+        if roi is None:
+            self.since_full = 0
+        else:
+            self.since_full += 1
+            if not found:
+                self.lost += 1
+
+        self.locked = found
+        if found and object_width is not None:
+            self.object_width = object_width
+
+    def stats(self):
+        """
+        Returns:
+            dict com passes no recorte/frame inteiro, custo médio de cada um
+            (ms), fração média da área inferida no recorte e perdas
+        """
+        return {
+            'roi_passes': self.roi_passes,
+            'full_passes': self.full_passes,
+            'roi_ms': self.roi_time / self.roi_passes * 1000 if self.roi_passes else 0.0,
+            'full_ms': self.full_time / self.full_passes * 1000 if self.full_passes else 0.0,
+            'roi_area': self.roi_area / self.roi_passes if self.roi_passes else 0.0,
+            'lost': self.lost,
+            'locked': self.locked,
+        }
@@ -1,5 +1,12 @@
 """
 Processamento espacial 3D - Conversão de pixels para coordenadas reais
+
+Sem calibração: modelo pinhole com FOCAL_LENGTH e centro da imagem. Com
+calibração (modules/calibration.py): raios sem distorção por pixel, lidos de
+uma tabela montada na partida.
+
+Posições saem no referencial da câmera (Z = profundidade); to_world() leva o
+lote para o referencial do robô/chão (Z = altura) com a matriz extrínseca.
 """
 
 import numpy as np
@@ -8,16 +15,48 @@ import numpy as np
 class SpatialProcessor:
     """Converte coordenadas 2D (pixels) para 3D (metros)"""
     
-    def __init__(self, camera_width, camera_height, focal_length):
+    # (x1, y1, x2, y2) @ _CENTER_WIDTH = (centro x, centro y, largura)
+    _CENTER_WIDTH = np.array([
+        [0.5, 0.0, -1.0],
+        [0.0, 0.5, 0.0],
+        [0.5, 0.0, 1.0],
+        [0.0, 0.5, 0.0],
+    ])
+    
+    def __init__(self, camera_width, camera_height, focal_length, calibration=None, extrinsics=None):
         """
         Args:
             camera_width: Largura da câmera em pixels
             camera_height: Altura da câmera em pixels
-            focal_length: Distância focal calibrada
+            focal_length: Distância focal calibrada (ignorada com calibration)
+            calibration: CameraCalibration (intrínsecos + distorção) ou None
+            extrinsics: Matriz 4x4 mundo <- câmera ou None (identidade)
         """
+        self.width = camera_width
+        self.height = camera_height
         self.focal_length = focal_length
         self.cx = camera_width // 2
         self.cy = camera_height // 2
+        
+        # Tabela (H, W, 2) pixel -> raio (X/Z, Y/Z) sem distorção
+        self.calibration = None
+        self.rays = None
+        if calibration is not None:
+            self.calibration = calibration.scaled_to(camera_width, camera_height)
+            self.focal_length = self.calibration.fx
+            self.cx, self.cy = self.calibration.principal_point
+            self.rays = self.calibration.ray_table().reshape(-1, 2)
+        
+        # Extrínseca separada em rotação transposta (lote @ R.T) e translação
+        self.extrinsics = None
+        if extrinsics is not None:
+            self.extrinsics = np.asarray(extrinsics, dtype=np.float64).reshape(4, 4)
+            self._rotation_t = np.ascontiguousarray(self.extrinsics[:3, :3].T)
+            self._translation = self.extrinsics[:3, 3].copy()
+            self._camera_from_world = np.linalg.inv(self.extrinsics)
+        
+        # Área de trabalho do lote (centro x, centro y, largura, razão), cresce sob demanda
+        self._work = np.empty((0, 4))
     
     def calculate_3d_position(self, bbox, real_object_width):
         """
@@ -31,6 +70,10 @@ class SpatialProcessor:
             np.array([x, y, z]) - Posição 3D em metros
             None se cálculo inválido
         """
+        if self.rays is not None:
+            positions, valid = self.calculate_3d_positions([bbox], [real_object_width])
+            return positions[0] if valid[0] else None
+        
         x1, y1, x2, y2 = bbox
         
         # Tamanho aparente (pixels)
@@ -53,6 +96,126 @@ class SpatialProcessor:
         
         return np.array([x, y, z])
     
+    def calculate_3d_positions(self, boxes, real_object_widths, out=None, valid_out=None):
+        """
+        Versão vetorizada de calculate_3d_position para N caixas de uma vez
+        
+        Args:
+            boxes: Array (N, 4) com (x1, y1, x2, y2) em pixels
+            real_object_widths: Array (N,) com a largura real de cada objeto (metros)
+            out: Array (>= N, 3) float64 para as posições (None = novo array)
+            valid_out: Array (>= N,) bool para a máscara (None = novo array)
+        
+        Returns:
+            (positions, valid) - Array (N, 3) em metros e máscara (N,) das
+            caixas com largura >= 1 pixel (linhas inválidas ficam com zeros).
+            Com out/valid_out, são views das N primeiras linhas deles
+        """
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        n = len(boxes)
+        positions = np.empty((n, 3)) if out is None else out[:n]
+        valid = np.empty(n, dtype=bool) if valid_out is None else valid_out[:n]
+        if self.rays is not None:
+            return self._calibrated_positions(boxes, real_object_widths, positions, valid)
+        
+        if len(self._work) < n:
+            self._work = np.empty((max(n, 2 * len(self._work)), 4))
+        work = self._work[:n]
+        
+        # Centro relativo ao centro óptico e largura em pixels: (cx - c0, cy - c0, w)
+        np.matmul(boxes, self._CENTER_WIDTH, out=work[:, :3])
+        work[:, :2] -= (self.cx, self.cy)
+        np.greater_equal(work[:, 2], 1, out=valid)
+        
+        # ratio = largura real / largura aparente = z / f (0 nas caixas inválidas)
+        ratio = work[:, 3]
+        ratio.fill(0.0)
+        np.divide(real_object_widths, work[:, 2], out=ratio, where=valid)
+        
+        np.multiply(work[:, :2], ratio[:, None], out=positions[:, :2])
+        np.multiply(ratio, self.focal_length, out=positions[:, 2])
+        
+        return positions, valid
+    
+    def _calibrated_positions(self, boxes, real_object_widths, positions, valid):
+        """
+        calculate_3d_positions com a tabela de raios
+        
+        A largura aparente vira largura angular: diferença dos raios nas bordas
+        esquerda e direita da caixa, na linha do centro. Z = largura real /
+        largura angular e (X, Y) = raio do centro * Z.
+        """
+        n = len(boxes)
+        boxes = np.rint(boxes).astype(np.int64)
+        x1 = np.clip(boxes[:, 0], 0, self.width - 1)
+        x2 = np.clip(boxes[:, 2], 0, self.width - 1)
+        row = np.clip((boxes[:, 1] + boxes[:, 3]) // 2, 0, self.height - 1) * self.width
+        center = row + np.clip((boxes[:, 0] + boxes[:, 2]) // 2, 0, self.width - 1)
+        
+        angular = self.rays[row + x2, 0] - self.rays[row + x1, 0]
+        np.greater_equal(boxes[:, 2] - boxes[:, 0], 1, out=valid)
+        valid &= angular > 0
+        
+        z = positions[:, 2]
+        z.fill(0.0)
+        np.divide(np.broadcast_to(real_object_widths, (n,)), angular, out=z, where=valid)
+        np.multiply(self.rays[center], z[:, None], out=positions[:, :2])
+        return positions, valid
+    
+    def to_world(self, positions, out=None):
+        """
+        Posições da câmera para o referencial do mundo (robô/chão, Z = altura)
+        
+        Args:
+            positions: Array (N, 3) no referencial da câmera
+            out: Array (N, 3) de saída (pode ser o próprio positions)
+        
+        Returns:
+            Array (N, 3) no mundo (sem extrínseca: as mesmas posições)
+        """
+        if self.extrinsics is None:
+            if out is None or out is positions:
+                return positions
+            out[...] = positions
+            return out
+        out = np.matmul(positions, self._rotation_t, out=out)
+        out += self._translation
+        return out
+    
+    def to_camera(self, position):
+        """Inverso de to_world para um ponto (x, y, z)"""
+        if self.extrinsics is None:
+            return position
+        return self._camera_from_world[:3, :3] @ position + self._camera_from_world[:3, 3]
+    
+    def project_to_pixel(self, position, real_object_width):
+        """
+        Inverso de calculate_3d_position + to_world: onde o objeto aparece na imagem
+        
+        Args:
+            position: np.array([x, y, z]) em metros, no referencial do mundo
+            real_object_width: Largura real do objeto em metros
+        
+        Returns:
+            (u, v, w_pixel) - Centro e largura aparente em pixels
+            None se o ponto estiver atrás da câmera
+        """
+        position = self.to_camera(position)
+        x, y, z = position
+        
+        if z <= 0:
+            return None
+        
+        if self.calibration is not None:
+            u, v = self.calibration.project(position)[0]
+            return u, v, self.focal_length * real_object_width / z
+        
+        u = x * self.focal_length / z + self.cx
+        v = y * self.focal_length / z + self.cy
+        w_pixel = self.focal_length * real_object_width / z
+        
+        return u, v, w_pixel
+    
     def is_valid_position(self, position, max_distance=5.0, max_height=3.0):
         """
         Valida se posição 3D é fisicamente plausível
@@ -78,3 +241,29 @@ class SpatialProcessor:
             return False
         
         return True
+    
+    def valid_positions(self, positions, max_distance=5.0, max_height=3.0, out=None):
+        """
+        Versão vetorizada de is_valid_position
+        
+        Args:
+            positions: Array (N, 3) com (x, y, z)
+            max_distance: Distância máxima horizontal (metros)
+            max_height: Altura máxima (metros)
+            out: Array (>= N,) bool para a máscara (None = novo array)
+        
+        Returns:
+            Máscara (N,) das posições fisicamente plausíveis
+        """
+        positions = np.asarray(positions).reshape(-1, 3)
+        n = len(positions)
+        valid = np.empty(n, dtype=bool) if out is None else out[:n]
+        
+        # Mesmas comparações da versão escalar (NaN passa como lá)
+        np.greater(np.abs(positions[:, 0]), max_distance, out=valid)
+        valid |= np.abs(positions[:, 1]) > max_distance
+        valid |= positions[:, 2] < 0
+        valid |= positions[:, 2] > max_height
+        np.logical_not(valid, out=valid)
+        
+        return valid
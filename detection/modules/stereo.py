@@ -0,0 +1,369 @@
+"""
+Modo estéreo - profundidade por triangulação com duas câmeras
+
+A profundidade pela largura aparente (z = f * largura real / largura em
+pixels) depende de OBJECT_DIMENSIONS acertar o tamanho do objeto. Com duas
+câmeras calibradas (intrínsecos de cada uma + pose da direita em relação à
+esquerda), a profundidade sai da disparidade entre as vistas:
+
+- StereoPair junta dois CameraManagers em pares sincronizados pelo
+  timestamp de captura, com a mesma interface de câmera (wait_for_frame).
+- StereoTriangulator precomputa, uma vez, tabelas pixel -> coordenada
+  retificada de cada câmera e a matriz 4x4 (disparidade -> ponto na câmera
+  esquerda). Por frame, as detecções das duas vistas são casadas na mesma
+  linha retificada e trianguladas em lote, com a mesma saída de
+  SpatialProcessor.calculate_3d_positions (referencial da câmera esquerda).
+"""
+
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+try:
+    from .calibration import CameraCalibration
+    from .postprocess import COL_CLASS
+    from .tracker import greedy_match
+except ImportError:  # Executado como script
+    from calibration import CameraCalibration
+    from postprocess import COL_CLASS
+    from tracker import greedy_match
+
+
+class StereoCalibration:
+    """Intrínsecos das duas câmeras + pose da direita em relação à esquerda"""
+
+    def __init__(self, left, right, rotation, translation, rms=None):
+        """
+        Args:
+            left, right: CameraCalibration de cada câmera (mesmo tamanho de imagem)
+            rotation: Matriz 3x3 esquerda -> direita (cv2.stereoCalibrate)
+            translation: Vetor (3,) esquerda -> direita em metros
+            rms: Erro de reprojeção da calibração estéreo (pixels)
+        """
+        self.left = left
+        self.right = right
+        self.rotation = np.asarray(rotation, dtype=np.float64).reshape(3, 3)
+        self.translation = np.asarray(translation, dtype=np.float64).ravel()
+        self.rms = rms
+
+    @property
+    def baseline(self):
+        """Distância entre as câmeras (metros)"""
+        return float(np.linalg.norm(self.translation))
+
+    def scaled_to(self, width, height):
+        return StereoCalibration(self.left.scaled_to(width, height), self.right.scaled_to(width, height),
+                                 self.rotation, self.translation, self.rms)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path,
+                 left_matrix=self.left.camera_matrix, left_dist=self.left.dist_coeffs,
+                 right_matrix=self.right.camera_matrix, right_dist=self.right.dist_coeffs,
+                 image_size=np.array(self.left.image_size), rotation=self.rotation,
+                 translation=self.translation, rms=np.nan if self.rms is None else self.rms)
+
+
+def load_stereo_calibration(path):
+    """
+    Returns:
+        StereoCalibration ou None se o arquivo não existir
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        size = tuple(data['image_size'])
+        rms = float(data['rms']) if np.isfinite(data['rms']) else None
+        return StereoCalibration(CameraCalibration(data['left_matrix'], data['left_dist'], size),
+                                 CameraCalibration(data['right_matrix'], data['right_dist'], size),
+                                 data['rotation'], data['translation'], rms)
+
+
+def calibrate_stereo(left_corners, right_corners, board_size, square_size, left, right):
+    """
+    Pose da câmera direita a partir de vistas simultâneas do tabuleiro
+
+    Args:
+        left_corners, right_corners: Cantos (find_board) das mesmas vistas
+        board_size: (colunas, linhas) de cantos internos
+        square_size: Lado do quadrado em metros (define a escala da baseline)
+        left, right: CameraCalibration já calibradas de cada câmera
+
+    Returns:
+        StereoCalibration
+    """
+    cols, rows = board_size
+    board = np.zeros((cols * rows, 3), dtype=np.float32)
+    board[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2) * square_size
+
+    criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_MAX_ITER, 100, 1e-6)
+    rms, _, _, _, _, rotation, translation, _, _ = cv2.stereoCalibrate(
+        [board] * len(left_corners), left_corners, right_corners,
+        left.camera_matrix, left.dist_coeffs, right.camera_matrix, right.dist_coeffs,
+        left.image_size, criteria=criteria, flags=cv2.CALIB_FIX_INTRINSIC)
+    return StereoCalibration(left, right, rotation, translation, rms)
+
+
+class StereoTriangulator:
+    """Casamento e triangulação em lote das detecções de um par retificado"""
+
+    def __init__(self, calibration, width, height, max_row_error=4.0, min_disparity=1.0):
+        """
+        Args:
+            calibration: StereoCalibration
+            width, height: Tamanho dos frames (CameraManager)
+            max_row_error: Diferença máxima de linha retificada entre as
+                duas vistas de um mesmo objeto (pixels)
+            min_disparity: Disparidade mínima aceita (pixels); abaixo disso
+                o objeto está longe demais para o estéreo
+        """
+        self.calibration = calibration.scaled_to(width, height)
+        self.width = width
+        self.height = height
+        self.max_row_error = max_row_error
+        self.min_disparity = min_disparity
+
+        left, right = self.calibration.left, self.calibration.right
+        r1, r2, p1, p2, q, _, _ = cv2.stereoRectify(
+            left.camera_matrix, left.dist_coeffs, right.camera_matrix, right.dist_coeffs,
+            (width, height), self.calibration.rotation, self.calibration.translation.reshape(3, 1), alpha=0)
+        self.projection_left = p1
+        self.projection_right = p2
+
+        # (u, v, disparidade, 1) -> ponto homogêneo na câmera esquerda (não retificada):
+        # Q leva ao referencial retificado e R1.T desfaz a retificação
+        unrectify = np.eye(4)
+        unrectify[:3, :3] = r1.T
+        self.reproject = unrectify @ q
+        self._reproject_t = np.ascontiguousarray(self.reproject.T)
+
+        # Pixel (linha * largura + coluna) -> (u, v) retificado, sem distorção
+        self.rect_left = self._rect_table(left, r1, p1)
+        self.rect_right = self._rect_table(right, r2, p2)
+
+        # Estatísticas
+        self.frames = 0
+        self.matched = 0
+        self.unmatched = 0
+        self.total_time = 0.0
+
+    def _rect_table(self, camera, rectification, projection):
+        u, v = np.meshgrid(np.arange(self.width, dtype=np.float32), np.arange(self.height, dtype=np.float32))
+        pixels = np.stack([u.ravel(), v.ravel()], axis=1).reshape(-1, 1, 2)
+        rect = cv2.undistortPoints(pixels, camera.camera_matrix, camera.dist_coeffs, R=rectification, P=projection)
+        return rect.reshape(-1, 2)
+
+    def _rectified_centers(self, table, boxes):
+        """Centro de cada caixa (N, 4) em coordenadas retificadas (N, 2)"""
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        u = np.clip(np.rint((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.int64), 0, self.width - 1)
+        v = np.clip(np.rint((boxes[:, 1] + boxes[:, 3]) / 2).astype(np.int64), 0, self.height - 1)
+        return table[v * self.width + u]
+
+    def match(self, left_rect, left_heights, left_classes, right_rect, right_heights, right_classes):
+        """
+        Pares (esquerda, direita) na mesma linha retificada, mesma classe e
+        disparidade positiva; menor diferença de linha + altura da caixa
+        primeiro (a altura separa objetos iguais na mesma linha)
+
+        Returns:
+            (left_idx, right_idx)
+        """
+        row_error = np.abs(left_rect[:, None, 1] - right_rect[None, :, 1])
+        disparity = left_rect[:, None, 0] - right_rect[None, :, 0]
+        allowed = ((row_error <= self.max_row_error) & (disparity >= self.min_disparity)
+                   & (left_classes[:, None] == right_classes[None, :]))
+        cost = row_error + np.abs(left_heights[:, None] - right_heights[None, :])
+        affinity = np.where(allowed, -cost, -np.inf)
+        return greedy_match(affinity)
+
+    def calculate_3d_positions(self, left_boxes, left_classes, right_data, out=None, valid_out=None):
+        """
+        Posição 3D das detecções da câmera esquerda casadas na direita
+
+        Args:
+            left_boxes: Array (N, 4) com (x1, y1, x2, y2) na câmera esquerda
+            left_classes: Array (N,) de classes
+            right_data: Detecções da câmera direita (M, 6|7), formato de boxes.data
+            out, valid_out: Saídas pré-alocadas, como em SpatialProcessor
+
+        Returns:
+            (positions, valid) - Array (N, 3) no referencial da câmera
+            esquerda e máscara (N,) das detecções casadas (demais com zeros)
+        """
+        t0 = time.perf_counter()
+        n = len(left_boxes)
+        positions = np.zeros((n, 3)) if out is None else out[:n]
+        valid = np.zeros(n, dtype=bool) if valid_out is None else valid_out[:n]
+        positions.fill(0.0)
+        valid.fill(False)
+
+        if n and len(right_data):
+            left_boxes = np.asarray(left_boxes).reshape(-1, 4)
+            left_rect = self._rectified_centers(self.rect_left, left_boxes)
+            right_rect = self._rectified_centers(self.rect_right, right_data[:, :4])
+            li, ri = self.match(left_rect, left_boxes[:, 3] - left_boxes[:, 1],
+                                np.asarray(left_classes, dtype=np.int64),
+                                right_rect, right_data[:, 3] - right_data[:, 1],
+                                right_data[:, COL_CLASS].astype(np.int64))
+            if len(li):
+                # (u, v, d, 1) @ (R1.T Q).T -> homogêneo; uma multiplicação para o lote
+                points = np.empty((len(li), 4))
+                points[:, :2] = left_rect[li]
+                points[:, 2] = left_rect[li, 0] - right_rect[ri, 0]
+                points[:, 3] = 1.0
+                homogeneous = points @ self._reproject_t
+                positions[li] = homogeneous[:, :3] / homogeneous[:, 3:]
+                valid[li] = positions[li, 2] > 0
+
+        matched = int(np.count_nonzero(valid))
+        self.frames += 1
+        self.matched += matched
+        self.unmatched += n - matched
+        self.total_time += time.perf_counter() - t0
+        return positions, valid
+
+    def stats(self):
+        """
+        Returns:
+            dict com frames, detecções casadas/não casadas e custo médio (ms)
+        """
+        return {
+            'frames': self.frames,
+            'matched': self.matched,
+            'unmatched': self.unmatched,
+            'triangulate_ms': self.total_time / self.frames * 1000 if self.frames else 0.0,
+        }
+
+
+class StereoFrameRef:
+    """Par de frames emprestados (esquerda manda: seq, timestamp e frame)"""
+
+    __slots__ = ('left', 'right_ref', 'frame', 'right', 'seq', 'timestamp', 'captured_at', 'skew')
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right_ref = right
+        self.frame = left.frame
+        self.right = right.frame
+        self.seq = left.seq
+        self.timestamp = left.timestamp
+        self.captured_at = left.captured_at
+        self.skew = right.timestamp - left.timestamp
+
+    def release(self):
+        self.left.release()
+        self.right_ref.release()
+
+    def age(self):
+        return self.left.age()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class StereoPair:
+    """Duas câmeras vistas como uma: wait_for_frame devolve pares sincronizados"""
+
+    def __init__(self, left, right, max_skew=0.005):
+        """
+        Args:
+            left, right: CameraManager (ou fonte com a mesma interface)
+            max_skew: Diferença máxima entre os timestamps do par (segundos)
+        """
+        self.left = left
+        self.right = right
+        self.max_skew = max_skew
+        self.lock = threading.Lock()
+        self.right_seq = 0
+
+        # Estatísticas
+        self.pairs = 0
+        self.rejected = 0
+        self.skew_total = 0.0
+
+    def start(self):
+        """Inicia as câmeras que ainda não estão rodando (ao vivo já abrem capturando)"""
+        for camera in (self.left, self.right):
+            if not camera.is_running:
+                camera.start()
+        return self
+
+    def stop(self):
+        self.left.stop()
+        self.right.stop()
+
+    @property
+    def is_running(self):
+        return self.left.is_running and self.right.is_running
+
+    @property
+    def latest_seq(self):
+        return self.left.latest_seq
+
+    def wait_for_frame(self, after_seq=0, timeout=None):
+        """
+        Próximo frame esquerdo mais novo que after_seq com o frame direito
+        mais próximo no tempo (dentro de max_skew)
+
+        Returns:
+            StereoFrameRef ou None em timeout/parada
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                left = self.left.wait_for_frame(after_seq, timeout=remaining)
+                if left is None:
+                    return None
+
+                right = self._right_near(left.timestamp, deadline)
+                if right is not None:
+                    pair = StereoFrameRef(left, right)
+                    self.pairs += 1
+                    self.skew_total += abs(pair.skew)
+                    return pair
+
+                # Direita não acompanhou este frame: tenta o próximo da esquerda
+                self.rejected += 1
+                after_seq = left.seq
+                left.release()
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None
+
+    def _right_near(self, timestamp, deadline):
+        """Frame direito com |t - timestamp| <= max_skew (espera se estiver atrasado)"""
+        ref = self.right.wait_for_frame(0, timeout=0)
+        while True:
+            if ref is not None:
+                skew = ref.timestamp - timestamp
+                if abs(skew) <= self.max_skew:
+                    self.right_seq = ref.seq
+                    return ref
+                if skew > self.max_skew:
+                    ref.release()
+                    return None  # Direita já passou deste instante
+                after = ref.seq
+                ref.release()
+            else:
+                after = self.right_seq
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            ref = self.right.wait_for_frame(after, timeout=remaining)
+            if ref is None:
+                return None
+
+    def stats(self):
+        """Estatísticas da câmera esquerda + sincronização do par"""
+        stats = dict(self.left.stats())
+        stats['pairs'] = self.pairs
+        stats['rejected'] = self.rejected
+        stats['skew_ms'] = self.skew_total / self.pairs * 1000 if self.pairs else 0.0
+        return stats
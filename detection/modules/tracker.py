@@ -0,0 +1,261 @@
+"""
+Rastreador leve em NumPy - alternativa ao ByteTrack do ultralytics
+
+Para 1 a 3 objetos em cena, a pilha de rastreamento do ultralytics custa mais
+que o necessário. Aqui cada trilha tem um Kalman de velocidade constante
+(centro, largura, altura e suas velocidades) e a associação com as detecções
+usa IoU e distância entre centros, tudo em arrays: predição, matriz de
+afinidade e correção de todas as trilhas de uma vez.
+
+A saída segue o formato de boxes.data do track() do ultralytics
+(x1, y1, x2, y2, id, confiança, classe), então o pós-processamento não muda.
+"""
+
+import numpy as np
+import torch
+
+try:
+    from .postprocess import results_to_array, COL_CONF, COL_CLASS
+except ImportError:  # Executado como script
+    from postprocess import results_to_array, COL_CONF, COL_CLASS
+
+STATE_DIM = 8  # cx, cy, w, h, vcx, vcy, vw, vh
+MEAS_DIM = 4   # cx, cy, w, h
+
+
+def xyxy_to_cxcywh(boxes):
+    out = np.empty_like(boxes, dtype=np.float64)
+    out[:, 0] = (boxes[:, 0] + boxes[:, 2]) / 2
+    out[:, 1] = (boxes[:, 1] + boxes[:, 3]) / 2
+    out[:, 2] = boxes[:, 2] - boxes[:, 0]
+    out[:, 3] = boxes[:, 3] - boxes[:, 1]
+    return out
+
+
+def cxcywh_to_xyxy(boxes):
+    out = np.empty_like(boxes, dtype=np.float64)
+    out[:, 0] = boxes[:, 0] - boxes[:, 2] / 2
+    out[:, 1] = boxes[:, 1] - boxes[:, 3] / 2
+    out[:, 2] = boxes[:, 0] + boxes[:, 2] / 2
+    out[:, 3] = boxes[:, 1] + boxes[:, 3] / 2
+    return out
+
+
+def iou_matrix(a, b):
+    """IoU entre todas as caixas de a (T, 4) e b (N, 4), formato xyxy"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def greedy_match(affinity):
+    """
+    Pares (trilha, detecção) em ordem decrescente de afinidade
+
+    Args:
+        affinity: Matriz (T, N); -inf marca pares proibidos
+
+    Returns:
+        (track_idx, det_idx) - arrays de índices casados
+    """
+    rows, cols = [], []
+    if affinity.size == 0:
+        return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+
+    used_rows = np.zeros(affinity.shape[0], dtype=bool)
+    used_cols = np.zeros(affinity.shape[1], dtype=bool)
+    for flat in np.argsort(-affinity, axis=None):
+        r, c = divmod(int(flat), affinity.shape[1])
+        if not np.isfinite(affinity[r, c]):
+            break  # Daqui para frente só pares proibidos
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = used_cols[c] = True
+        rows.append(r)
+        cols.append(c)
+    return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+
+
+class NumpyTracker:
+    """Rastreamento multi-objeto por IoU + distância com Kalman por trilha"""
+
+    def __init__(self, iou_threshold=0.2, max_distance=1.0, max_age=15, min_hits=2,
+                 new_track_threshold=0.25, process_noise=1.0, measurement_noise=4.0):
+        """
+        Args:
+            iou_threshold: IoU mínimo para casar trilha e detecção
+            max_distance: Sem IoU suficiente, casa se a distância entre os
+                centros for até max_distance vezes o maior lado da trilha
+                (objeto rápido que saltou para fora da caixa prevista)
+            max_age: Frames sem detecção antes de descartar a trilha
+            min_hits: Detecções seguidas para confirmar uma trilha; trilha
+                ainda não confirmada não sai no resultado e morre na
+                primeira falha (falso positivo isolado não ganha id)
+            new_track_threshold: Confiança mínima para abrir trilha nova
+            process_noise: Desvio da aceleração do modelo (pixels/frame²)
+            measurement_noise: Desvio da caixa detectada (pixels)
+        """
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.new_track_threshold = new_track_threshold
+
+        # Modelo de velocidade constante (dt = 1 frame)
+        self.F = np.eye(STATE_DIM)
+        self.F[:MEAS_DIM, MEAS_DIM:] = np.eye(MEAS_DIM)
+        q = process_noise ** 2
+        G = np.vstack([np.eye(MEAS_DIM) * 0.5, np.eye(MEAS_DIM)])
+        self.Q = G @ G.T * q
+        self.R = np.eye(MEAS_DIM) * measurement_noise ** 2
+        self.P0 = np.diag([measurement_noise ** 2] * MEAS_DIM + [(10 * process_noise) ** 2] * MEAS_DIM)
+
+        self.reset()
+
+    def reset(self):
+        """Descarta todas as trilhas e reinicia os ids em 1"""
+        self.ids = np.empty(0, dtype=np.int64)
+        self.X = np.empty((0, STATE_DIM))
+        self.P = np.empty((0, STATE_DIM, STATE_DIM))
+        self.misses = np.empty(0, dtype=np.int64)
+        self.hits = np.empty(0, dtype=np.int64)
+        self.next_id = 1
+        self.frames = 0
+
+    @property
+    def active(self):
+        """Número de trilhas vivas"""
+        return len(self.ids)
+
+    def update(self, detections):
+        """
+        Avança um frame
+
+        Args:
+            detections: Array (N, >=6) com x1, y1, x2, y2, ..., confiança, classe
+                (formato de boxes.data, com ou sem coluna de id)
+
+        Returns:
+            np.ndarray (M, 7) float32 - x1, y1, x2, y2, id, confiança, classe
+            das detecções associadas a uma trilha neste frame
+        """
+        self.frames += 1
+        detections = np.asarray(detections, dtype=np.float64)
+        if detections.ndim != 2:
+            detections = detections.reshape(0, 6)
+
+        # 1. Predição de todas as trilhas
+        if len(self.ids):
+            self.X = self.X @ self.F.T
+            self.P = self.F @ self.P @ self.F.T + self.Q
+            self.X[:, 2:4] = np.maximum(self.X[:, 2:4], 1.0)
+
+        # 2. Afinidade trilha x detecção
+        det_boxes = detections[:, :4]
+        track_idx, det_idx = self._associate(det_boxes)
+        matched_ids = self.ids[track_idx]
+
+        # 3. Correção das trilhas casadas
+        if len(track_idx):
+            self._correct(track_idx, xyxy_to_cxcywh(det_boxes[det_idx]))
+
+        # 4. Trilhas sem detecção envelhecem
+        matched = np.zeros(len(self.ids), dtype=bool)
+        matched[track_idx] = True
+        self.misses[matched] = 0
+        self.misses[~matched] += 1
+        self.hits[matched] += 1
+        confirmed = self.hits[track_idx] >= self.min_hits
+
+        # 5. Detecções sem trilha abrem trilhas novas
+        free = np.ones(len(detections), dtype=bool)
+        free[det_idx] = False
+        new = np.flatnonzero(free & (detections[:, COL_CONF] >= self.new_track_threshold))
+        new_ids = self._spawn(xyxy_to_cxcywh(det_boxes[new]))
+
+        # 6. Expiram as velhas e as não confirmadas que falharam
+        keep = (self.misses <= self.max_age) & ((self.hits >= self.min_hits) | (self.misses == 0))
+        if not keep.all():
+            self.ids, self.X, self.P = self.ids[keep], self.X[keep], self.P[keep]
+            self.misses, self.hits = self.misses[keep], self.hits[keep]
+
+        # Saída na ordem das detecções, só trilhas confirmadas
+        if self.min_hits > 1:
+            new, new_ids = new[:0], new_ids[:0]
+        out_det = np.concatenate([det_idx[confirmed], new])
+        out_ids = np.concatenate([matched_ids[confirmed], new_ids])
+        order = np.argsort(out_det, kind='stable')
+        out_det, out_ids = out_det[order], out_ids[order]
+
+        out = np.empty((len(out_det), 7), dtype=np.float32)
+        out[:, :4] = det_boxes[out_det]
+        out[:, 4] = out_ids
+        out[:, 5] = detections[out_det, COL_CONF]
+        out[:, 6] = detections[out_det, COL_CLASS]
+        return out
+
+    def _associate(self, det_boxes):
+        if not len(self.ids) or not len(det_boxes):
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        predicted = cxcywh_to_xyxy(self.X[:, :4])
+        iou = iou_matrix(predicted, det_boxes)
+
+        det_centers = (det_boxes[:, :2] + det_boxes[:, 2:4]) / 2
+        dist = np.linalg.norm(self.X[:, None, :2] - det_centers[None, :, :], axis=2)
+        scale = np.maximum(self.X[:, 2], self.X[:, 3])[:, None]
+        dist_norm = dist / scale
+
+        # IoU manda; a distância desempata e salva objetos rápidos sem sobreposição
+        allowed = (iou >= self.iou_threshold) | (dist_norm <= self.max_distance)
+        affinity = np.where(allowed, iou + 1.0 / (1.0 + dist_norm), -np.inf)
+        return greedy_match(affinity)
+
+    def _correct(self, idx, z):
+        """Correção de Kalman em lote das trilhas idx com as medidas z (K, 4)"""
+        P = self.P[idx]
+        S = P[:, :MEAS_DIM, :MEAS_DIM] + self.R
+        K = P[:, :, :MEAS_DIM] @ np.linalg.inv(S)
+        innovation = z - self.X[idx, :MEAS_DIM]
+        self.X[idx] += (K @ innovation[:, :, None])[:, :, 0]
+        self.P[idx] = P - K @ P[:, :MEAS_DIM, :]
+
+    def _spawn(self, z):
+        """Abre trilhas para as medidas z (K, 4); retorna os ids novos"""
+        count = len(z)
+        ids = np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        if count:
+            self.next_id += count
+            X = np.zeros((count, STATE_DIM))
+            X[:, :MEAS_DIM] = z
+            self.ids = np.concatenate([self.ids, ids])
+            self.X = np.concatenate([self.X, X])
+            self.P = np.concatenate([self.P, np.repeat(self.P0[None], count, axis=0)])
+            self.misses = np.concatenate([self.misses, np.zeros(count, dtype=np.int64)])
+            self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int64)])
+        return ids
+
+    def track_results(self, results):
+        """
+        Aplica o rastreador à saída de predict() do ultralytics (in-place)
+
+        As caixas de cada Results passam a ter a coluna de id, como em
+        track(); detecções que não viraram trilha saem do resultado. Arrays
+        do DirectEngine são trocados pelo array rastreado na própria lista.
+        """
+        data = results_to_array(results)
+        tracked = self.update(data)
+        if results and isinstance(results[0], np.ndarray):
+            results[:] = [tracked]
+        elif results:
+            result = results[0]
+            result.update(boxes=torch.from_numpy(tracked))
+            for other in results[1:]:
+                other.update(boxes=torch.empty((0, 7)))
+        return results
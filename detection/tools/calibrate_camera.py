@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Calibra intrínsecos e distorção da câmera com um tabuleiro de xadrez
+
+Os frames passam pelo mesmo crop+resize do CameraManager (CAMERA_WIDTH),
+então a calibração vale para as coordenadas que o detector enxerga. Fonte:
+gravação (pasta de frames ou vídeo, ex: de record_throws.py) ou câmera ao
+vivo, guardando uma vista a cada --interval segundos em que o tabuleiro
+aparece. O resultado vai para config.CALIBRATION_PATH, carregado pelo
+main.py na partida.
+
+Com --right-camera/--right-source (modo estéreo), as vistas são pares
+sincronizados com o tabuleiro nas duas câmeras: calibra cada câmera e a
+pose da direita em relação à esquerda, salvando em
+config.STEREO_CALIBRATION_PATH (main.py --stereo).
+
+Uso:
+    python detection/tools/calibrate_camera.py --source gravacoes/tabuleiro --board 9x6 --square 0.025
+    python detection/tools/calibrate_camera.py --camera 0 --views 25 --board 9x6 --square 0.025
+    python detection/tools/calibrate_camera.py --camera 0 --right-camera 1 --board 9x6 --square 0.025
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.calibration import find_board, calibrate  # noqa: E402
+from modules.camera_manager import CameraManager, CAPTURE_LATEST  # noqa: E402
+from modules.recorded_source import RecordedSource, PACING_FAST  # noqa: E402
+from modules.stereo import StereoPair, calibrate_stereo  # noqa: E402
+
+MIN_VIEWS = 8  # Abaixo disso a distorção fica mal determinada
+
+
+def parse_board(text):
+    cols, rows = text.lower().split('x')
+    return int(cols), int(rows)
+
+
+def open_source(source, camera_id, size):
+    if source is not None:
+        return RecordedSource(source, size=size, pacing=PACING_FAST)
+    return CameraManager(src=camera_id, size=size, fps=config.CAMERA_FPS,
+                         capture_mode=CAPTURE_LATEST, backend=config.CAMERA_BACKEND,
+                         capture_resolution=config.CAMERA_CAPTURE_RESOLUTION)
+
+
+def collect(camera, board_size, views, interval):
+    """
+    Cantos do tabuleiro nos frames da câmera/gravação (com um StereoPair,
+    só as vistas com o tabuleiro nas duas câmeras)
+
+    Returns:
+        (lista de cantos, lista de cantos da direita (vazia sem estéreo),
+         (largura, altura), frames lidos)
+    """
+    corner_sets = []
+    right_sets = []
+    image_size = None
+    seq = 0
+    read = 0
+    last_view = -interval
+    while len(corner_sets) < views:
+        ref = camera.wait_for_frame(seq, timeout=1.0)
+        if ref is None:
+            if not camera.is_running:
+                break  # Gravação acabou
+            continue
+        with ref:
+            seq = ref.seq
+            read += 1
+            if ref.timestamp - last_view < interval:
+                continue
+            corners = find_board(ref.frame, board_size)
+            if corners is None:
+                continue
+            right = getattr(ref, 'right', None)
+            if right is not None:
+                right_corners = find_board(right, board_size)
+                if right_corners is None:
+                    continue
+                right_sets.append(right_corners)
+            image_size = (ref.frame.shape[1], ref.frame.shape[0])
+        corner_sets.append(corners)
+        last_view = ref.timestamp
+        print(f"  ✔️  Vista {len(corner_sets)}/{views} (frame {read})")
+    return corner_sets, right_sets, image_size, read
+
+
+def print_calibration(name, calibration, image_size):
+    fx, fy = calibration.fx, calibration.fy
+    cx, cy = calibration.principal_point
+    print(f"✅ {name}Erro de reprojeção: {calibration.rms:.3f} px")
+    print(f"  fx={fx:.1f} fy={fy:.1f} cx={cx:.1f} cy={cy:.1f} ({image_size[0]}x{image_size[1]})")
+    print(f"  Distorção: {' '.join(f'{k:+.4f}' for k in calibration.dist_coeffs)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--source', help="Gravação com o tabuleiro (pasta de frames ou vídeo)")
+    group.add_argument('--camera', type=int, help="ID da câmera (captura ao vivo)")
+    parser.add_argument('--board', type=parse_board, default=(9, 6), help="Cantos internos COLxLIN (padrão 9x6)")
+    parser.add_argument('--square', type=float, default=0.025, help="Lado do quadrado em metros")
+    parser.add_argument('--views', type=int, default=25, help="Vistas usadas na calibração")
+    parser.add_argument('--interval', type=float, default=0.5,
+                        help="Intervalo mínimo entre vistas (s), evita frames repetidos")
+    right_group = parser.add_mutually_exclusive_group()
+    right_group.add_argument('--right-source', help="Gravação da câmera direita (modo estéreo)")
+    right_group.add_argument('--right-camera', type=int, help="ID da câmera direita (modo estéreo)")
+    parser.add_argument('--size', type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument('--output', help="Arquivo de saída (padrão: CALIBRATION_PATH ou STEREO_CALIBRATION_PATH)")
+    args = parser.parse_args()
+
+    stereo = args.right_source is not None or args.right_camera is not None
+    output = args.output or (config.STEREO_CALIBRATION_PATH if stereo else config.CALIBRATION_PATH)
+    camera = open_source(args.source, args.camera, args.size)
+    if stereo:
+        right = open_source(args.right_source, args.right_camera, args.size)
+        camera = StereoPair(camera, right, max_skew=config.STEREO_MAX_SKEW)
+    if args.source is None:
+        print(f"📷 Mostre o tabuleiro {args.board[0]}x{args.board[1]} em posições e inclinações variadas, "
+              f"inclusive nos cantos da imagem" + (" (visível nas duas câmeras)" if stereo else ""))
+
+    camera.start()
+    t0 = time.perf_counter()
+    try:
+        corner_sets, right_sets, image_size, read = collect(camera, args.board, args.views, args.interval)
+    finally:
+        camera.stop()
+
+    print(f"🔎 Tabuleiro em {len(corner_sets)} de {read} frames ({time.perf_counter() - t0:.1f}s)")
+    if len(corner_sets) < MIN_VIEWS:
+        print(f"❌ Vistas insuficientes (mínimo {MIN_VIEWS})")
+        return
+
+    calibration = calibrate(corner_sets, args.board, args.square, image_size)
+    if not stereo:
+        print_calibration("", calibration, image_size)
+        calibration.save(output)
+        print(f"💾 Calibração salva em {output}")
+        return
+
+    right = calibrate(right_sets, args.board, args.square, image_size)
+    print_calibration("Esquerda: ", calibration, image_size)
+    print_calibration("Direita: ", right, image_size)
+    pair = calibrate_stereo(corner_sets, right_sets, args.board, args.square, calibration, right)
+    x, y, z = pair.translation
+    print(f"✅ Estéreo: erro de reprojeção {pair.rms:.3f} px, baseline {pair.baseline * 100:.1f} cm "
+          f"(direita em {x:+.3f}, {y:+.3f}, {z:+.3f} m)")
+
+    pair.save(output)
+    print(f"💾 Calibração estéreo salva em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Calibra a pose da câmera (extrínseca) com marcadores no chão
+
+Marcadores ArUco colados no chão em posições medidas no referencial do robô
+(origem no robô, X/Y no chão, Z para cima, metros), descritas em um CSV:
+
+    # id,x,y[,z]
+    0,0.50,-0.50
+    1,0.50,0.50
+    2,1.50,0.50
+    3,1.50,-0.50
+
+O centro de cada marcador detectado vira um par pixel <-> ponto do mundo e o
+solvePnP (com a calibração intrínseca, se houver) dá a matriz 4x4
+mundo <- câmera, salva em config.EXTRINSICS_PATH. Com --click os pontos
+são marcados com o mouse na ordem do CSV (fita no chão, sem ArUco).
+
+Uso:
+    python detection/tools/calibrate_extrinsics.py --markers chao.csv --camera 0
+    python detection/tools/calibrate_extrinsics.py --markers chao.csv --source gravacoes/chao --click
+"""
+
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.calibration import CameraCalibration, load_calibration, solve_extrinsics, save_extrinsics  # noqa: E402
+from modules.camera_manager import CameraManager, CAPTURE_LATEST  # noqa: E402
+from modules.recorded_source import RecordedSource, PACING_FAST  # noqa: E402
+
+
+def load_markers(path):
+    """
+    Returns:
+        dict {id: np.array([x, y, z])} na ordem do arquivo
+    """
+    markers = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            values = [v.strip() for v in line.split(',')]
+            coords = [float(v) for v in values[1:]] + [0.0] * (4 - len(values))
+            markers[int(values[0])] = np.array(coords[:3])
+    return markers
+
+
+def detect_aruco(frame, dictionary):
+    """
+    Returns:
+        dict {id: centro (u, v)} dos marcadores encontrados
+    """
+    detector = cv2.aruco.ArucoDetector(cv2.aruco.getPredefinedDictionary(getattr(cv2.aruco, dictionary)))
+    corners, ids, _ = detector.detectMarkers(frame)
+    if ids is None:
+        return {}
+    return {int(i): c.reshape(4, 2).mean(axis=0) for i, c in zip(ids.ravel(), corners)}
+
+
+def click_points(frame, markers):
+    """Marca cada ponto com o mouse, na ordem do CSV (ESC cancela)"""
+    points = {}
+    order = list(markers)
+    window = "Extrinseca - clique nos marcadores"
+
+    def on_mouse(event, u, v, flags, param):
+        if event == cv2.EVENT_LBUTTONDOWN and len(points) < len(order):
+            points[order[len(points)]] = np.array([u, v], dtype=np.float64)
+
+    cv2.namedWindow(window)
+    cv2.setMouseCallback(window, on_mouse)
+    while len(points) < len(order):
+        view = frame.copy()
+        for marker_id, (u, v) in points.items():
+            cv2.circle(view, (int(u), int(v)), 4, (0, 255, 0), -1)
+            cv2.putText(view, str(marker_id), (int(u) + 6, int(v) - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        x, y, z = markers[order[len(points)]]
+        cv2.putText(view, f"Marcador {order[len(points)]}: ({x:.2f}, {y:.2f}, {z:.2f}) m", (10, 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        cv2.imshow(window, view)
+        if cv2.waitKey(20) & 0xFF == 27:
+            break
+    cv2.destroyWindow(window)
+    return points
+
+
+def grab_frame(camera, markers, dictionary, click, max_frames=300):
+    """Primeiro frame com todos os marcadores (ArUco) ou o primeiro frame (--click)"""
+    seq = 0
+    best, best_found = None, {}
+    for _ in range(max_frames):
+        ref = camera.wait_for_frame(seq, timeout=1.0)
+        if ref is None:
+            if not camera.is_running:
+                break  # Gravação acabou
+            continue
+        with ref:
+            seq = ref.seq
+            frame = ref.frame.copy()
+        if click:
+            return frame, {}
+        found = {i: c for i, c in detect_aruco(frame, dictionary).items() if i in markers}
+        if best is None or len(found) > len(best_found):
+            best, best_found = frame, found
+        if len(found) == len(markers):
+            break
+    return best, best_found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--source', help="Gravação ou pasta com frames da câmera montada")
+    group.add_argument('--camera', type=int, help="ID da câmera (captura ao vivo)")
+    parser.add_argument('--markers', required=True, help="CSV id,x,y[,z] (metros, referencial do robô)")
+    parser.add_argument('--dict', default="DICT_4X4_50", help="Dicionário ArUco")
+    parser.add_argument('--click', action="store_true", help="Marcar os pontos com o mouse em vez de ArUco")
+    parser.add_argument('--size', type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument('--output', default=config.EXTRINSICS_PATH)
+    args = parser.parse_args()
+
+    markers = load_markers(args.markers)
+    calibration = load_calibration(config.CALIBRATION_PATH)
+    if calibration is None:
+        print(f"⚠️  Sem calibração intrínseca: usando FOCAL_LENGTH={config.FOCAL_LENGTH} sem distorção")
+        calibration = CameraCalibration.pinhole(config.FOCAL_LENGTH, args.size, args.size)
+    calibration = calibration.scaled_to(args.size, args.size)
+
+    if args.source is not None:
+        camera = RecordedSource(args.source, size=args.size, pacing=PACING_FAST)
+    else:
+        camera = CameraManager(src=args.camera, size=args.size, fps=config.CAMERA_FPS,
+                               capture_mode=CAPTURE_LATEST, backend=config.CAMERA_BACKEND,
+                               capture_resolution=config.CAMERA_CAPTURE_RESOLUTION)
+    camera.start()
+    try:
+        frame, found = grab_frame(camera, markers, args.dict, args.click)
+    finally:
+        camera.stop()
+    if frame is None:
+        print("❌ Nenhum frame da fonte")
+        return
+
+    if args.click:
+        found = click_points(frame, markers)
+    missing = [i for i in markers if i not in found]
+    if missing:
+        print(f"⚠️  Marcadores não encontrados: {missing}")
+    if len(found) < 4:
+        print(f"❌ São necessários pelo menos 4 marcadores (encontrados {len(found)})")
+        return
+
+    ids = [i for i in markers if i in found]
+    transform, rms = solve_extrinsics([markers[i] for i in ids], [found[i] for i in ids], calibration)
+
+    # Eixo óptico (Z da câmera) no mundo: inclinação em relação à vertical
+    axis = transform[:3, 2]
+    tilt = np.degrees(np.arccos(np.clip(abs(axis[2]), 0.0, 1.0)))
+    x, y, z = transform[:3, 3]
+    print(f"✅ {len(ids)} marcadores, erro de reprojeção {rms:.2f} px")
+    print(f"  Câmera em ({x:.3f}, {y:.3f}, {z:.3f}) m, eixo óptico a {tilt:.1f}° da vertical")
+
+    save_extrinsics(args.output, transform, rms)
+    print(f"💾 Extrínseca salva em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
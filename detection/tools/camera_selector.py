@@ -1,3 +1,5 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 import cv2
@@ -5,13 +7,19 @@ from PIL import Image, ImageTk
 import threading
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import camera_discovery
+
 
 class CameraSelector:
     """Janela de seleção de câmera com preview"""
     
     def __init__(self):
         self.selected_camera = None
+        self.selected_backend = cv2.CAP_ANY
         self.available_cameras = []
+        self.scanned_once = False
         self.preview_active = False
         self.preview_thread = None
         self.cap = None
@@ -128,43 +136,30 @@ class CameraSelector:
         self.camera_listbox.delete(0, tk.END)
         self.available_cameras = []
         
-        # Procura câmeras (ID 0 a 9)
-        for i in range(10):
-            try:
-                # Tenta diferentes backends
-                for backend_name, backend in [
-                    ("DirectShow", cv2.CAP_DSHOW),
-                    ("MSMF", cv2.CAP_MSMF),
-                    ("Auto", cv2.CAP_ANY)
-                ]:
-                    cap = cv2.VideoCapture(i, backend)
-                    if cap.isOpened():
-                        ret, frame = cap.read()
-                        if ret and frame is not None:
-                            h, w = frame.shape[:2]
-                            
-                            # Tenta pegar nome da câmera (Windows)
-                            name = f"Câmera {i}"
-                            
-                            camera_info = {
-                                'id': i,
-                                'name': name,
-                                'resolution': f"{w}x{h}",
-                                'backend': backend_name,
-                                'working': True
-                            }
-                            
-                            self.available_cameras.append(camera_info)
-                            
-                            # Adiciona à lista
-                            display_text = f"ID {i}: {name} [{w}x{h}] ({backend_name})"
-                            self.camera_listbox.insert(tk.END, display_text)
-                            
-                            cap.release()
-                            break
-                    cap.release()
-            except Exception as e:
-                pass
+        # Procura câmeras (ID 0 a 9) em paralelo - botão Atualizar ignora o cache
+        refresh = self.scanned_once
+        self.scanned_once = True
+        
+        for cam in camera_discovery.discover_cameras(10, refresh=refresh):
+            i = cam['id']
+            name = f"Câmera {i}"
+            
+            camera_info = {
+                'id': i,
+                'name': name,
+                'resolution': cam['resolution'],
+                'backend': cam['backend_name'],
+                'api': cam['backend'],
+                'fourccs': cam['fourccs'],
+                'working': True
+            }
+            
+            self.available_cameras.append(camera_info)
+            
+            # Adiciona à lista
+            formats = ",".join(cam['fourccs'])
+            display_text = f"ID {i}: {name} [{cam['resolution']}] ({cam['backend_name']}{' ' + formats if formats else ''})"
+            self.camera_listbox.insert(tk.END, display_text)
         
         # Atualiza status
         if self.available_cameras:
@@ -189,6 +184,7 @@ class CameraSelector:
             idx = selection[0]
             camera_info = self.available_cameras[idx]
             self.selected_camera = camera_info['id']
+            self.selected_backend = camera_info['api']
             
             self.btn_test.config(state=tk.NORMAL)
             self.btn_confirm.config(state=tk.NORMAL)
@@ -218,7 +214,7 @@ class CameraSelector:
         """Loop de preview (roda em thread separada)"""
         try:
             # Abre câmera
-            self.cap = cv2.VideoCapture(self.selected_camera, cv2.CAP_DSHOW)
+            self.cap = cv2.VideoCapture(self.selected_camera, self.selected_backend)
             
             if not self.cap.isOpened():
                 self.root.after(0, lambda: self.video_label.config(
@@ -280,7 +276,7 @@ class CameraSelector:
             "Pressione 'q' para fechar a janela de teste."
         )
         
-        cap = cv2.VideoCapture(self.selected_camera, cv2.CAP_DSHOW)
+        cap = cv2.VideoCapture(self.selected_camera, self.selected_backend)
         
         if not cap.isOpened():
             messagebox.showerror("Erro", "Não foi possível abrir a câmera")
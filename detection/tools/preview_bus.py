@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Preview do barramento de frames publicado pelo main.py (--bus)
+
+Assina o barramento em memória compartilhada e mostra os frames sem abrir a
+câmera (ela continua com o processo publicador):
+    python detection/main.py --bus lixeira-cam
+    python detection/tools/preview_bus.py lixeira-cam
+"""
+
+import argparse
+import os
+import sys
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.frame_bus import FrameBusSubscriber  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('name', nargs='?', default=config.CAMERA_BUS_NAME,
+                        help="Nome do barramento (padrão: CAMERA_BUS_NAME)")
+    parser.add_argument('--timeout', type=float, default=5.0, help="Segundos esperando o publicador")
+    args = parser.parse_args()
+    if not args.name:
+        parser.error("informe o nome do barramento (CAMERA_BUS_NAME não está definido)")
+
+    print(f"Assinando barramento '{args.name}' (a câmera continua com o outro processo)")
+    print("Pressione 'q' para sair")
+
+    try:
+        bus = FrameBusSubscriber(args.name, timeout=args.timeout)
+    except ValueError as e:
+        print(e)
+        print(f"\nInicie o publicador antes: python detection/main.py --bus {args.name}")
+        return 1
+
+    frame_count = 0
+    seq = 0
+
+    try:
+        while bus.is_running:
+            ref = bus.wait_for_frame(seq, timeout=1.0)
+            if ref is None:
+                continue
+            seq = ref.seq
+            frame = ref.copy()
+            if frame is None:
+                continue
+            frame_count += 1
+
+            cv2.putText(frame, f"Seq: {seq}  Idade: {ref.age() * 1000:.1f}ms", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            cv2.imshow('Preview do Barramento', frame)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                print("Encerrando...")
+                break
+
+    except KeyboardInterrupt:
+        print("\nInterrompido pelo usuário")
+
+    finally:
+        stats = bus.stats()
+        bus.stop()
+        cv2.destroyAllWindows()
+        print(f"\n✅ Frames lidos: {frame_count} (pulados: {stats['dropped']}, sobrescritos: {stats['overwritten']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Quantiza o detector para INT8 calibrando com frames gravados
+
+1. Exporta o .pt para ONNX FP32 (cache do model_loader)
+2. Calibra a quantização estática do ONNX Runtime com uma pasta de frames
+   nossos (gravados com record_throws.py)
+3. Grava <nome>-<hash>-<imgsz>-int8.onnx no cache, carregável com
+   MODEL_BACKEND = "onnx-int8"
+4. Compara FP32 x INT8 em um clipe separado: latência, mAP50, recall e
+   precisão. Com rótulos YOLO (labels/<frame>.txt) compara com a verdade;
+   sem rótulos, usa as detecções do FP32 como referência.
+
+Uso:
+    python detection/tools/quantize_model.py --calib gravacoes/calibracao --eval gravacoes/lancamento_01
+    python detection/tools/quantize_model.py --calib gravacoes/calibracao --eval clipe.mp4 --max-eval 300
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules import config  # noqa: E402
+from modules.model_loader import (  # noqa: E402
+    load_yolo_model, export_model, export_path, BACKEND_ONNX, BACKEND_ONNX_INT8,
+)
+from modules.recorded_source import IMAGE_EXTENSIONS  # noqa: E402
+
+IOU_MATCH = 0.5
+EVAL_CONF = 0.01  # Confiança mínima para a curva precisão x recall (mAP)
+
+
+def iter_frames(path, limit=None):
+    """
+    Frames originais (sem crop) de uma pasta de imagens ou vídeo
+
+    Yields:
+        (nome, frame BGR)
+    """
+    path = Path(path)
+    count = 0
+    if path.is_dir():
+        for file in sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS):
+            if limit is not None and count >= limit:
+                return
+            frame = cv2.imread(str(file), cv2.IMREAD_COLOR)
+            if frame is not None:
+                count += 1
+                yield file.stem, frame
+        return
+
+    cap = cv2.VideoCapture(str(path))
+    try:
+        while limit is None or count < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield f"frame_{count:06d}", frame
+            count += 1
+    finally:
+        cap.release()
+
+
+def letterbox_tensor(frame, imgsz):
+    """Mesmo pré-processamento do ultralytics: letterbox cinza, RGB, CHW, 0..1"""
+    h, w = frame.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    tensor = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return tensor[None]
+
+
+class FrameCalibrationReader:
+    """CalibrationDataReader do ONNX Runtime alimentado pela pasta de frames"""
+
+    def __init__(self, input_name, path, imgsz, limit):
+        self.input_name = input_name
+        self.path = path
+        self.limit = limit
+        self._frames = iter_frames(path, limit)
+        self.imgsz = imgsz
+        self.count = 0
+
+    def get_next(self):
+        for _, frame in self._frames:
+            self.count += 1
+            return {self.input_name: letterbox_tensor(frame, self.imgsz)}
+        return None
+
+    def rewind(self):
+        """Recomeça do primeiro frame (nova passada de calibração)"""
+        self._frames = iter_frames(self.path, self.limit)
+        self.count = 0
+
+
+def head_nodes(fp32_path, model_name):
+    """
+    Nós da cabeça de detecção (DFL, decodificação das caixas e concat final),
+    mantidos em FP32: quantizar as coordenadas custa mais precisão que ganha
+    """
+    import onnx
+    from ultralytics import YOLO
+
+    head = YOLO(model_name).model.model[-1].i
+    prefix = f"/model.{head}/"
+    graph = onnx.load(fp32_path).graph
+    return [n.name for n in graph.node if n.name.startswith(prefix)
+            and n.op_type not in ("Conv",)]
+
+
+def copy_metadata(src, dst):
+    """Copia os metadados do ultralytics (nomes das classes, stride, imgsz)"""
+    import onnx
+
+    source = onnx.load(src)
+    target = onnx.load(dst)
+    del target.metadata_props[:]
+    for prop in source.metadata_props:
+        entry = target.metadata_props.add()
+        entry.key, entry.value = prop.key, prop.value
+    onnx.save(target, dst)
+
+
+def quantize(model_name, calib, imgsz, max_calib, per_channel, keep_head_fp32):
+    """
+    Gera o ONNX INT8 calibrado
+
+    Returns:
+        (caminho FP32, caminho INT8)
+    """
+    import onnxruntime
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static, quant_pre_process
+
+    fp32_path = export_model(model_name, BACKEND_ONNX, imgsz)
+    int8_path = export_path(model_name, BACKEND_ONNX_INT8, imgsz)
+
+    prepared = fp32_path[:-len(".onnx")] + "-prep.onnx"
+    try:
+        quant_pre_process(fp32_path, prepared, skip_symbolic_shape=True)
+    except Exception as e:
+        print(f"⚠️  Pré-processamento da quantização falhou ({e}); quantizando o ONNX original")
+        prepared = fp32_path
+
+    input_name = onnxruntime.InferenceSession(
+        fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    reader = FrameCalibrationReader(input_name, calib, imgsz, max_calib)
+    excluded = head_nodes(fp32_path, model_name) if keep_head_fp32 else []
+
+    print(f"🔧 Calibrando com até {max_calib} frames de {calib}"
+          f" ({len(excluded)} nós da cabeça mantidos em FP32)...")
+    t0 = time.perf_counter()
+    try:
+        quantize_static(
+            prepared, int8_path, reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            nodes_to_exclude=excluded,
+        )
+    finally:
+        if prepared != fp32_path and os.path.exists(prepared):
+            os.remove(prepared)
+    if reader.count == 0:
+        os.remove(int8_path)
+        raise ValueError(f"❌ Nenhum frame de calibração em {calib}")
+
+    copy_metadata(fp32_path, int8_path)
+    print(f"✅ INT8 gravado em {int8_path} ({reader.count} frames, {time.perf_counter() - t0:.1f}s)")
+    return fp32_path, int8_path
+
+
+def load_labels(eval_path, name, shape):
+    """
+    Rótulos YOLO (classe cx cy w h normalizados) em labels/<nome>.txt
+
+    Returns:
+        np.ndarray (N, 5) [classe, x1, y1, x2, y2] em pixels, ou None sem arquivo
+    """
+    base = Path(eval_path)
+    if not base.is_dir():
+        base = base.parent
+    for candidate in (base / "labels" / f"{name}.txt", base / f"{name}.txt"):
+        if candidate.is_file():
+            rows = [line.split() for line in candidate.read_text().splitlines() if line.strip()]
+            if not rows:
+                return np.zeros((0, 5))
+            data = np.array(rows, dtype=np.float64)[:, :5]
+            h, w = shape[:2]
+            cx, cy, bw, bh = data[:, 1] * w, data[:, 2] * h, data[:, 3] * w, data[:, 4] * h
+            return np.stack([data[:, 0], cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+    return None
+
+
+def box_iou(a, b):
+    """IoU entre cada caixa de a (N, 4) e b (M, 4)"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match(preds, truth):
+    """
+    Casa predições (N, 6) [x1, y1, x2, y2, conf, classe] com a verdade (M, 5)
+    por confiança decrescente, mesma classe e IoU >= IOU_MATCH
+
+    Returns:
+        np.ndarray bool (N,) - predição é verdadeiro positivo
+    """
+    tp = np.zeros(len(preds), dtype=bool)
+    if len(preds) == 0 or len(truth) == 0:
+        return tp
+    iou = box_iou(preds[:, :4], truth[:, 1:5])
+    iou[preds[:, 5][:, None] != truth[:, 0][None, :]] = 0.0
+    used = np.zeros(len(truth), dtype=bool)
+    for i in np.argsort(-preds[:, 4]):
+        candidates = np.where(~used & (iou[i] >= IOU_MATCH))[0]
+        if len(candidates):
+            j = candidates[np.argmax(iou[i, candidates])]
+            used[j] = True
+            tp[i] = True
+    return tp
+
+
+def average_precision(confs, tps, total):
+    """AP com interpolação em todos os pontos (estilo COCO/VOC 2010+)"""
+    if total == 0:
+        return float('nan')
+    if len(confs) == 0:
+        return 0.0
+    order = np.argsort(-np.asarray(confs))
+    tps = np.asarray(tps)[order]
+    tp_cum = np.cumsum(tps)
+    recall = tp_cum / total
+    precision = tp_cum / np.arange(1, len(tps) + 1)
+    recall = np.concatenate([[0.0], recall, [1.0]])
+    precision = np.concatenate([[1.0], precision, [0.0]])
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    steps = np.where(recall[1:] != recall[:-1])[0]
+    return float(np.sum((recall[steps + 1] - recall[steps]) * precision[steps + 1]))
+
+
+class Scorer:
+    """Acumula acertos por classe ao longo do clipe"""
+
+    def __init__(self, conf_threshold):
+        self.conf_threshold = conf_threshold
+        self.confs = {}
+        self.tps = {}
+        self.totals = {}
+
+    def add(self, preds, truth):
+        tp = match(preds, truth)
+        for cls in set(preds[:, 5].astype(int)) | set(truth[:, 0].astype(int)):
+            mask = preds[:, 5] == cls
+            self.confs.setdefault(cls, []).extend(preds[mask, 4])
+            self.tps.setdefault(cls, []).extend(tp[mask])
+            self.totals[cls] = self.totals.get(cls, 0) + int(np.sum(truth[:, 0] == cls))
+
+    def summary(self):
+        """mAP50 e recall/precisão no limiar de confiança de operação"""
+        aps = [average_precision(self.confs.get(c, []), self.tps.get(c, []), self.totals[c])
+               for c in self.totals if self.totals[c] > 0]
+        confs = np.concatenate([np.asarray(v, dtype=float) for v in self.confs.values()]) if self.confs else np.zeros(0)
+        tps = np.concatenate([np.asarray(v, dtype=bool) for v in self.tps.values()]) if self.tps else np.zeros(0, bool)
+        keep = confs >= self.conf_threshold
+        total = sum(self.totals.values())
+        hits = int(np.sum(tps[keep]))
+        return {
+            'map50': float(np.mean(aps)) if aps else float('nan'),
+            'recall': hits / total if total else float('nan'),
+            'precision': hits / int(np.sum(keep)) if np.sum(keep) else float('nan'),
+            'objects': total,
+        }
+
+
+def predict_boxes(model, frame, imgsz):
+    """Detecções como (N, 6) [x1, y1, x2, y2, conf, classe] + latência"""
+    t0 = time.perf_counter()
+    result = model.predict(frame, imgsz=imgsz, conf=EVAL_CONF, verbose=False, device="cpu")[0]
+    elapsed = time.perf_counter() - t0
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((0, 6)), elapsed
+    data = boxes.data.cpu().numpy()
+    return data[:, [0, 1, 2, 3, 4, -1]].astype(np.float64), elapsed
+
+
+def evaluate(model_name, eval_path, imgsz, max_eval, warmup=5):
+    """Roda FP32 e INT8 no clipe e imprime o relatório comparativo"""
+    fp32 = load_yolo_model(model_name, backend=BACKEND_ONNX, imgsz=imgsz)
+    int8 = load_yolo_model(model_name, backend=BACKEND_ONNX_INT8, imgsz=imgsz)
+    conf_threshold = float(getattr(config, "CONFIDENCE_THRESHOLD", 0.25))
+
+    frames = list(iter_frames(eval_path, max_eval))
+    if not frames:
+        raise ValueError(f"❌ Nenhum frame de avaliação em {eval_path}")
+
+    for _, frame in frames[:warmup]:
+        predict_boxes(fp32, frame, imgsz)
+        predict_boxes(int8, frame, imgsz)
+
+    labeled = load_labels(eval_path, frames[0][0], frames[0][1].shape) is not None
+    scorers = {'FP32': Scorer(conf_threshold), 'INT8': Scorer(conf_threshold)}
+    latencies = {'FP32': [], 'INT8': []}
+
+    for name, frame in frames:
+        ref, t_fp32 = predict_boxes(fp32, frame, imgsz)
+        out, t_int8 = predict_boxes(int8, frame, imgsz)
+        latencies['FP32'].append(t_fp32)
+        latencies['INT8'].append(t_int8)
+
+        if labeled:
+            truth = load_labels(eval_path, name, frame.shape)
+            if truth is None:
+                truth = np.zeros((0, 5))
+            scorers['FP32'].add(ref, truth)
+        else:
+            # Sem rótulos: detecções do FP32 no limiar de operação viram a verdade
+            kept = ref[ref[:, 4] >= conf_threshold]
+            truth = np.concatenate([kept[:, 5:6], kept[:, :4]], axis=1)
+        scorers['INT8'].add(out, truth)
+
+    reference = "rótulos" if labeled else "detecções do FP32 (pseudo-rótulos)"
+    print("\n" + "=" * 72)
+    print(f"RELATÓRIO INT8 x FP32 - {len(frames)} frames de {eval_path}")
+    print(f"Referência: {reference}; limiar de confiança {conf_threshold:.2f}; IoU >= {IOU_MATCH}")
+    print("=" * 72)
+    print(f"{'Modelo':<8}{'Média ms':>10}{'p95 ms':>9}{'FPS':>8}{'mAP50':>9}{'Recall':>9}{'Precisão':>10}")
+    for label in ('FP32', 'INT8'):
+        ms = np.array(latencies[label]) * 1000
+        row = f"{label:<8}{ms.mean():>10.1f}{np.percentile(ms, 95):>9.1f}{1000 / ms.mean():>8.1f}"
+        if label == 'FP32' and not labeled:
+            row += f"{'(ref.)':>9}{'(ref.)':>9}{'(ref.)':>10}"
+        else:
+            s = scorers[label].summary()
+            row += f"{s['map50']:>9.3f}{s['recall']:>9.3f}{s['precision']:>10.3f}"
+        print(row)
+
+    speedup = np.mean(latencies['FP32']) / np.mean(latencies['INT8'])
+    print(f"\nINT8 é {speedup:.2f}x {'mais rápido' if speedup >= 1 else 'mais lento'} que FP32"
+          f" ({scorers['INT8'].summary()['objects']} objetos de referência)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=config.MODEL_PATH)
+    parser.add_argument('--calib', required=True, help="Pasta (ou vídeo) de frames para calibração")
+    parser.add_argument('--eval', help="Clipe separado para o relatório (pasta ou vídeo)")
+    parser.add_argument('--imgsz', type=int, default=config.MODEL_IMGSZ)
+    parser.add_argument('--max-calib', type=int, default=200)
+    parser.add_argument('--max-eval', type=int, default=300)
+    parser.add_argument('--per-tensor', action='store_true', help="Pesos por tensor (padrão: por canal)")
+    parser.add_argument('--quantize-head', action='store_true', help="Quantiza também a cabeça de detecção")
+    parser.add_argument('--skip-quantize', action='store_true', help="Só o relatório (INT8 já gerado)")
+    args = parser.parse_args()
+
+    if not args.skip_quantize:
+        quantize(args.model, args.calib, args.imgsz, args.max_calib,
+                 per_channel=not args.per_tensor, keep_head_fp32=not args.quantize_head)
+
+    if args.eval:
+        evaluate(args.model, args.eval, args.imgsz, args.max_eval)
+    else:
+        print("ℹ️  Sem --eval: relatório de latência/precisão não gerado")
+
+
+if __name__ == "__main__":
+    main()
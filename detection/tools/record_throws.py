@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Grava lançamentos da câmera em pasta de frames + timestamps.txt
+
+A pasta gerada pode ser tocada com RecordedSource / main.py --source:
+    python detection/tools/record_throws.py gravacoes/lancamento_01 --seconds 5
+    python detection/main.py --source gravacoes/lancamento_01 --pacing fast --headless --offline
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.camera_manager import CameraManager, CAPTURE_LATEST  # noqa: E402
+from modules.recorded_source import record  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help="Pasta de saída")
+    parser.add_argument('--camera', type=int, default=0, help="ID da câmera")
+    parser.add_argument('--size', type=int, default=640)
+    parser.add_argument('--fps', type=int, default=60)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--ext', default='.jpg', choices=['.jpg', '.png'])
+    args = parser.parse_args()
+
+    camera = CameraManager(src=args.camera, size=args.size, fps=args.fps,
+                           capture_mode=CAPTURE_LATEST, backend="auto")
+    camera.start()
+    print(f"🔴 Gravando {args.seconds:.1f}s em {args.output}...")
+    try:
+        count = record(camera, args.output, seconds=args.seconds, ext=args.ext)
+    finally:
+        camera.stop()
+    print(f"✅ {count} frames gravados")
+
+
+if __name__ == "__main__":
+    main()
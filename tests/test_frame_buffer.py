@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Testes do FrameRingBuffer: frames emprestados são views somente leitura e
+um slot emprestado nunca é reescrito até ser devolvido
+
+Rodar com: python -m pytest tests/test_frame_buffer.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'detection'))
+
+from modules.frame_buffer import FrameRingBuffer  # noqa: E402
+
+SHAPE = (4, 4, 3)
+
+
+def write(buffer, value, timestamp=0.0):
+    """Escreve um frame constante em um slot livre e publica; retorna o índice (None se cheio)"""
+    index, slot = buffer.acquire_write()
+    if index is None:
+        return None
+    slot[:] = value
+    buffer.publish(index, timestamp)
+    return index
+
+
+def test_borrowed_frame_is_read_only():
+    buffer = FrameRingBuffer(SHAPE, slots=3)
+    write(buffer, 7)
+    with buffer.borrow() as ref:
+        assert not ref.frame.flags.writeable
+        with pytest.raises(ValueError):
+            ref.frame[0, 0, 0] = 1
+        assert (ref.frame == 7).all()
+
+
+def test_held_slot_is_not_reused():
+    buffer = FrameRingBuffer(SHAPE, slots=3)
+    write(buffer, 1)
+    held = buffer.borrow()
+    held_index = held._index
+
+    for value in range(2, 20):
+        index = write(buffer, value)
+        assert index != held_index
+        assert (held.frame == 1).all()
+
+    held.release()
+    assert buffer.borrowed_count() == 0
+    assert held_index in {write(buffer, value) for value in range(20, 23)}
+
+
+def test_all_slots_borrowed_refuses_write():
+    buffer = FrameRingBuffer(SHAPE, slots=2)
+    write(buffer, 1)
+    first = buffer.borrow()
+    write(buffer, 2)
+    second = buffer.borrow()
+
+    assert buffer.acquire_write() == (None, None)
+    assert (first.frame == 1).all() and (second.frame == 2).all()
+
+    first.release()
+    assert write(buffer, 3) == first._index
+    second.release()
+
+
+def test_sequence_and_wait_newer():
+    buffer = FrameRingBuffer(SHAPE, slots=3)
+    assert buffer.borrow() is None
+    write(buffer, 5, timestamp=1.5)
+    with buffer.wait_newer(0, timeout=0.1) as ref:
+        assert ref.seq == 1 and ref.timestamp == 1.5
+    assert buffer.wait_newer(1, timeout=0.01) is None
+    buffer.close()
+    assert buffer.wait_newer(0, timeout=0.1) is None
+
+
+def test_writable_slot_does_not_leak_through_views():
+    buffer = FrameRingBuffer(SHAPE, slots=2)
+    write(buffer, 3)
+    with buffer.borrow() as ref:
+        np.testing.assert_array_equal(ref.frame, np.full(SHAPE, 3, np.uint8))
+        assert not np.shares_memory(ref.frame, buffer.acquire_write()[1])
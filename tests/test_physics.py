@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Testes do PhysicsPredictor: velocidade pelas somas incrementais deve ser a
+mesma do np.polyfit sobre o histórico (modo linear) e o ajuste balístico
+deve recuperar o lançamento com g fixo
+
+Rodar com: python -m pytest tests/test_physics.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'detection'))
+
+from modules.physics import PhysicsPredictor, FIT_BALLISTIC  # noqa: E402
+
+
+def polyfit_velocity(predictor):
+    """Referência: regressão linear de cada eixo sobre o histórico"""
+    t = np.array(predictor.timestamps)
+    pos = np.array(predictor.positions)
+    return np.array([np.polyfit(t - t[-1], pos[:, axis], 1)[0] for axis in range(3)])
+
+
+@pytest.mark.parametrize("history_size", [3, 5, 10, 30])
+def test_velocity_matches_polyfit_over_sliding_window(history_size):
+    rng = np.random.default_rng(history_size)
+    predictor = PhysicsPredictor(history_size)
+    t = 5000.0  # monotonic() grande: a origem relativa evita cancelamento
+    for i in range(10 * history_size + 7):
+        t += rng.uniform(0.005, 0.05)
+        predictor.add_point(rng.normal(0.0, 1.0, 3), t)
+        if i < 2:
+            assert predictor.calculate_velocity() is None
+            continue
+        np.testing.assert_allclose(predictor.calculate_velocity(), polyfit_velocity(predictor),
+                                   rtol=1e-9, atol=1e-9)
+
+
+def test_exact_velocity_of_linear_motion():
+    predictor = PhysicsPredictor(10)
+    velocity = np.array([1.0, -0.5, 2.0])
+    for i in range(25):
+        t = 100.0 + i / 60
+        predictor.add_point(np.array([0.1, 0.2, 1.5]) + velocity * t, t)
+    np.testing.assert_allclose(predictor.calculate_velocity(), velocity, atol=1e-9)
+
+
+def test_clear_history_resets_fit():
+    predictor = PhysicsPredictor(10)
+    for i in range(12):
+        predictor.add_point(np.array([i, 0.0, 0.0]), float(i))
+    predictor.clear_history()
+    assert predictor.calculate_velocity() is None
+
+    for i in range(4):
+        predictor.add_point(np.array([0.0, 2.0 * i, 0.0]), 50.0 + i)
+    np.testing.assert_allclose(predictor.calculate_velocity(), [0.0, 2.0, 0.0], atol=1e-12)
+
+
+def test_same_timestamp_has_no_velocity():
+    predictor = PhysicsPredictor(10)
+    for i in range(4):
+        predictor.add_point(np.array([i, 0.0, 0.0]), 7.0)
+    assert predictor.calculate_velocity() is None
+
+
+def test_landing_uses_fitted_velocity():
+    predictor = PhysicsPredictor(10, robot_height=0.0, gravity=9.81)
+    for i in range(3):
+        predictor.add_point(np.array([0.5 * i, 0.0, 2.0]), float(i))
+    # vx = 0.5, vz = 0: cai de 2 m em sqrt(2 * 2 / g)
+    fall = np.sqrt(4.0 / 9.81)
+    np.testing.assert_allclose(predictor.predict_landing(), [1.0 + 0.5 * fall, 0.0, 0.0])
+
+
+def test_ballistic_recovers_exact_throw():
+    g = 9.81
+    p0, v0 = np.array([0.2, 2.0, 1.2]), np.array([0.5, -1.0, 2.5])
+    predictor = PhysicsPredictor(10, robot_height=0.0, gravity=g, fit_mode=FIT_BALLISTIC)
+    for i in range(14):
+        t = i / 60
+        position = p0 + v0 * t
+        position[2] -= 0.5 * g * t ** 2
+        predictor.add_point(position, 300.0 + t)
+
+    position, velocity = predictor.fit_state()
+    np.testing.assert_allclose(velocity, [0.5, -1.0, 2.5 - g * 13 / 60], atol=1e-9)
+    np.testing.assert_allclose(position, predictor.positions[-1], atol=1e-9)
+
+    flight = (v0[2] + np.sqrt(v0[2] ** 2 + 2 * g * p0[2])) / g
+    np.testing.assert_allclose(predictor.predict_landing(), [*(p0[:2] + v0[:2] * flight), 0.0], atol=1e-9)
+
+
+def test_weighted_ballistic_matches_polyfit():
+    g = 9.81
+    rng = np.random.default_rng(3)
+    predictor = PhysicsPredictor(8, gravity=g, fit_mode=FIT_BALLISTIC)
+    t = 1234.0
+    for _ in range(30):
+        t += rng.uniform(0.01, 0.04)
+        predictor.add_point(rng.normal(0.0, 1.0, 3), t, weight=rng.uniform(0.3, 1.0))
+
+    times = np.array(predictor.timestamps) - predictor.timestamps[-1]
+    pos = np.array(predictor.positions)
+    weights = np.sqrt(np.array(predictor.weights))  # polyfit pondera os resíduos, não os quadrados
+    pos[:, 2] += 0.5 * g * times ** 2
+    expected = [np.polyfit(times, pos[:, axis], 1, w=weights) for axis in range(3)]
+
+    position, velocity = predictor.fit_state()
+    np.testing.assert_allclose(velocity, [fit[0] for fit in expected], atol=1e-9)
+    np.testing.assert_allclose(position, [fit[1] for fit in expected], atol=1e-9)
+
+
+def test_invalid_fit_mode():
+    with pytest.raises(ValueError):
+        PhysicsPredictor(10, fit_mode="quadratic")